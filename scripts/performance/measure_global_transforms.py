@@ -0,0 +1,113 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+# Measure the global result transforms (resourceGroup and x509ThumbprintHex) on a synthetic list of resources.
+# Usage: python scripts/performance/measure_global_transforms.py [resources]
+
+import json
+import re
+import sys
+import timeit
+
+from azure.cli.core.commands.transform import register_global_transforms
+from azure.cli.core.mock import DummyCli
+from azure.cli.core.util import b64_to_hex
+from knack.events import EVENT_INVOKER_TRANSFORM_RESULT
+
+
+def _legacy_parse_id(strid):
+    parts = re.split('/', strid)
+    if parts[3].lower() != 'resourcegroups':
+        raise KeyError()
+    return {'resource-group': parts[4], 'name': parts[8]}
+
+
+def _legacy_add_resource_group(obj):
+    # what the resourceGroup transform used to do, as its own walk of the result
+    if isinstance(obj, list):
+        for array_item in obj:
+            _legacy_add_resource_group(array_item)
+    elif isinstance(obj, dict):
+        try:
+            if 'resourcegroup' not in [x.lower() for x in obj.keys()]:
+                if obj['id']:
+                    obj['resourceGroup'] = _legacy_parse_id(obj['id'])['resource-group']
+        except (KeyError, IndexError, TypeError):
+            pass
+        for item_key in obj:
+            if item_key != 'sourceVault':
+                _legacy_add_resource_group(obj[item_key])
+
+
+def _legacy_add_x509_hex(obj):
+    # what the x509ThumbprintHex transform used to do, as its own walk of the result
+    if isinstance(obj, list):
+        for array_item in obj:
+            _legacy_add_x509_hex(array_item)
+    elif isinstance(obj, dict):
+        try:
+            if 'x509ThumbprintHex' not in obj:
+                if obj['x509Thumbprint']:
+                    obj['x509ThumbprintHex'] = b64_to_hex(obj['x509Thumbprint'])
+        except (KeyError, IndexError, TypeError):
+            pass
+        for item_key in obj:
+            _legacy_add_x509_hex(obj[item_key])
+
+
+def _legacy_transform(result):
+    _legacy_add_resource_group(result)
+    _legacy_add_x509_hex(result)
+
+
+def _create_payload(count):
+    resources = []
+    for i in range(count):
+        rid = '/subscriptions/00000000-0000-0000-0000-000000000000/resourceGroups/rg{}/providers/' \
+              'Microsoft.Compute/virtualMachines/vm{}'.format(i % 50, i)
+        resources.append({
+            'id': rid,
+            'name': 'vm{}'.format(i),
+            'location': 'westus',
+            'tags': {'env': 'test', 'owner': 'team{}'.format(i % 10)},
+            'properties': {
+                'provisioningState': 'Succeeded',
+                'hardwareProfile': {'vmSize': 'Standard_DS1_v2'},
+                'storageProfile': {'osDisk': {'name': 'osdisk{}'.format(i), 'diskSizeGb': 30,
+                                              'managedDisk': {'id': rid + '/disks/osdisk'}}},
+                'networkProfile': {'networkInterfaces': [{'id': rid + '/nic{}'.format(n)} for n in range(2)]},
+                'osProfile': {'secrets': [{'sourceVault': {'id': rid + '/vault'},
+                                           'vaultCertificates': [{'certificateUrl': 'https://vault/cert'}]}]},
+            },
+            'certificate': {'x509Thumbprint': 'qqqqqqqqqqqqqqqqqqqqqqqqqqo='} if i % 10 == 0 else None,
+        })
+    return json.dumps(resources)
+
+
+def measure(name, transform, payload, loop=3):
+    elapsed = []
+    for _ in range(loop):
+        result = json.loads(payload)
+        start = timeit.default_timer()
+        transform(result)
+        elapsed.append(timeit.default_timer() - start)
+    print('{:>8}: {:.3f} s'.format(name, min(elapsed)))
+    return result
+
+
+if __name__ == '__main__':
+    resource_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    resources_payload = _create_payload(resource_count)
+
+    cli = DummyCli()
+    cli._event_handlers[EVENT_INVOKER_TRANSFORM_RESULT] = []  # pylint: disable=protected-access
+    register_global_transforms(cli)
+
+    def _fused_transform(result):
+        cli.raise_event(EVENT_INVOKER_TRANSFORM_RESULT, event_data={'result': result})
+
+    legacy_result = measure('legacy', _legacy_transform, resources_payload)
+    fused_result = measure('fused', _fused_transform, resources_payload)
+    assert legacy_result == fused_result
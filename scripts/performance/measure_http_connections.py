@@ -0,0 +1,111 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+# Measure the connections opened by the management clients of an invocation, like the jobs of a command invoked with
+# many --ids which each create their clients, with and without sharing the HTTP sessions of the clients.
+# A local HTTP server counts the connections it accepts, each of which would be a TCP and TLS handshake with ARM.
+# Usage: python scripts/performance/measure_http_connections.py [requests] [workers]
+
+import json
+import os
+import sys
+import threading
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from azure.core import PipelineClient
+from azure.core.pipeline.policies import HeadersPolicy, RetryPolicy
+from azure.core.rest import HttpRequest
+from msrest.authentication import BasicTokenAuthentication
+
+from azure.cli.core.commands.client_factory import _get_mgmt_service_client, close_shared_http_sessions
+from azure.cli.core.mock import DummyCli
+from azure.cli.core.profiles import ResourceType
+from azure.cli.core.profiles._shared import get_client_class
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Send the headers and the body of a response together, or delayed ACKs stall the kept-alive connections
+    wbufsize = -1
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with Handler.lock:
+            Handler.connections += 1
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        body = json.dumps({'id': self.path.split('?')[0], 'name': 'rg', 'location': 'westus'}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class Track2Client:
+    """A minimal track 2 client, as the installed management SDKs are track 1."""
+
+    def __init__(self, credential, subscription_id, base_url=None, transport=None, **kwargs):
+        self.subscription_id = subscription_id
+        self._client = PipelineClient(base_url, transport=transport, policies=[HeadersPolicy(), RetryPolicy()],
+                                      **kwargs)
+
+    def get_resource_group(self, name):
+        url = '/subscriptions/{}/resourcegroups/{}?api-version=2020-06-01'.format(self.subscription_id, name)
+        response = self._client.send_request(HttpRequest('GET', self._client.format_url(url)))
+        response.raise_for_status()
+        return response.json()
+
+
+def _get_login_credentials(subscription_id=None, **_):
+    return BasicTokenAuthentication({'access_token': 'token'}), subscription_id or '0000', 'tenant'
+
+
+def measure(cli_ctx, track, count, workers):
+    resource_client_type = get_client_class(ResourceType.MGMT_RESOURCE_RESOURCES)
+
+    def _job(i):
+        if track == 1:
+            client, _ = _get_mgmt_service_client(cli_ctx, resource_client_type, api_version='2020-06-01')
+            client.resource_groups.get('rg{}'.format(i))
+        else:
+            client, _ = _get_mgmt_service_client(cli_ctx, Track2Client)
+            client.get_resource_group('rg{}'.format(i))
+
+    def _invoke():
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_job, range(count)))
+        close_shared_http_sessions()
+
+    Handler.connections = 0
+    seconds = timeit.timeit(_invoke, number=1)
+    return seconds, Handler.connections
+
+
+def main(count, workers):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cli_ctx = DummyCli()
+    cli_ctx.cloud.endpoints.resource_manager = 'http://127.0.0.1:{}'.format(server.server_address[1])
+    with mock.patch('azure.cli.core._profile.Profile.get_login_credentials', side_effect=_get_login_credentials):
+        for track in (1, 2):
+            for share in ('false', 'true'):
+                os.environ['AZURE_CORE_SHARE_HTTP_SESSION'] = share
+                seconds, connections = measure(cli_ctx, track, count, workers)
+                print('track {} share_http_session={:5} {:>5} requests: {:5} connections {:8.3f} s'.format(
+                    track, share, count, connections, seconds))
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200, int(sys.argv[2]) if len(sys.argv) > 2 else 10)
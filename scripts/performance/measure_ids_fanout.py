@@ -0,0 +1,57 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+# Measure the cost of preparing the per-ID jobs of a command invoked with many --ids, before any request is sent.
+# Usage: python scripts/performance/measure_ids_fanout.py
+
+import copy
+import timeit
+import tracemalloc
+
+from azure.cli.core.commands import _copy_cli_ctx_for_job
+from azure.cli.core.mock import DummyCli
+
+
+def _deepcopy_cli_ctx_for_job(cli_ctx):
+    # what AzCliCommandInvoker.execute used to do for every job
+    job_cli_ctx = copy.copy(cli_ctx)
+    job_cli_ctx.data = copy.deepcopy(cli_ctx.data)
+    return job_cli_ctx
+
+
+def _create_cli_ctx():
+    cli_ctx = DummyCli()
+    cli_ctx.refresh_request_id()
+    cli_ctx.data['command'] = 'vm show'
+    cli_ctx.data['safe_params'] = ['--ids', '--query', '--output']
+    # objects cached by validators and completers during the invocation
+    cli_ctx.data['_cached_objects'] = [{'id': '/subscriptions/{}/resourceGroups/rg/providers/Microsoft.Compute/'
+                                              'virtualMachines/vm{}'.format(i % 7, i),
+                                        'tags': {'env': 'test', 'owner': 'team{}'.format(i)}} for i in range(200)]
+    return cli_ctx
+
+
+def measure(copy_func, count, loop=3):
+    cli_ctx = _create_cli_ctx()
+
+    def _fan_out():
+        jobs = []
+        for i in range(count):
+            job_cli_ctx = copy_func(cli_ctx)
+            job_cli_ctx.data['subscription_id'] = str(i)
+            jobs.append(job_cli_ctx)
+        return jobs
+
+    seconds = min(timeit.repeat(_fan_out, number=1, repeat=loop))
+    tracemalloc.start()
+    jobs = _fan_out()  # pylint: disable=unused-variable
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('{:>26} {:>6} ids: {:8.3f} s {:10.1f} MiB'.format(copy_func.__name__, count, seconds, peak / 1024 / 1024))
+
+
+for ids_count in (1000, 10000):
+    measure(_deepcopy_cli_ctx_for_job, ids_count)
+    measure(_copy_cli_ctx_for_job, ids_count)
@@ -0,0 +1,51 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+# Measure --query evaluation with the JMESPath tree interpreter and with the compiled queries of azure.cli.core._query.
+# Usage: python scripts/performance/measure_query.py [items]
+
+import sys
+import timeit
+from collections import OrderedDict
+
+import jmespath
+from jmespath import Options
+
+from azure.cli.core._query import compile_query
+
+QUERIES = [
+    '[].{name: name, resourceGroup: resourceGroup, size: properties.hardwareProfile.vmSize}',
+    "[?location=='westus']",
+    "[?location=='westus' && tags.env=='prod'].name",
+    'length(@)',
+    'sort_by([].{name: name, size: properties.osDisk.diskSizeGb}, &size)[-1].name',
+]
+
+
+def _create_items(count):
+    return [{
+        'id': '/subscriptions/sub/resourceGroups/rg{}/providers/Microsoft.Compute/virtualMachines/vm{}'.format(
+            i % 50, i),
+        'name': 'vm{}'.format(i),
+        'resourceGroup': 'rg{}'.format(i % 50),
+        'location': 'westus' if i % 3 else 'eastus',
+        'tags': {'env': 'prod' if i % 2 else 'test'},
+        'properties': {'hardwareProfile': {'vmSize': 'Standard_DS1_v2'}, 'osDisk': {'diskSizeGb': i % 1024}},
+    } for i in range(count)]
+
+
+def _measure(func, loop=3):
+    return min(timeit.repeat(func, number=1, repeat=loop))
+
+
+if __name__ == '__main__':
+    items = _create_items(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
+    options = Options(OrderedDict)
+    for query in QUERIES:
+        interpreted, compiled = jmespath.compile(query), compile_query(query)
+        assert interpreted.search(items, options) == compiled.search(items, options)
+        interpreted_time = _measure(lambda: interpreted.search(items, options))  # pylint: disable=cell-var-from-loop
+        compiled_time = _measure(lambda: compiled.search(items, options))  # pylint: disable=cell-var-from-loop
+        print('{:.3f} s -> {:.3f} s  {}'.format(interpreted_time, compiled_time, query))
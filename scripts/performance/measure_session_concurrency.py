@@ -0,0 +1,115 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+# Measure concurrent `az` processes updating the INDEX, VERSIONS and CLOUD_ENDPOINTS session files.
+# Every process loads the files and writes its own keys plus the shared keys each round, like a command does.
+# Corrupted reads and the process keys missing at the end (lost updates) are counted.
+# Usage: python scripts/performance/measure_session_concurrency.py [processes] [rounds]
+
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+from codecs import open as codecs_open
+from contextlib import contextmanager
+
+from azure.cli.core._session import Session
+
+FILES = ('commandIndex.json', 'versionCheck.json', 'cloudEndpoints.json')
+
+
+class LegacySession(Session):
+    """What Session used to do: rewrite the whole file in place on every key change."""
+
+    def load(self, filename, max_age=0):
+        self.filename = filename
+        self.data = {}
+        try:
+            with codecs_open(self.filename, 'r', encoding=self._encoding) as f:
+                self.data = json.load(f)
+        except (OSError, IOError, ValueError):
+            self.save()
+
+    def save(self):
+        with codecs_open(self.filename, 'w', encoding=self._encoding) as f:
+            json.dump(self.data, f)
+
+    @contextmanager
+    def transaction(self):
+        yield self
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+        self.save_with_retry()
+
+
+def _is_corrupted(path):
+    try:
+        with codecs_open(path, 'r', encoding='utf-8-sig') as f:
+            json.load(f)
+    except ValueError:
+        return True
+    except (OSError, IOError):
+        pass
+    return False
+
+
+def _run_process(args):
+    session_cls, directory, process_id, rounds = args
+    corrupted = 0
+    for i in range(rounds):
+        paths = [os.path.join(directory, f) for f in FILES]
+        corrupted += sum(_is_corrupted(p) for p in paths)
+        index, versions, cloud_endpoints = session_cls(), session_cls(), session_cls()
+        index.load(paths[0])
+        versions.load(paths[1])
+        cloud_endpoints.load(paths[2])
+        # like CommandIndex.update
+        with index.transaction():
+            index['version'] = '2.14.0'
+            index['cloudProfile'] = 'latest'
+            index['commandIndex'] = {'vm': ['azure.cli.command_modules.vm'] * 20}
+            index['p{}'.format(process_id)] = i
+        # like get_cached_latest_versions
+        with versions.transaction():
+            versions['versions'] = {'core': {'local': '2.14.0', 'pypi': '2.14.0'}}
+            versions['p{}'.format(process_id)] = i
+        cloud_endpoints['p{}'.format(process_id)] = i
+    return corrupted
+
+
+def measure(session_cls, processes, rounds):
+    directory = tempfile.mkdtemp()
+    try:
+        pool = multiprocessing.Pool(processes)
+        start = timeit.default_timer()
+        corrupted = sum(pool.map(_run_process, [(session_cls, directory, p, rounds) for p in range(processes)]))
+        elapsed = timeit.default_timer() - start
+        pool.close()
+        pool.join()
+
+        lost = 0
+        for f in FILES:
+            path = os.path.join(directory, f)
+            if _is_corrupted(path):
+                lost += processes
+                continue
+            with codecs_open(path, 'r', encoding='utf-8-sig') as fp:
+                data = json.load(fp)
+            lost += sum('p{}'.format(p) not in data for p in range(processes))
+        print('{:>14}: {:7.2f} s, {:5} corrupted reads, {:4} of {} process keys lost'.format(
+            session_cls.__name__, elapsed, corrupted, lost, processes * len(FILES)))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    process_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    round_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    measure(LegacySession, process_count, round_count)
+    measure(Session, process_count, round_count)
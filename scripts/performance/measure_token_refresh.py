@@ -0,0 +1,103 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+# Count the token refresh requests sent to AAD by concurrent az processes sharing a token file, whose tokens expire
+# within the refresh window. The requests to AAD are mocked, and take 200 ms.
+# Usage: python scripts/performance/measure_token_refresh.py [processes]
+
+import datetime
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import timeit
+from unittest import mock
+
+from azure.cli.core._profile import CredsCache, _AUTH_CTX_FACTORY, _CLIENT_ID
+from azure.cli.core.mock import DummyCli
+
+TENANT = '00000000-0000-0000-0000-000000000000'
+USER = 'user@example.com'
+RESOURCES = ['https://management.core.windows.net/', 'https://vault.azure.net',
+             'https://graph.windows.net/']
+
+
+class LegacyCredsCache(CredsCache):
+    # what the token cache used to do: refresh in every process, then rewrite the whole file at exit
+
+    def retrieve_token_for_user(self, username, tenant, resource):
+        context = self._auth_ctx_factory(self._ctx, tenant, cache=self.adal_token_cache)
+        token_entry = context.acquire_token(resource, username, _CLIENT_ID)
+        if self.adal_token_cache.has_state_changed:
+            self.persist_cached_creds()
+        return token_entry['tokenType'], token_entry['accessToken'], token_entry
+
+    def flush_to_disk(self):
+        if self._should_flush_to_disk:
+            with os.fdopen(os.open(self._token_file, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600),
+                           'w+') as cred_file:
+                cred_file.write(json.dumps([entry for _, entry in self.adal_token_cache.read_items()]))
+
+
+def _expires_on(seconds):
+    return str(datetime.datetime.now() + datetime.timedelta(seconds=seconds))
+
+
+def _create_token_file(token_file):
+    with open(token_file, 'w') as f:
+        json.dump([{'_clientId': _CLIENT_ID, 'resource': resource, 'tokenType': 'Bearer', 'expiresOn': _expires_on(120),
+                    '_authority': 'https://login.microsoftonline.com/' + TENANT, 'isMRRT': True,
+                    'refreshToken': 'refresh', 'accessToken': 'token', 'userId': USER} for resource in RESOURCES], f)
+
+
+def _run_az(cli, creds_cache_cls, token_file, refresh_count, error_count):
+    def _get_token(*_):
+        with refresh_count.get_lock():
+            refresh_count.value += 1
+        time.sleep(0.2)
+        return {'accessToken': 'new token', 'refreshToken': 'new refresh', 'tokenType': 'Bearer',
+                'expiresOn': _expires_on(3600)}
+
+    with mock.patch('adal.oauth2_client.OAuth2Client.get_token', _get_token), \
+            mock.patch.dict('os.environ', {'AZURE_ACCESS_TOKEN_FILE': token_file}):
+        creds_cache = creds_cache_cls(cli, auth_ctx_factory=_AUTH_CTX_FACTORY, async_persist=False)
+        for resource in RESOURCES:
+            try:
+                creds_cache.retrieve_token_for_user(USER, TENANT, resource)
+            except Exception:  # pylint: disable=broad-except
+                # e.g. the token file was read while another process was rewriting it
+                with error_count.get_lock():
+                    error_count.value += 1
+
+
+def measure(name, creds_cache_cls, process_count):
+    cli = DummyCli()
+    # Import the modules once, rather than in every process
+    import adal  # pylint: disable=unused-import
+    import dateutil.parser  # pylint: disable=unused-import
+    import portalocker  # pylint: disable=unused-import
+    context = multiprocessing.get_context('fork')
+    refresh_count, error_count = context.Value('i', 0), context.Value('i', 0)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        token_file = os.path.join(temp_dir, 'accessTokens.json')
+        _create_token_file(token_file)
+        start = timeit.default_timer()
+        args = (cli, creds_cache_cls, token_file, refresh_count, error_count)
+        processes = [context.Process(target=_run_az, args=args) for _ in range(process_count)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = timeit.default_timer() - start
+    print('{:>8}: {} refresh requests for {} tokens, {} failed token requests, {:.2f} s'.format(
+        name, refresh_count.value, len(RESOURCES), error_count.value, elapsed))
+
+
+if __name__ == '__main__':
+    concurrent_processes = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    measure('legacy', LegacyCredsCache, concurrent_processes)
+    measure('locked', CredsCache, concurrent_processes)
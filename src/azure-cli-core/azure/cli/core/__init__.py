@@ -60,6 +60,11 @@ def _configure_knack():
 _configure_knack()
 
 
+def _close_shared_http_sessions(_, **__):
+    from azure.cli.core.commands.client_factory import close_shared_http_sessions
+    close_shared_http_sessions()
+
+
 class AzCli(CLI):
 
     def __init__(self, **kwargs):
@@ -70,11 +75,29 @@ class AzCli(CLI):
             register_ids_argument, register_global_subscription_argument)
         from azure.cli.core.cloud import get_active_cloud
         from azure.cli.core.commands.transform import register_global_transforms
-        from azure.cli.core._session import ACCOUNT, CONFIG, SESSION, INDEX, VERSIONS
-        from azure.cli.core.style import format_styled_text
-        from azure.cli.core.util import handle_version_update
         from azure.cli.core.commands.query_examples import register_global_query_examples_argument
 
+        from knack.events import EVENT_CLI_POST_EXECUTE
+
+        self.load_invocation_state()
+
+        self.cloud = get_active_cloud(self)
+        logger.debug('Current cloud config:\n%s', str(self.cloud.name))
+        register_global_transforms(self)
+        register_global_subscription_argument(self)
+        register_global_query_examples_argument(self)
+        register_ids_argument(self)  # global subscription must be registered first!
+        register_cache_arguments(self)
+        self.register_event(EVENT_CLI_POST_EXECUTE, _close_shared_http_sessions)
+
+    def load_invocation_state(self):
+        """Load the state that the CLI reads once for each run, like the session files and the local context.
+
+        The resident process of `core.use_daemon` creates the CLI once, and loads this state again for each command.
+        """
+        from azure.cli.core._session import ACCOUNT, CONFIG, SESSION, INDEX, VERSIONS, EXTENSION_REGISTRY
+        from azure.cli.core.style import format_styled_text
+        from azure.cli.core.util import handle_version_update
         from knack.util import ensure_dir
 
         self.data['headers'] = {}
@@ -90,17 +113,10 @@ class AzCli(CLI):
         SESSION.load(os.path.join(azure_folder, 'az.sess'), max_age=3600)
         INDEX.load(os.path.join(azure_folder, 'commandIndex.json'))
         VERSIONS.load(os.path.join(azure_folder, 'versionCheck.json'))
+        EXTENSION_REGISTRY.load(os.path.join(azure_folder, 'extensionRegistry.json'))
         handle_version_update()
 
-        self.cloud = get_active_cloud(self)
-        logger.debug('Current cloud config:\n%s', str(self.cloud.name))
         self.local_context = AzCLILocalContext(self)
-        register_global_transforms(self)
-        register_global_subscription_argument(self)
-        register_global_query_examples_argument(self)
-        register_ids_argument(self)  # global subscription must be registered first!
-        register_cache_arguments(self)
-
         self.progress_controller = None
 
         if not self.enable_color:
@@ -215,7 +231,7 @@ class MainCommandsLoader(CLICommandsLoader):
         from azure.cli.core.commands import (
             _load_module_command_loader, _load_extension_command_loader, BLOCKED_MODS, ExtensionCommandSource)
         from azure.cli.core.extension import (
-            get_extensions, get_extension_path, get_extension_modname)
+            get_extensions, get_extension_path)
 
         def _update_command_table_from_modules(args, command_modules=None):
             """Loads command tables from modules and merge into the main command table.
@@ -302,7 +318,7 @@ class MainCommandsLoader(CLICommandsLoader):
                 # Extension's name may not be the same as its modname. eg. name: virtual-wan, modname: azext_vwan
                 filtered_extensions = []
                 for ext in extensions:
-                    ext_mod = get_extension_modname(ext.name, ext.path)
+                    ext_mod = ext.get_modname()
                     # Filter the extensions according to the index
                     if ext_mod in extension_modname:
                         filtered_extensions.append(ext)
@@ -331,7 +347,7 @@ class MainCommandsLoader(CLICommandsLoader):
                         # Import in the `for` loop because `allowed_extensions` can be []. In such case we
                         # don't need to import `check_version_compatibility` at all.
                         from azure.cli.core.extension.operations import check_version_compatibility
-                        check_version_compatibility(ext.get_metadata())
+                        check_version_compatibility(ext.get_compat_metadata())
                     except CLIError as ex:
                         # issue warning and skip loading extensions that aren't compatible with the CLI core
                         logger.warning(ex)
@@ -340,7 +356,7 @@ class MainCommandsLoader(CLICommandsLoader):
                     ext_dir = ext.path or get_extension_path(ext_name)
                     sys.path.append(ext_dir)
                     try:
-                        ext_mod = get_extension_modname(ext_name, ext_dir=ext_dir)
+                        ext_mod = ext.get_modname()
                         # Add to the map. This needs to happen before we load commands as registering a command
                         # from an extension requires this map to be up-to-date.
                         # self._mod_to_ext_map[ext_mod] = ext_name
@@ -349,6 +365,10 @@ class MainCommandsLoader(CLICommandsLoader):
                             _load_extension_command_loader(self, args, ext_mod)
 
                         for cmd_name, cmd in extension_command_table.items():
+                            if cmd_name in module_commands:
+                                # Keep the built-in owner, so that the command index loads both of them
+                                overridden_command_modules.setdefault(
+                                    cmd_name, self.command_table[cmd_name].loader.__module__)
                             cmd.command_source = ExtensionCommandSource(
                                 extension_name=ext_name,
                                 overrides_command=cmd_name in module_commands,
@@ -408,6 +428,8 @@ class MainCommandsLoader(CLICommandsLoader):
         # Clear the tables to make this method idempotent
         self.command_group_table.clear()
         self.command_table.clear()
+        # Built-in modules of the commands overridden by extensions
+        overridden_command_modules = {}
 
         need_skip_command_index = False
         if isinstance(args, list) and args:
@@ -469,7 +491,7 @@ class MainCommandsLoader(CLICommandsLoader):
         logger.debug("Loaded %d groups, %d commands.", len(self.command_group_table), len(self.command_table))
 
         if use_command_index:
-            command_index.update(self.command_table)
+            command_index.update(self.command_table, overridden_command_modules)
 
         return self.command_table
 
@@ -519,6 +541,9 @@ class CommandIndex:
     _COMMAND_INDEX = 'commandIndex'
     _COMMAND_INDEX_VERSION = 'version'
     _COMMAND_INDEX_CLOUD_PROFILE = 'cloudProfile'
+    _COMMAND_TREE = 'commandTree'
+    # Key of the module list in the node of a command. Command and group names never start with '_'.
+    _COMMAND_TREE_MODULES = '_modules'
 
     def __init__(self, cli_ctx=None):
         """Class to manage command index.
@@ -552,19 +577,26 @@ class CommandIndex:
         if not args or args[0].startswith('-'):
             return None
 
-        # Get the top-level command, like `network` in `network vnet create -h`
-        top_command = args[0]
-        index = self.INDEX[self._COMMAND_INDEX]
-        # Check the command index for (command: [module]) mapping, like
-        # "network": ["azure.cli.command_modules.natgateway", "azure.cli.command_modules.network", "azext_firewall"]
-        index_modules_extensions = index.get(top_command)
+        command_tree = self.INDEX.get(self._COMMAND_TREE)
+        if command_tree:
+            # Check the command tree for the modules owning the command, like `network vnet list`, or all the
+            # commands in the group, like `network vnet`
+            command, index_modules_extensions = self._get_from_command_tree(command_tree, args)
+        else:
+            # Get the top-level command, like `network` in `network vnet create -h`
+            command = args[0]
+            index = self.INDEX[self._COMMAND_INDEX]
+            # Check the command index for (command: [module]) mapping, like
+            # "network": ["azure.cli.command_modules.natgateway", "azure.cli.command_modules.network",
+            #             "azext_firewall"]
+            index_modules_extensions = index.get(command)
 
         if index_modules_extensions:
             # This list contains both built-in modules and extensions
             index_builtin_modules = []
             index_extensions = []
             # Found modules from index
-            logger.debug("Modules found from index for '%s': %s", top_command, index_modules_extensions)
+            logger.debug("Modules found from index for '%s': %s", command, index_modules_extensions)
             command_module_prefix = 'azure.cli.command_modules.'
             for m in index_modules_extensions:
                 if m.startswith(command_module_prefix):
@@ -579,27 +611,72 @@ class CommandIndex:
 
         return None
 
-    def update(self, command_table):
+    def _get_from_command_tree(self, command_tree, args):
+        """Walk the command tree along the leading positional arguments.
+
+        :return: a tuple of the matched command or group name and the modules owning it. For a command, these are
+         the modules registering it. For a group, these are the modules registering any command under it.
+        """
+        node = command_tree
+        words = []
+        for arg in args:
+            if arg.startswith('-') or arg == self._COMMAND_TREE_MODULES or arg not in node:
+                # An option, a positional argument of the command or an unknown command
+                break
+            node = node[arg]
+            words.append(arg)
+            if self._COMMAND_TREE_MODULES in node:
+                break
+        if not words:
+            return None, None
+
+        modules = []
+        nodes = [node]
+        while nodes:
+            current = nodes.pop()
+            for key, value in current.items():
+                if key == self._COMMAND_TREE_MODULES:
+                    modules.extend(m for m in value if m not in modules)
+                else:
+                    nodes.append(value)
+        return ' '.join(words), modules
+
+    def update(self, command_table, overridden_command_modules=None):
         """Update the command index according to the given command table.
 
         :param command_table: The command table built by azure.cli.core.MainCommandsLoader.load_command_table
+        :param overridden_command_modules: The (command: module) mapping of the built-in commands overridden by
+         extensions, like {"vm create": "azure.cli.command_modules.vm"}
         """
         start_time = timeit.default_timer()
-        self.INDEX[self._COMMAND_INDEX_VERSION] = __version__
-        self.INDEX[self._COMMAND_INDEX_CLOUD_PROFILE] = self.cloud_profile
         from collections import defaultdict
         index = defaultdict(list)
+        command_tree = {}
+        overridden_command_modules = overridden_command_modules or {}
 
         # self.cli_ctx.invocation.commands_loader.command_table doesn't exist in DummyCli due to the lack of invocation
         for command_name, command in command_table.items():
             # Get the top-level name: <vm> create
-            top_command = command_name.split()[0]
+            words = command_name.split()
+            top_command = words[0]
             # Get module name, like azure.cli.command_modules.vm, azext_webapp
             module_name = command.loader.__module__
             if module_name not in index[top_command]:
                 index[top_command].append(module_name)
+            # Add the full command path to the tree: {"vm": {"create": {"_modules": ["azure.cli.command_modules.vm"]}}}
+            node = command_tree
+            for word in words:
+                node = node.setdefault(word, {})
+            command_modules = node.setdefault(self._COMMAND_TREE_MODULES, [])
+            for name in (overridden_command_modules.get(command_name), module_name):
+                if name and name not in command_modules:
+                    command_modules.append(name)
         elapsed_time = timeit.default_timer() - start_time
-        self.INDEX[self._COMMAND_INDEX] = index
+        with self.INDEX.transaction():
+            self.INDEX[self._COMMAND_INDEX_VERSION] = __version__
+            self.INDEX[self._COMMAND_INDEX_CLOUD_PROFILE] = self.cloud_profile
+            self.INDEX[self._COMMAND_INDEX] = index
+            self.INDEX[self._COMMAND_TREE] = command_tree
         logger.debug("Updated command index in %.3f seconds.", elapsed_time)
 
     def invalidate(self):
@@ -613,9 +690,15 @@ class CommandIndex:
 
         This function can be called when removing extensions.
         """
-        self.INDEX[self._COMMAND_INDEX_VERSION] = ""
-        self.INDEX[self._COMMAND_INDEX_CLOUD_PROFILE] = ""
-        self.INDEX[self._COMMAND_INDEX] = {}
+        with self.INDEX.transaction():
+            self.INDEX[self._COMMAND_INDEX_VERSION] = ""
+            self.INDEX[self._COMMAND_INDEX_CLOUD_PROFILE] = ""
+            self.INDEX[self._COMMAND_INDEX] = {}
+            self.INDEX[self._COMMAND_TREE] = {}
+        # The help snapshot and the help index are built with the same set of extensions
+        from azure.cli.core._help import invalidate_help_snapshot, invalidate_help_index
+        invalidate_help_snapshot()
+        invalidate_help_index()
         logger.debug("Command index has been invalidated.")
 
 
@@ -873,6 +956,7 @@ def get_default_cli():
     from azure.cli.core._config import GLOBAL_CONFIG_DIR, ENV_VAR_PREFIX
     from azure.cli.core._help import AzCliHelp
     from azure.cli.core._output import AzOutputProducer
+    from azure.cli.core._query import AzCliQuery
 
     return AzCli(cli_name='az',
                  config_dir=GLOBAL_CONFIG_DIR,
@@ -882,4 +966,5 @@ def get_default_cli():
                  parser_cls=AzCliCommandParser,
                  logging_cls=AzCliLogging,
                  output_cls=AzOutputProducer,
+                 query_cls=AzCliQuery,
                  help_cls=AzCliHelp)
@@ -0,0 +1,186 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Client of the resident `az` process, see azure.cli.core.daemon.
+
+`az` loads this module before anything else, without importing azure.cli.core or knack, so it only depends on the
+standard library. The protocol shared with the resident process lives here too.
+"""
+
+import json
+import logging
+import os
+import socket
+import struct
+import sys
+
+# Like knack.log.get_logger, which can't be imported here
+logger = logging.getLogger('cli.' + __name__)
+
+# Commands that are interactive sessions or replace the installation always run in the calling process
+LOCAL_COMMANDS = ['interactive', 'upgrade', 'feedback']
+
+_SOCKET_FILE = 'daemon.sock'
+_MAX_SOCKET_PATH_LENGTH = 100
+_STDIO_FDS = (0, 1, 2)
+# knack.completion.ARGCOMPLETE_ENV_NAME
+_ARGCOMPLETE_ENV_NAME = '_ARGCOMPLETE'
+# The values of a config boolean which are true, like in knack.config.CLIConfig
+_TRUE_VALUES = ('1', 'yes', 'true', 'on')
+
+_LENGTH = struct.Struct('<I')
+_INT = struct.Struct('<i')
+# Replies of the resident process. Otherwise it replies with the pid of the child running the command.
+_STATUS_RUN_LOCALLY = -1
+_STATUS_RESTARTING = -2
+
+
+def is_daemon_supported():
+    return os.name == 'posix' and hasattr(socket, 'AF_UNIX') and hasattr(socket.socket, 'sendmsg')
+
+
+def get_config_dir():
+    # Like azure.cli.core._environment.get_config_dir
+    return os.getenv('AZURE_CONFIG_DIR', None) or os.path.expanduser(os.path.join('~', '.azure'))
+
+
+def get_socket_path():
+    config_dir = get_config_dir()
+    socket_path = os.path.join(config_dir, _SOCKET_FILE)
+    if len(socket_path) > _MAX_SOCKET_PATH_LENGTH:
+        # Unix socket paths are limited to about 100 characters
+        import hashlib
+        import tempfile
+        socket_path = os.path.join(tempfile.gettempdir(), 'az-{}-{}.sock'.format(
+            os.getuid(), hashlib.sha256(config_dir.encode('utf-8')).hexdigest()[:16]))
+    return socket_path
+
+
+def is_daemon_enabled():
+    """Check `core.use_daemon` in the environment variables and the global config, like knack.config.CLIConfig."""
+    value = os.environ.get('AZURE_CORE_USE_DAEMON')
+    if value is None:
+        import configparser
+        config = configparser.ConfigParser()
+        try:
+            config.read(os.path.join(get_config_dir(), 'config'), encoding='utf-8')
+        except (configparser.Error, UnicodeDecodeError):
+            return False
+        value = config.get('core', 'use_daemon', fallback='false')
+    return value.lower() in _TRUE_VALUES
+
+
+def _receive_exactly(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def _send_int(sock, value):
+    sock.sendall(_INT.pack(value))
+
+
+def _receive_int(sock):
+    data = _receive_exactly(sock, _INT.size)
+    return _INT.unpack(data)[0] if data else None
+
+
+def _send_request(sock, request, fds):
+    import array
+    data = json.dumps(request).encode('utf-8')
+    sock.sendmsg([_LENGTH.pack(len(data))], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array('i', fds))])
+    sock.sendall(data)
+
+
+def _lock_daemon(lock_path):
+    """Lock the resident process, so that only one of them serves a socket. Return the lock file or None."""
+    import fcntl
+    lock_file = open(lock_path, 'a')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def _is_daemon_starting_or_running(socket_path):
+    lock_file = _lock_daemon(socket_path + '.lock')
+    if lock_file is None:
+        return True
+    lock_file.close()
+    return False
+
+
+def start_daemon():
+    """Start the resident process in the background."""
+    import subprocess
+    if _is_daemon_starting_or_running(get_socket_path()):
+        return
+    logger.debug("Starting the az daemon.")
+    subprocess.Popen([sys.executable, '-m', 'azure.cli.core._daemon_main'],  # pylint: disable=consider-using-with
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     close_fds=True, start_new_session=True)
+
+
+def request_daemon(socket_path, args, fds=_STDIO_FDS):
+    """Run `az <args>` in the resident process listening on the socket.
+
+    :return: the exit code, or None if the command must run in the calling process.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        start_daemon()
+        return None
+
+    with sock:
+        try:
+            _send_request(sock, {'argv': list(args), 'cwd': os.getcwd(), 'env': dict(os.environ)}, fds)
+            status = _receive_int(sock)
+        except OSError as ex:
+            logger.debug("Failed to send the command to the az daemon: %s", ex)
+            return None
+        if status is None or status < 0:
+            if status == _STATUS_RESTARTING:
+                logger.debug("The az daemon is restarting.")
+                start_daemon()
+            return None
+
+        child_pid = status
+        while True:
+            try:
+                exit_code = _receive_int(sock)
+                break
+            except KeyboardInterrupt:
+                import signal
+                try:
+                    os.kill(child_pid, signal.SIGINT)
+                except OSError:
+                    pass
+        if exit_code is None:
+            print('The az daemon exited unexpectedly.', file=sys.stderr)
+            return 1
+        return exit_code
+
+
+def run_in_daemon(args):
+    """Run `az <args>` in the resident process if `core.use_daemon` is turned on.
+
+    :return: the exit code, or None if the command must run in the calling process.
+    """
+    if not is_daemon_supported() or _ARGCOMPLETE_ENV_NAME in os.environ:
+        return None
+    if not args or args[0] in LOCAL_COMMANDS:
+        return None
+    if not is_daemon_enabled():
+        return None
+    return request_daemon(get_socket_path(), args)
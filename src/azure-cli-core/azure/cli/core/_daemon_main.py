@@ -0,0 +1,11 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Entry point of the resident `az` process, run with `python -m azure.cli.core._daemon_main`."""
+
+from azure.cli.core.daemon import serve
+
+if __name__ == '__main__':
+    serve()
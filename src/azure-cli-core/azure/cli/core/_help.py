@@ -5,6 +5,8 @@
 
 from __future__ import print_function
 import argparse
+import os
+from collections.abc import Mapping
 
 from azure.cli.core.commands import ExtensionCommandSource
 
@@ -18,6 +20,9 @@ from knack.util import CLIError
 
 logger = get_logger(__name__)
 
+HELP_SNAPSHOT_FILE = 'helpSnapshot.bin'
+HELP_INDEX_FILE = 'helpIndex.bin'
+
 PRIVACY_STATEMENT = """
 Welcome to Azure CLI!
 ---------------------
@@ -47,6 +52,87 @@ Here are the base commands:
 """
 
 
+def _get_help_snapshot_path():
+    from azure.cli.core._environment import get_config_dir
+    return os.path.join(get_config_dir(), HELP_SNAPSHOT_FILE)
+
+
+def get_help_snapshot(cli_ctx):
+    """Get the snapshot of the rendered help of commands and groups, or None if `core.use_help_snapshot` is off.
+
+    The snapshot is only valid for the CLI version, cloud profile and configured defaults it is built with. It is
+    also invalidated together with the command index when extensions are installed, updated or removed. It isn't used
+    when the local context is on, as the defaults shown in the help then depend on the working directory.
+    """
+    if not cli_ctx.config.getboolean('core', 'use_help_snapshot', fallback=False) or cli_ctx.local_context.is_on:
+        return None
+    import hashlib
+    from azure.cli.core import __version__
+    from azure.cli.core._snapshot import Snapshot
+    # The configured defaults, from the environment and the global or local config files, are shown in the help
+    defaults = sorted((item['name'], item['value'])
+                      for item in cli_ctx.config.items(cli_ctx.config.defaults_section_name))
+    defaults_digest = hashlib.sha256(repr(defaults).encode('utf-8')).hexdigest()
+    return Snapshot(_get_help_snapshot_path(), {'version': __version__, 'cloudProfile': cli_ctx.cloud.profile,
+                                                'defaults': defaults_digest})
+
+
+def invalidate_help_snapshot():
+    from azure.cli.core._snapshot import Snapshot
+    Snapshot(_get_help_snapshot_path(), None).invalidate()
+
+
+def _get_help_index_path():
+    from azure.cli.core._environment import get_config_dir
+    return os.path.join(get_config_dir(), HELP_INDEX_FILE)
+
+
+def get_help_index(cli_ctx):
+    """Get the index of the parsed YAML help of commands, groups and help files, or None if `core.use_help_index`
+    is off.
+
+    The records are keyed by command path or help file path. They hold a stamp of the YAML text they are parsed
+    from, which is the modification time and size of a help file or the length of the help text of a command or
+    group, and the digest of the text. The text is only read and hashed when its stamp has changed. The index is
+    only valid for the CLI version it is built with, and it is invalidated together with the command index when
+    extensions are installed, updated or removed.
+    """
+    if not cli_ctx.config.getboolean('core', 'use_help_index', fallback=True):
+        return None
+    from azure.cli.core import __version__
+    from azure.cli.core._snapshot import Snapshot
+    return Snapshot(_get_help_index_path(), {'version': __version__})
+
+
+def invalidate_help_index():
+    from azure.cli.core._snapshot import Snapshot
+    Snapshot(_get_help_index_path(), None).invalidate()
+
+
+def _safe_load_yaml(text):
+    import yaml
+    return yaml.safe_load(text)
+
+
+class _HelpFileContents(Mapping):
+    """The contents of help files, which are only read when they are looked up."""
+
+    def __init__(self, help_ctx, file_names):
+        self._help_ctx = help_ctx
+        self._file_names = list(file_names)
+
+    def __getitem__(self, file_name):
+        if file_name not in self._file_names:
+            raise KeyError(file_name)
+        return self._help_ctx.read_help_file(file_name)
+
+    def __iter__(self):
+        return iter(self._file_names)
+
+    def __len__(self):
+        return len(self._file_names)
+
+
 # PrintMixin class to decouple printing functionality from AZCLIHelp class.
 # Most of these methods override print methods in CLIHelp
 class CLIPrintMixin(CLIHelp):
@@ -160,6 +246,8 @@ class AzCliHelp(CLIPrintMixin, CLIHelp):
 
         self._register_help_loaders()
         self._name_to_content = {}
+        self._help_index = None
+        self._help_index_updates = {}
 
     def show_help(self, cli_name, nouns, parser, is_group):
         self.update_loaders_with_help_file_contents(nouns)
@@ -172,7 +260,45 @@ class AzCliHelp(CLIPrintMixin, CLIHelp):
             help_file.command = ''
         else:
             AzCliHelp.update_examples(help_file)
-        self._print_detailed_help(cli_name, help_file)
+        help_snapshot = get_help_snapshot(self.cli_ctx) if nouns else None
+        if help_snapshot is None:
+            self._print_detailed_help(cli_name, help_file)
+        else:
+            # Keep the rendered help, so that next time it can be shown without loading the command table
+            import contextlib
+            import io
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                self._print_detailed_help(cli_name, help_file)
+            print(output.getvalue(), end='')
+            warnings = []
+            if help_file.type == 'command' and isinstance(help_file.command_source, ExtensionCommandSource):
+                warnings.append(help_file.command_source.get_command_warn_msg())
+            help_snapshot.update({delimiters: {'help': output.getvalue(),
+                                               'warnings': warnings,
+                                               'enableColor': self.cli_ctx.enable_color}})
+        self.save_help_index()
+        self._print_help_footer(nouns)
+
+    def show_help_from_snapshot(self, nouns):
+        """Show the help of a command or group from the help snapshot, without loading the command table.
+
+        :param nouns: the command or group, like ['vm', 'create']
+        :return: True if the help is found in the snapshot and shown.
+        """
+        help_snapshot = get_help_snapshot(self.cli_ctx) if nouns else None
+        if help_snapshot is None:
+            return False
+        record = help_snapshot.get(' '.join(nouns))
+        if not record or record.get('enableColor') != self.cli_ctx.enable_color:
+            return False
+        logger.debug("Showing help of '%s' from the help snapshot.", ' '.join(nouns))
+        for warning in record['warnings']:
+            logger.warning(warning)
+        print(record['help'], end='')
+        self._print_help_footer(nouns)
+        return True
+
+    def _print_help_footer(self, nouns):
         from azure.cli.core.util import show_updates_available
         show_updates_available(new_line_after=True)
         show_link = self.cli_ctx.config.getboolean('output', 'show_survey_link', True)
@@ -208,8 +334,79 @@ class AzCliHelp(CLIPrintMixin, CLIHelp):
                 'description': example.name
             })
 
+        self.save_help_index()
         return examples
 
+    def _get_help_index_record(self, key):
+        if self._help_index is None:
+            help_index = get_help_index(self.cli_ctx)
+            self._help_index = False if help_index is None else help_index
+        if self._help_index is False:
+            return None
+        record = self._help_index_updates.get(key) or self._help_index.get(key)
+        return record if isinstance(record, dict) else None
+
+    def load_help_data(self, key, text, parse=_safe_load_yaml, stamp=None):
+        """Parse the YAML help text of a command, group or help file, or get it from the help index if the same text
+        was parsed before.
+
+        :param key: the command path, like 'vm create', or the path of a help file
+        :param text: the YAML help text
+        :param parse: the function parsing the text
+        :param stamp: the stamp of the text, by default its length
+        """
+        record = self._get_help_index_record(key)
+        if self._help_index is False:
+            return parse(text)
+        stamp = len(text) if stamp is None else stamp
+        if record is not None and record.get('stamp') == stamp:
+            return record['data']
+        import hashlib
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        if record is not None and record.get('digest') == digest:
+            # Only the stamp has changed, like when a help file is touched
+            self._help_index_updates[key] = dict(record, stamp=stamp)
+            return record['data']
+
+        data = parse(text)
+        import marshal
+        try:
+            # Only the built-in types are supported by the index, which YAML timestamps are not
+            marshal.dumps(data)
+            self._help_index_updates[key] = {'stamp': stamp, 'digest': digest, 'data': data}
+        except ValueError:
+            logger.debug("The help of '%s' can't be added to the help index.", key)
+        return data
+
+    def load_help_file_data(self, file_name, parse):
+        """Parse a YAML help file, or get it from the help index without reading the file if it is unchanged.
+
+        :param file_name: the path of the help file
+        :param parse: the function parsing the text of the file
+        """
+        stat = os.stat(file_name)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        record = self._get_help_index_record(file_name)
+        if record is not None and record.get('stamp') == stamp:
+            return record['data']
+        text = self.read_help_file(file_name)
+        return self.load_help_data(file_name, text, parse, stamp) if text else parse(text)
+
+    def read_help_file(self, file_name):
+        if file_name not in self._name_to_content:
+            with open(file_name, 'r') as f:
+                self._name_to_content[file_name] = f.read()
+        return self._name_to_content[file_name]
+
+    def save_help_index(self):
+        # The index is only written when a record has actually changed
+        updates = {key: record for key, record in self._help_index_updates.items()
+                   if self._help_index.get(key) != record}
+        self._help_index_updates = {}
+        if updates:
+            logger.debug("Adding %d records to the help index.", len(updates))
+            self._help_index.update(updates)
+
     def _register_help_loaders(self):
         import azure.cli.core._help_loaders as help_loaders
         import inspect
@@ -230,22 +427,13 @@ class AzCliHelp(CLIPrintMixin, CLIHelp):
 
     def update_loaders_with_help_file_contents(self, nouns):
         loader_file_names_dict = {}
-        file_name_set = set()
         for ldr_cls_name, loader in self.versioned_loaders.items():
             new_file_names = loader.get_noun_help_file_names(nouns) or []
             loader_file_names_dict[ldr_cls_name] = new_file_names
-            file_name_set.update(new_file_names)
-
-        for file_name in file_name_set:
-            if file_name not in self._name_to_content:
-                with open(file_name, 'r') as f:
-                    self._name_to_content[file_name] = f.read()
 
         for ldr_cls_name, file_names in loader_file_names_dict.items():
-            file_contents = {}
-            for name in file_names:
-                file_contents[name] = self._name_to_content[name]
-            self.versioned_loaders[ldr_cls_name].update_file_contents(file_contents)
+            # The files are only read when their contents are looked up, as the loaders may get them from the index
+            self.versioned_loaders[ldr_cls_name].update_file_contents(_HelpFileContents(self, file_names))
 
     # This method is meant to be a hook that can be overridden by an extension or module.
     @staticmethod
@@ -260,6 +448,19 @@ class CliHelpFile(KnackHelpFile):
         super(CliHelpFile, self).__init__(help_ctx, delimiters)
         self.links = []
 
+    def _load_help_file_from_string(self, text):  # pylint: disable=arguments-differ
+        if not text or not isinstance(text, str):
+            return super(CliHelpFile, self)._load_help_file_from_string(text)
+        return self.help_ctx.load_help_data(self.delimiters, text,
+                                            KnackHelpFile._load_help_file_from_string)  # pylint: disable=protected-access
+
+    def _load_from_file(self):
+        from knack.help_files import helps
+        text = helps.get(self.delimiters)
+        file_data = self.help_ctx.load_help_data(self.delimiters, text) if text else None
+        if file_data:
+            self._load_from_data(file_data)
+
     def _should_include_example(self, ex):
         supported_profiles = ex.get('supported-profiles')
         unsupported_profiles = ex.get('unsupported-profiles')
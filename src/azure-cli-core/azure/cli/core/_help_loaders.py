@@ -11,8 +11,6 @@ from azure.cli.core._help import (HelpExample, CliHelpFile)
 from knack.util import CLIError
 from knack.log import get_logger
 
-import yaml
-
 logger = get_logger(__name__)
 
 try:
@@ -97,6 +95,9 @@ class BaseHelpLoader(ABC):
 class YamlLoaderMixin:  # pylint:disable=too-few-public-methods
     """A class containing helper methods for Yaml Loaders."""
 
+    # the help files of the loader directories, which are listed once per process
+    _dir_help_files = {}
+
     # get the list of yaml help file names for the command or group
     @staticmethod
     def _get_yaml_help_files_list(nouns, cmd_loader_map_ref):
@@ -123,11 +124,11 @@ class YamlLoaderMixin:  # pylint:disable=too-few-public-methods
             for loader in loaders:
                 loader_file_path = inspect.getfile(loader.__class__)
                 dir_name = os.path.dirname(loader_file_path)
-                files = os.listdir(dir_name)
-                for file in files:
-                    if file.endswith("help.yaml") or file.endswith("help.yml"):
-                        help_file_path = os.path.join(dir_name, file)
-                        results.append(help_file_path)
+                if dir_name not in YamlLoaderMixin._dir_help_files:
+                    YamlLoaderMixin._dir_help_files[dir_name] = [
+                        os.path.join(dir_name, file) for file in os.listdir(dir_name)
+                        if file.endswith("help.yaml") or file.endswith("help.yml")]
+                results.extend(YamlLoaderMixin._dir_help_files[dir_name])
         return results
 
     @staticmethod
@@ -138,6 +139,7 @@ class YamlLoaderMixin:  # pylint:disable=too-few-public-methods
         if not text:
             raise CLIError("No content passed for {}.".format(pretty_file_path))
 
+        import yaml
         try:
             return yaml.safe_load(text)
         except yaml.YAMLError as e:
@@ -185,8 +187,8 @@ class HelpLoaderV1(BaseHelpLoader, YamlLoaderMixin):
     def update_file_contents(self, file_contents):
         for file_name in file_contents:
             if file_name not in self._file_content_dict:
-                data_dict = {file_name: self._parse_yaml_from_string(file_contents[file_name], file_name)}
-                self._file_content_dict.update(data_dict)
+                self._file_content_dict[file_name] = self.help_ctx.load_help_file_data(
+                    file_name, lambda t, f=file_name: self._parse_yaml_from_string(t, f))
 
     def load_entry_data(self, help_obj, parser):
         prog = parser.prog if hasattr(parser, "prog") else parser._prog_prefix  # pylint: disable=protected-access
@@ -3,7 +3,10 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import errno
+
 import knack.output
+from knack.util import CommandResultItem
 
 
 class AzOutputProducer(knack.output.OutputProducer):
@@ -11,6 +14,56 @@ class AzOutputProducer(knack.output.OutputProducer):
     def check_valid_format_type(self, format_type):
         return format_type in self._FORMAT_DICT
 
+    def out(self, obj, formatter=None, out_file=None):
+        from azure.cli.core.commands.streaming import StreamedResult
+        if not isinstance(obj.result, StreamedResult):
+            return super(AzOutputProducer, self).out(obj, formatter=formatter, out_file=out_file)
+
+        stream_formatter = _STREAM_FORMAT_DICT.get(formatter)
+        if stream_formatter is None:
+            obj.result = list(obj.result)
+            return super(AzOutputProducer, self).out(obj, formatter=formatter, out_file=out_file)
+        for chunk in stream_formatter(obj.result):
+            try:
+                print(chunk, file=out_file, end='', flush=True)
+            except IOError as ex:
+                if ex.errno == errno.EPIPE:
+                    return None
+                raise
+        return None
+
+
+def _stream_json(items):
+    """Write the items as a JSON array, exactly like the json output format does."""
+    from azure.cli.core.commands import streaming
+    separator = '[\n'
+    for chunk in streaming.iter_chunks(items, streaming.STREAM_CHUNK_SIZE):
+        chunk_json = knack.output.format_json(CommandResultItem(chunk))
+        # Strip the brackets of the chunk array, so that the chunks make a single array
+        yield separator + chunk_json[2:-3]
+        separator = ',\n'
+    yield '[]\n' if separator == '[\n' else '\n]\n'
+
+
+def _stream_tsv(items):
+    from azure.cli.core.commands import streaming
+    for chunk in streaming.iter_chunks(items, streaming.STREAM_CHUNK_SIZE):
+        yield knack.output.format_tsv(CommandResultItem(chunk))
+
+
+def _stream_none(items):
+    # The items are still retrieved, so that errors are reported
+    for _ in items:
+        pass
+    return []
+
+
+_STREAM_FORMAT_DICT = {
+    knack.output.format_json: _stream_json,
+    knack.output.format_tsv: _stream_tsv,
+    knack.output.format_none: _stream_none,
+}
+
 
 def get_output_format(cli_ctx):
     return cli_ctx.invocation.data.get("output", None)
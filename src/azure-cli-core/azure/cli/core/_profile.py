@@ -12,6 +12,7 @@ import os
 import os.path
 import re
 import string
+from contextlib import contextmanager
 from copy import deepcopy
 from enum import Enum
 
@@ -68,6 +69,8 @@ TOKEN_FIELDS_EXCLUDED_FROM_PERSISTENCE = ['familyName',
 
 _CLIENT_ID = '04b07795-8ddb-461a-bbee-02f9e1bf7b46'
 _COMMON_TENANT = 'common'
+# Tokens which expire within this number of seconds are refreshed
+_DEFAULT_TOKEN_REFRESH_WINDOW = 600
 
 _TENANT_LEVEL_ACCOUNT_NAME = 'N/A(tenant level account)'
 
@@ -118,6 +121,29 @@ def _load_tokens_from_file(file_path):
     return []
 
 
+def _get_token_key(entry):
+    # The key of the tokens in the ADAL token cache
+    return tuple((entry.get(x) or '').lower() for x in ('_authority', 'resource', '_clientId', _TOKEN_ENTRY_USER_ID))
+
+
+def _get_token_index_key(authority, resource, username):
+    return (authority or '').lower(), resource or '', (username or '').lower()
+
+
+def _is_unexpired(entry):
+    import datetime
+    from dateutil import parser
+    try:
+        expires_on = parser.parse(entry['expiresOn'])
+    except (KeyError, ValueError, OverflowError):
+        return False
+    return datetime.datetime.now(expires_on.tzinfo) < expires_on
+
+
+def _get_service_principal_key(entry):
+    return entry.get(_SERVICE_PRINCIPAL_ID), entry.get(_SERVICE_PRINCIPAL_TENANT)
+
+
 def _delete_file(file_path):
     try:
         os.remove(file_path)
@@ -1020,9 +1046,14 @@ class SubscriptionFinder:
         return client_type
 
 
-class CredsCache:
+class CredsCache:  # pylint: disable=too-many-instance-attributes
     '''Caches AAD tokena and service principal secrets, and persistence will
     also be handled
+
+    The token file is shared by all the az processes. It is written under a lock file, with the changes made by this
+    process merged into the latest content of the file, and atomically replaced. Tokens which expire within
+    `core.token_refresh_window` seconds are refreshed under the lock, after reloading the file, so that concurrent
+    processes refresh a token only once.
     '''
 
     def __init__(self, cli_ctx, auth_ctx_factory=None, async_persist=True):
@@ -1035,42 +1066,177 @@ class CredsCache:
         self._should_flush_to_disk = False
         self._async_persist = async_persist
         self._ctx = cli_ctx
+        # Content of the token file when it was last read or written, to find the changes made by this process
+        self._persisted_tokens = {}
+        self._persisted_service_principal_creds = {}
+        # Valid tokens by (authority, resource, user), and the authentication contexts by tenant
+        self._token_index = None
+        self._auth_contexts = {}
         if async_persist:
             import atexit
             atexit.register(self.flush_to_disk)
 
     def persist_cached_creds(self):
         self._should_flush_to_disk = True
+        self._token_index = None
         if not self._async_persist:
             self.flush_to_disk()
         self.adal_token_cache.has_state_changed = False
 
     def flush_to_disk(self):
         if self._should_flush_to_disk:
-            with os.fdopen(os.open(self._token_file, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600),
-                           'w+') as cred_file:
-                items = self.adal_token_cache.read_items()
-                all_creds = [entry for _, entry in items]
-
-                # trim away useless fields (needed for cred sharing with xplat)
-                for i in all_creds:
-                    for key in TOKEN_FIELDS_EXCLUDED_FROM_PERSISTENCE:
-                        i.pop(key, None)
+            with self._lock_token_file():
+                self._sync_with_token_file()
+
+    @contextmanager
+    def _lock_token_file(self):
+        import portalocker
+        with open(self._token_file + '.lock', 'a') as lock_file:
+            portalocker.lock(lock_file, portalocker.LOCK_EX)
+            try:
+                yield
+            finally:
+                portalocker.unlock(lock_file)
+
+    def _sync_with_token_file(self):
+        """Merge the changes made by this process into the content of the token file, write it if it differs and
+        load it. The token file must be locked."""
+        all_entries = _load_tokens_from_file(self._token_file)
+        tokens = collections.OrderedDict((_get_token_key(x), x) for x in all_entries
+                                         if not x.get(_SERVICE_PRINCIPAL_ID))
+        sp_creds = collections.OrderedDict((_get_service_principal_key(x), x) for x in all_entries
+                                           if x.get(_SERVICE_PRINCIPAL_ID))
+
+        # trim away useless fields (needed for cred sharing with xplat)
+        current_tokens = {}
+        for _, entry in self.adal_token_cache.read_items():
+            for key in TOKEN_FIELDS_EXCLUDED_FROM_PERSISTENCE:
+                entry.pop(key, None)
+            current_tokens[_get_token_key(entry)] = entry
+        current_sp_creds = {_get_service_principal_key(x): x for x in self._service_principal_creds}
+
+        changed = False
+        for merged, current, persisted in ((tokens, current_tokens, self._persisted_tokens),
+                                           (sp_creds, current_sp_creds, self._persisted_service_principal_creds)):
+            for key in persisted:
+                if key not in current and merged.pop(key, None) is not None:
+                    changed = True
+            for key, entry in current.items():
+                if persisted.get(key) != entry and merged.get(key) != entry:
+                    merged[key] = entry
+                    changed = True
+
+        all_creds = list(tokens.values()) + list(sp_creds.values())
+        if changed:
+            self._write_tokens(all_creds)
+        self._should_flush_to_disk = False
 
-                all_creds.extend(self._service_principal_creds)
+        # Also pick up the tokens written by other processes
+        self.adal_token_cache.deserialize(json.dumps(list(tokens.values())))
+        self.adal_token_cache.has_state_changed = False
+        self._service_principal_creds = list(sp_creds.values())
+        self._persisted_tokens = deepcopy(tokens)
+        self._persisted_service_principal_creds = deepcopy(sp_creds)
+        self._token_index = None
+
+    def _write_tokens(self, all_creds):
+        # Write to a temp file first, so that readers never see a partially written file
+        temp_file = '{}.{}.tmp'.format(self._token_file, os.getpid())
+        try:
+            with os.fdopen(os.open(temp_file, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600), 'w+') as cred_file:
                 cred_file.write(json.dumps(all_creds))
+            os.replace(temp_file, self._token_file)
+        except BaseException:
+            _delete_file(temp_file)
+            raise
 
-    def retrieve_token_for_user(self, username, tenant, resource):
-        context = self._auth_ctx_factory(self._ctx, tenant, cache=self.adal_token_cache)
-        token_entry = context.acquire_token(resource, username, _CLIENT_ID)
-        if not token_entry:
-            raise CLIError("Could not retrieve token from local cache.{}".format(
-                " Please run 'az login'." if not in_cloud_console() else ''))
+    def _find_valid_token(self, authority, resource, username):
+        """Find a cached token which is valid for more than `core.token_refresh_window` seconds."""
+        import datetime
+        from dateutil import parser
+        if self._token_index is None:
+            self._token_index = {}
+            for _, entry in self.adal_token_cache.read_items():
+                if entry.get('_clientId') == _CLIENT_ID and entry.get(_ACCESS_TOKEN) and entry.get('expiresOn'):
+                    self._token_index[_get_token_index_key(entry.get('_authority'), entry.get('resource'),
+                                                           entry.get(_TOKEN_ENTRY_USER_ID))] = entry
+        entry = self._token_index.get(_get_token_index_key(authority, resource, username))
+        if entry is None:
+            return None
+        try:
+            expires_on = parser.parse(entry['expiresOn'])
+        except (ValueError, OverflowError):
+            return None
+        refresh_window = self._ctx.config.getint('core', 'token_refresh_window', _DEFAULT_TOKEN_REFRESH_WINDOW)
+        if datetime.datetime.now(expires_on.tzinfo) + datetime.timedelta(seconds=refresh_window) >= expires_on:
+            return None
+        return entry
 
-        if self.adal_token_cache.has_state_changed:
-            self.persist_cached_creds()
+    def _get_auth_context(self, tenant):
+        try:
+            return self._auth_contexts[tenant]
+        except KeyError:
+            context = self._auth_ctx_factory(self._ctx, tenant, cache=self.adal_token_cache)
+            self._auth_contexts[tenant] = context
+            return context
+
+    def retrieve_token_for_user(self, username, tenant, resource):
+        authority, _ = _get_authority_url(self._ctx, tenant)
+        self.load_adal_token_cache()
+        if not self.adal_token_cache.has_state_changed:
+            token_entry = self._find_valid_token(authority, resource, username)
+            if token_entry:
+                return (token_entry[_TOKEN_ENTRY_TOKEN_TYPE], token_entry[_ACCESS_TOKEN], token_entry)
+
+        with self._lock_token_file():
+            # Another process may have refreshed the token already
+            self._sync_with_token_file()
+            token_entry = self._find_valid_token(authority, resource, username)
+            if token_entry:
+                return (token_entry[_TOKEN_ENTRY_TOKEN_TYPE], token_entry[_ACCESS_TOKEN], token_entry)
+
+            context = self._get_auth_context(tenant)
+            expiring_entry = self._expire_cached_token(authority, resource, username)
+            try:
+                token_entry = context.acquire_token(resource, username, _CLIENT_ID)
+            except Exception as ex:  # pylint: disable=broad-except
+                if expiring_entry:
+                    self._restore_cached_token(expiring_entry)
+                if not expiring_entry or not _is_unexpired(expiring_entry):
+                    raise
+                # The token is still valid, it can be refreshed later
+                logger.debug("Failed to refresh the token before its expiry: %s", ex)
+                token_entry = expiring_entry
+            if not token_entry:
+                raise CLIError("Could not retrieve token from local cache.{}".format(
+                    " Please run 'az login'." if not in_cloud_console() else ''))
+
+            if self.adal_token_cache.has_state_changed:
+                # Write the refreshed token before releasing the lock, for the other processes to use it
+                self._should_flush_to_disk = True
+                self._sync_with_token_file()
         return (token_entry[_TOKEN_ENTRY_TOKEN_TYPE], token_entry[_ACCESS_TOKEN], token_entry)
 
+    def _expire_cached_token(self, authority, resource, username):
+        """Mark a token which expires within `core.token_refresh_window` seconds as expired, for ADAL to refresh it
+        now rather than within its own 5 minutes window. Return the original token."""
+        import datetime
+        index_key = _get_token_index_key(authority, resource, username)
+        for _, entry in list(self.adal_token_cache.read_items()):
+            if (entry.get('_clientId') == _CLIENT_ID and entry.get(_REFRESH_TOKEN) and entry.get('expiresOn') and
+                    _get_token_index_key(entry.get('_authority'), entry.get('resource'),
+                                         entry.get(_TOKEN_ENTRY_USER_ID)) == index_key):
+                expired_entry = dict(entry, expiresOn=str(datetime.datetime.now()))
+                self.adal_token_cache.remove([entry])
+                self.adal_token_cache.add([expired_entry])
+                self.adal_token_cache.has_state_changed = False
+                return entry
+        return None
+
+    def _restore_cached_token(self, entry):
+        self.adal_token_cache.add([entry])
+        self.adal_token_cache.has_state_changed = False
+
     def retrieve_msal_token(self, tenant, scopes, data, refresh_token):
         """
         This is added only for vmssh feature.
@@ -1127,6 +1293,9 @@ class CredsCache:
             self._load_service_principal_creds(all_entries)
             real_token = [x for x in all_entries if x not in self._service_principal_creds]
             self._adal_token_cache_attr = adal.TokenCache(json.dumps(real_token))
+            self._persisted_tokens = {_get_token_key(x): deepcopy(x) for x in real_token}
+            self._persisted_service_principal_creds = {_get_service_principal_key(x): deepcopy(x)
+                                                       for x in self._service_principal_creds}
         return self._adal_token_cache_attr
 
     def save_service_principal_cred(self, sp_entry):
@@ -0,0 +1,415 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Evaluation of `--query` JMESPath expressions.
+
+The parsed expression is compiled into nested Python functions, one per node of the expression, which are evaluated
+without the per-node dispatch of the JMESPath tree interpreter. Common shapes like field paths, `[?field=='value']`
+filters and `{a: x, b: y.z}` multi-selects get specialized functions. Expressions with node types the compiler
+doesn't know, and searches with custom functions, are evaluated by the JMESPath tree interpreter.
+"""
+
+from numbers import Number
+
+from knack.events import EVENT_INVOKER_POST_PARSE_ARGS, EVENT_PARSER_GLOBAL_CREATE
+from knack.log import get_logger
+from knack.query import CLIQuery
+
+logger = get_logger(__name__)
+
+
+class AzCliQuery(CLIQuery):
+
+    def __init__(self, cli_ctx=None):  # pylint: disable=super-init-not-called
+        # CLIQuery registers its own `jmespath_type`, so the handlers are registered here instead
+        from azure.cli.core import AzCli
+        from knack.util import CtxTypeError
+        if cli_ctx is not None and not isinstance(cli_ctx, AzCli):
+            raise CtxTypeError(cli_ctx)
+        self.cli_ctx = cli_ctx
+        self.cli_ctx.register_event(EVENT_PARSER_GLOBAL_CREATE, AzCliQuery.on_global_arguments)
+        self.cli_ctx.register_event(EVENT_INVOKER_POST_PARSE_ARGS, CLIQuery.handle_query_parameter)
+
+    @staticmethod
+    def jmespath_type(raw_query):
+        """Compile the query and return the compiled query.
+        JMESPath raises exceptions which subclass from ValueError, which argparse turns into argument errors.
+        """
+        try:
+            return compile_query(raw_query)
+        except KeyError:
+            # Raise a ValueError which argparse can handle
+            raise ValueError
+
+    @staticmethod
+    def on_global_arguments(_, **kwargs):
+        arg_group = kwargs.get('arg_group')
+        arg_group.add_argument('--query', dest='_jmespath_query', metavar='JMESPATH',
+                               help='JMESPath query string. See http://jmespath.org/ for more'
+                                    ' information and examples.',
+                               type=AzCliQuery.jmespath_type)
+
+
+def compile_query(expression):
+    """Parse a JMESPath expression and return a `CompiledQuery`. Parsed expressions are cached by JMESPath."""
+    from jmespath.parser import Parser
+    return CompiledQuery(expression, Parser().parse(expression).parsed)
+
+
+class CompiledQuery:
+    """A JMESPath expression compiled into Python functions. It can be used like `jmespath.parser.ParsedResult`."""
+
+    def __init__(self, expression, parsed):
+        self.expression = expression
+        self.parsed = parsed
+        self._evaluators = {}
+
+    def search(self, value, options=None):
+        dict_cls = options.dict_cls if options is not None else None
+        if options is not None and options.custom_functions is not None:
+            return self._interpret(value, options)
+        try:
+            evaluate = self._evaluators[dict_cls]
+        except KeyError:
+            try:
+                evaluate = _compile(self.parsed, dict_cls or dict)
+            except _UnsupportedNodeError as ex:
+                logger.debug("Query '%s' is interpreted: %s", self.expression, ex)
+                evaluate = None
+            self._evaluators[dict_cls] = evaluate
+        if evaluate is None:
+            return self._interpret(value, options)
+        return evaluate(value)
+
+    def _interpret(self, value, options):
+        from jmespath.parser import ParsedResult
+        return ParsedResult(self.expression, self.parsed).search(value, options=options)
+
+    def __str__(self):
+        return self.expression
+
+
+class _UnsupportedNodeError(Exception):
+    pass
+
+
+class _Expression:  # pylint: disable=too-few-public-methods
+    # The JMESPath functions taking an expression, like sort_by(), call `expref.visit(expref.expression, value)`.
+    # They check the type of the argument by the class name, hence the name of the class.
+
+    def __init__(self, evaluate, expression):
+        self._evaluate = evaluate
+        self.expression = expression
+
+    def visit(self, _, value):
+        return self._evaluate(value)
+
+
+_FUNCTIONS = None
+
+
+def _get_functions():
+    global _FUNCTIONS  # pylint: disable=global-statement
+    if _FUNCTIONS is None:
+        from jmespath.functions import Functions
+        _FUNCTIONS = Functions()
+    return _FUNCTIONS
+
+
+def _is_actual_number(x):
+    return not isinstance(x, bool) and isinstance(x, Number)
+
+
+def _is_comparable(x):
+    return _is_actual_number(x) or isinstance(x, str)
+
+
+def _equals(x, y):
+    # 0 and 1 are not equal to False and True in JMESPath
+    if _is_actual_number(x) and x in (0, 1):
+        if isinstance(y, bool):
+            return False
+    elif _is_actual_number(y) and y in (0, 1):
+        if isinstance(x, bool):
+            return False
+    return x == y
+
+
+def _is_false(value):
+    return value == '' or value == [] or value == {} or value is None or value is False
+
+
+def _get(value, key):
+    try:
+        return value.get(key)
+    except AttributeError:
+        return None
+
+
+def _compile(node, dict_cls):
+    try:
+        compiler = _COMPILERS[node['type']]
+    except KeyError:
+        raise _UnsupportedNodeError(node['type'])
+    return compiler(node, dict_cls)
+
+
+def _compile_identity(*_):
+    return _identity
+
+
+def _identity(value):
+    return value
+
+
+def _compile_literal(node, _):
+    literal = node['value']
+    return lambda _: literal
+
+
+def _compile_field(node, _):
+    key = node['value']
+
+    def _field(value):
+        if isinstance(value, dict):
+            return value.get(key)
+        return _get(value, key)
+    return _field
+
+
+def _compile_chain(node, dict_cls):
+    """Compile a subexpression, an index expression or a pipe, which apply their children one after the other."""
+    children = node['children']
+    if all(child['type'] == 'field' for child in children):
+        keys = tuple(child['value'] for child in children)
+
+        def _path(value):
+            for key in keys:
+                value = value.get(key) if isinstance(value, dict) else _get(value, key)
+            return value
+        return _path
+
+    evaluators = [_compile(child, dict_cls) for child in children]
+
+    def _chain(value):
+        for evaluate in evaluators:
+            value = evaluate(value)
+        return value
+    return _chain
+
+
+def _compile_index(node, _):
+    index = node['value']
+
+    def _index(value):
+        if not isinstance(value, list):
+            return None
+        try:
+            return value[index]
+        except IndexError:
+            return None
+    return _index
+
+
+def _compile_slice(node, _):
+    s = slice(*node['children'])
+    return lambda value: value[s] if isinstance(value, list) else None
+
+
+def _compile_comparator(node, dict_cls):
+    op = node['value']
+    left_node, right_node = node['children']
+    left, right = _compile(left_node, dict_cls), _compile(right_node, dict_cls)
+    if op in ('eq', 'ne'):
+        if right_node['type'] == 'literal' and isinstance(right_node['value'], str):
+            # field == 'value', where the special cases of numbers don't apply
+            literal = right_node['value']
+            if op == 'eq':
+                return lambda value: left(value) == literal
+            return lambda value: left(value) != literal
+        if op == 'eq':
+            return lambda value: _equals(left(value), right(value))
+        return lambda value: not _equals(left(value), right(value))
+
+    import operator
+    func = {'lt': operator.lt, 'gt': operator.gt, 'lte': operator.le, 'gte': operator.ge}[op]
+
+    def _compare(value):
+        x, y = left(value), right(value)
+        if not (_is_comparable(x) and _is_comparable(y)):
+            return None
+        return func(x, y)
+    return _compare
+
+
+def _compile_projection(node, dict_cls):
+    left, right = _compile(node['children'][0], dict_cls), _compile(node['children'][1], dict_cls)
+
+    def _projection(value):
+        base = left(value)
+        if not isinstance(base, list):
+            return None
+        collected = []
+        for element in base:
+            current = right(element)
+            if current is not None:
+                collected.append(current)
+        return collected
+    return _projection
+
+
+def _compile_value_projection(node, dict_cls):
+    left, right = _compile(node['children'][0], dict_cls), _compile(node['children'][1], dict_cls)
+
+    def _value_projection(value):
+        base = left(value)
+        try:
+            base = base.values()
+        except AttributeError:
+            return None
+        collected = []
+        for element in base:
+            current = right(element)
+            if current is not None:
+                collected.append(current)
+        return collected
+    return _value_projection
+
+
+def _compile_filter_projection(node, dict_cls):
+    left_node, right_node, condition_node = node['children']
+    left, condition = _compile(left_node, dict_cls), _compile(condition_node, dict_cls)
+    right = None if right_node['type'] == 'identity' else _compile(right_node, dict_cls)
+
+    def _filter_projection(value):
+        base = left(value)
+        if not isinstance(base, list):
+            return None
+        collected = []
+        for element in base:
+            matched = condition(element)
+            if matched is True or (matched is not False and not _is_false(matched)):
+                current = element if right is None else right(element)
+                if current is not None:
+                    collected.append(current)
+        return collected
+    return _filter_projection
+
+
+def _compile_flatten(node, dict_cls):
+    child = _compile(node['children'][0], dict_cls)
+
+    def _flatten(value):
+        base = child(value)
+        if not isinstance(base, list):
+            return None
+        merged_list = []
+        for element in base:
+            if isinstance(element, list):
+                merged_list.extend(element)
+            else:
+                merged_list.append(element)
+        return merged_list
+    return _flatten
+
+
+def _compile_multi_select_dict(node, dict_cls):
+    pairs = [(child['value'], _compile(child['children'][0], dict_cls)) for child in node['children']]
+
+    def _multi_select_dict(value):
+        if value is None:
+            return None
+        collected = dict_cls()
+        for key, evaluate in pairs:
+            collected[key] = evaluate(value)
+        return collected
+    return _multi_select_dict
+
+
+def _compile_multi_select_list(node, dict_cls):
+    evaluators = [_compile(child, dict_cls) for child in node['children']]
+    return lambda value: None if value is None else [evaluate(value) for evaluate in evaluators]
+
+
+def _compile_or_expression(node, dict_cls):
+    left, right = (_compile(child, dict_cls) for child in node['children'])
+
+    def _or_expression(value):
+        matched = left(value)
+        if _is_false(matched):
+            matched = right(value)
+        return matched
+    return _or_expression
+
+
+def _compile_and_expression(node, dict_cls):
+    left, right = (_compile(child, dict_cls) for child in node['children'])
+
+    def _and_expression(value):
+        matched = left(value)
+        if _is_false(matched):
+            return matched
+        return right(value)
+    return _and_expression
+
+
+def _compile_not_expression(node, dict_cls):
+    child = _compile(node['children'][0], dict_cls)
+
+    def _not_expression(value):
+        original_result = child(value)
+        if _is_actual_number(original_result) and original_result == 0:
+            # !0 is false, as 0 is not a falsy value in JMESPath
+            return False
+        return not original_result
+    return _not_expression
+
+
+def _compile_function_expression(node, dict_cls):
+    name = node['value']
+    args = [_compile(child, dict_cls) for child in node['children']]
+    functions = _get_functions()
+    if name == 'length' and len(args) == 1:
+        arg = args[0]
+
+        def _length(value):
+            current = arg(value)
+            if isinstance(current, (list, dict, str)):
+                return len(current)
+            # Let JMESPath report the invalid type
+            return functions.call_function(name, [current])
+        return _length
+    return lambda value: functions.call_function(name, [arg(value) for arg in args])
+
+
+def _compile_expref(node, dict_cls):
+    expression = node['children'][0]
+    expref = _Expression(_compile(expression, dict_cls), expression)
+    return lambda _: expref
+
+
+_COMPILERS = {
+    'identity': _compile_identity,
+    'current': _compile_identity,
+    'literal': _compile_literal,
+    'field': _compile_field,
+    'subexpression': _compile_chain,
+    'index_expression': _compile_chain,
+    'pipe': _compile_chain,
+    'index': _compile_index,
+    'slice': _compile_slice,
+    'comparator': _compile_comparator,
+    'projection': _compile_projection,
+    'value_projection': _compile_value_projection,
+    'filter_projection': _compile_filter_projection,
+    'flatten': _compile_flatten,
+    'multi_select_dict': _compile_multi_select_dict,
+    'multi_select_list': _compile_multi_select_list,
+    'or_expression': _compile_or_expression,
+    'and_expression': _compile_and_expression,
+    'not_expression': _compile_not_expression,
+    'function_expression': _compile_function_expression,
+    'expref': _compile_expref,
+}
@@ -7,6 +7,7 @@ import json
 import logging
 import os
 import time
+from contextlib import contextmanager
 
 try:
     import collections.abc as collections
@@ -29,6 +30,10 @@ class Session(collections.MutableMapping):
 
     All direct modifications will save the file. Indirect modifications should
     be followed by a call to `save_with_retry` or `save`.
+
+    Direct modifications only write the keys they set or delete on top of the latest content of the file, so the
+    keys written by concurrent processes are kept. Use `transaction` to save several direct modifications at once.
+    Writes are atomic and serialized across processes with a lock file.
     """
 
     def __init__(self, encoding=None):
@@ -36,10 +41,15 @@ class Session(collections.MutableMapping):
         self.filename = None
         self.data = {}
         self._encoding = encoding if encoding else 'utf-8-sig'
+        self._changed_keys = set()
+        self._deleted_keys = set()
+        self._transaction_depth = 0
 
     def load(self, filename, max_age=0):
         self.filename = filename
         self.data = {}
+        self._changed_keys.clear()
+        self._deleted_keys.clear()
         try:
             if max_age > 0:
                 st = os.stat(self.filename)
@@ -58,12 +68,18 @@ class Session(collections.MutableMapping):
             get_logger(__name__).log(log_level,
                                      "Failed to load or parse file %s. It will be overridden by default settings.",
                                      self.filename)
-            self.save()
+            with self._lock():
+                # Keep the file if another process has just written it
+                self.data = self._read()
+                self._write(self.data)
 
     def save(self):
+        """Save all the data, overwriting the content of the file."""
         if self.filename:
-            with codecs_open(self.filename, 'w', encoding=self._encoding) as f:
-                json.dump(self.data, f)
+            with self._lock():
+                self._write(self.data)
+            self._changed_keys.clear()
+            self._deleted_keys.clear()
 
     def save_with_retry(self, retries=5):
         for _ in range(retries - 1):
@@ -75,6 +91,92 @@ class Session(collections.MutableMapping):
         else:
             self.save()
 
+    @contextmanager
+    def transaction(self):
+        """Defer saving the keys set or deleted in the block, then save them all in a single write.
+
+        If the block raises, none of its changes are saved and the data is loaded again from the file.
+        """
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if not self._transaction_depth:
+                self._discard_changes()
+            raise
+        self._transaction_depth -= 1
+        if not self._transaction_depth:
+            self._save_changes_with_retry()
+
+    def _discard_changes(self):
+        self._changed_keys.clear()
+        self._deleted_keys.clear()
+        if self.filename:
+            self.data = self._read()
+
+    def _save_changes(self):
+        with self._lock():
+            data = self._read()
+            for key in self._deleted_keys:
+                data.pop(key, None)
+            for key in self._changed_keys:
+                data[key] = self.data[key]
+            self._write(data)
+        # Also pick up the keys added by other processes, keeping the unsaved indirect modifications of the others
+        for key, value in data.items():
+            self.data.setdefault(key, value)
+        self._changed_keys.clear()
+        self._deleted_keys.clear()
+
+    def _save_changes_with_retry(self, retries=5):
+        if not self.filename or self._transaction_depth or not (self._changed_keys or self._deleted_keys):
+            return
+        for _ in range(retries - 1):
+            try:
+                self._save_changes()
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            self._save_changes()
+
+    @contextmanager
+    def _lock(self):
+        import portalocker
+        with open(self.filename + '.lock', 'a') as lock_file:
+            portalocker.lock(lock_file, portalocker.LOCK_EX)
+            try:
+                yield
+            finally:
+                portalocker.unlock(lock_file)
+
+    def _read(self):
+        try:
+            with codecs_open(self.filename, 'r', encoding=self._encoding) as f:
+                data = json.load(f)
+        except (OSError, IOError, t_JSONDecodeError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write(self, data):
+        # Write to a temp file first, so that readers never see a partially written file
+        import stat
+        import tempfile
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.filename) or None,
+                                         prefix=os.path.basename(self.filename), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding=self._encoding) as f:
+                json.dump(data, f)
+            try:
+                os.chmod(temp_path, stat.S_IMODE(os.stat(self.filename).st_mode))
+            except OSError:
+                pass
+            os.replace(temp_path, self.filename)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
     def get(self, key, default=None):
         return self.data.get(key, default)
 
@@ -83,11 +185,15 @@ class Session(collections.MutableMapping):
 
     def __setitem__(self, key, value):
         self.data[key] = value
-        self.save_with_retry()
+        self._changed_keys.add(key)
+        self._deleted_keys.discard(key)
+        self._save_changes_with_retry()
 
     def __delitem__(self, key):
         del self.data[key]
-        self.save_with_retry()
+        self._deleted_keys.add(key)
+        self._changed_keys.discard(key)
+        self._save_changes_with_retry()
 
     def __iter__(self):
         return iter(self.data)
@@ -114,6 +220,9 @@ INDEX = Session()
 # an upgrade of azure-cli happens
 VERSIONS = Session()
 
+# EXTENSION_REGISTRY caches the metadata of the installed wheel extensions
+EXTENSION_REGISTRY = Session()
+
 # EXT_CMD_TREE provides command to extension name mapping
 EXT_CMD_TREE = Session()
 
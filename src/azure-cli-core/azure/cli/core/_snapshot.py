@@ -0,0 +1,144 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import marshal
+import os
+import struct
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+_MAGIC = b'AZSNAP1\n'
+_HEADER_LENGTH = struct.Struct('<Q')
+_DATA_START = len(_MAGIC) + _HEADER_LENGTH.size
+
+
+class Snapshot:
+    """
+    A store of records keyed by string, backed by a compact binary file.
+
+    The file starts with a marshal-serialized header holding the metadata and the (offset, length) of every record,
+    followed by the marshal-serialized records. The file is memory-mapped and only the records that are read get
+    deserialized. Records must only contain the built-in types supported by `marshal`.
+
+    All modifications rewrite the file atomically, so the snapshot is always consistent. A snapshot whose metadata
+    doesn't match the expected metadata, like one written by another CLI version, is treated as empty.
+    """
+
+    def __init__(self, filename, meta):
+        self.filename = filename
+        self.meta = meta
+        self._file = None
+        self._mmap = None
+        self._index = None
+        self._data_start = 0
+
+    def _open(self):
+        if self._index is not None:
+            return
+        self._index = {}
+        import mmap
+        try:
+            self._file = open(self.filename, 'rb')
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._mmap[:len(_MAGIC)] != _MAGIC:
+                raise ValueError('invalid magic number')
+            header_length, = _HEADER_LENGTH.unpack(self._mmap[len(_MAGIC):_DATA_START])
+            header = marshal.loads(self._mmap[_DATA_START:_DATA_START + header_length])
+            self._data_start = _DATA_START + header_length
+        except (OSError, IOError, ValueError, EOFError, TypeError, struct.error) as ex:
+            if not isinstance(ex, FileNotFoundError):
+                logger.debug("Failed to load snapshot %s: %s", self.filename, ex)
+            self.close()
+            return
+        if not isinstance(header, dict) or header.get('meta') != self.meta:
+            logger.debug("Snapshot %s is outdated.", self.filename)
+            return
+        self._index = header['index']
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __contains__(self, key):
+        self._open()
+        return key in self._index
+
+    def __len__(self):
+        self._open()
+        return len(self._index)
+
+    def get(self, key, default=None):
+        self._open()
+        try:
+            offset, length = self._index[key]
+        except KeyError:
+            return default
+        start = self._data_start + offset
+        try:
+            return marshal.loads(self._mmap[start:start + length])
+        except (ValueError, EOFError, TypeError) as ex:
+            logger.debug("Failed to load '%s' from snapshot %s: %s", key, self.filename, ex)
+            return default
+
+    def update(self, records):
+        """Add or replace records, then save the snapshot.
+
+        :param records: a dict of the records to add, like {"vm create": {...}}
+        :return: True if the snapshot is saved.
+        """
+        self._open()
+        all_records = {key: self.get(key) for key in self._index}
+        all_records.update(records)
+
+        index = {}
+        chunks = []
+        offset = 0
+        for key, record in all_records.items():
+            chunk = marshal.dumps(record)
+            index[key] = (offset, len(chunk))
+            chunks.append(chunk)
+            offset += len(chunk)
+        header = marshal.dumps({'meta': self.meta, 'index': index})
+
+        # The file can't be replaced while it is mapped on Windows
+        self.close()
+        self._index = None
+        import tempfile
+        directory = os.path.dirname(self.filename)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(self.filename), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(_MAGIC)
+                    f.write(_HEADER_LENGTH.pack(len(header)))
+                    f.write(header)
+                    for chunk in chunks:
+                        f.write(chunk)
+                os.replace(temp_path, self.filename)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        except (OSError, IOError) as ex:
+            logger.debug("Failed to save snapshot %s: %s", self.filename, ex)
+            return False
+        return True
+
+    def invalidate(self):
+        """Remove the snapshot file."""
+        self.close()
+        self._index = {}
+        try:
+            os.remove(self.filename)
+        except FileNotFoundError:
+            pass
+        except OSError as ex:
+            logger.debug("Failed to remove snapshot %s: %s", self.filename, ex)
@@ -50,6 +50,7 @@ except AttributeError:  # in Python 2.7
 
 logger = get_logger(__name__)
 DEFAULT_CACHE_TTL = '10'
+DEFAULT_MAX_CONCURRENT_IDS = 10
 
 
 def _explode_list_args(args):
@@ -113,11 +114,35 @@ def _expand_file_prefixed_files(args):
     return list([_expand_file_prefix(arg) for arg in args])
 
 
+def _copy_cli_ctx_for_job(cli_ctx):
+    """ Create the CLI context of one job of a multi-ID fan-out.
+
+    The context and its data dict are copied shallowly, so the jobs share everything they only read. Keys a job
+    assigns, such as 'subscription_id', land in its own data dict. 'headers' is the only value jobs change in place
+    (see client_factory.configure_common_settings), so it is the only one copied a level deeper.
+    """
+    job_cli_ctx = copy.copy(cli_ctx)
+    job_cli_ctx.data = dict(cli_ctx.data)
+    if 'headers' in job_cli_ctx.data:
+        job_cli_ctx.data['headers'] = dict(job_cli_ctx.data['headers'])
+    return job_cli_ctx
+
+
 def _pre_command_table_create(cli_ctx, args):
     cli_ctx.refresh_request_id()
     return _expand_file_prefixed_files(args)
 
 
+def _get_help_nouns(args):
+    """Get the command or group of a plain help request like `az vm create -h`, otherwise None."""
+    if len(args) < 2 or args[-1] not in ('-h', '--help'):
+        return None
+    nouns = args[:-1]
+    if any(not noun or noun.startswith('-') for noun in nouns):
+        return None
+    return nouns
+
+
 # pylint: disable=too-many-instance-attributes
 class CacheObject:
 
@@ -511,6 +536,13 @@ class AzCliCommandInvoker(CommandInvoker):
         # TODO: Can't simply be invoked as an event because args are transformed
         args = _pre_command_table_create(self.cli_ctx, args)
 
+        # `az <command> -h` may be served from the help snapshot without loading any command module
+        help_nouns = _get_help_nouns(args)
+        if help_nouns and self.help.show_help_from_snapshot(help_nouns):
+            telemetry.set_command_details(command=' '.join(help_nouns))
+            telemetry.set_success(summary='show help')
+            return CommandResultItem(None, exit_code=0)
+
         self.cli_ctx.raise_event(EVENT_INVOKER_PRE_CMD_TBL_CREATE, args=args)
         self.commands_loader.load_command_table(args)
         self.cli_ctx.raise_event(EVENT_INVOKER_PRE_CMD_TBL_TRUNCATE,
@@ -587,7 +619,14 @@ class AzCliCommandInvoker(CommandInvoker):
 
         self.cli_ctx.raise_event(EVENT_INVOKER_PRE_PARSE_ARGS, args=args)
         parsed_args = self.parser.parse_args(args)
+        self.data['stream_output'] = self._should_stream_output(parsed_args)
+        if self.data['stream_output']:
+            # The query is applied to every item of a streamed result, instead of to the whole result by knack
+            self.data['stream_query'] = getattr(parsed_args, '_jmespath_query', None)
+            parsed_args._jmespath_query = None  # pylint: disable=protected-access
         self.cli_ctx.raise_event(EVENT_INVOKER_POST_PARSE_ARGS, command=parsed_args.command, args=parsed_args)
+        if self.data['stream_output'] and self.data['stream_query'] is not None:
+            self.data['query_active'] = True
 
         # print local context warning
         if self.cli_ctx.local_context.is_on and command and command in self.commands_loader.command_table:
@@ -642,8 +681,7 @@ class AzCliCommandInvoker(CommandInvoker):
         jobs = []
         for expanded_arg in _explode_list_args(parsed_args):
             cmd_copy = copy.copy(cmd)
-            cmd_copy.cli_ctx = copy.copy(cmd.cli_ctx)
-            cmd_copy.cli_ctx.data = copy.deepcopy(cmd.cli_ctx.data)
+            cmd_copy.cli_ctx = _copy_cli_ctx_for_job(cmd.cli_ctx)
             expanded_arg.cmd = expanded_arg._cmd = cmd_copy
 
             if hasattr(expanded_arg, '_subscription'):
@@ -673,7 +711,12 @@ class AzCliCommandInvoker(CommandInvoker):
             results = results[0]
 
         event_data = {'result': results}
-        self.cli_ctx.raise_event(EVENT_INVOKER_FILTER_RESULT, event_data=event_data)
+        if self.data['stream_output']:
+            from azure.cli.core.commands.streaming import StreamedResult, apply_query
+            if not isinstance(results, StreamedResult):
+                event_data['result'] = apply_query(self.data['stream_query'], results)
+        else:
+            self.cli_ctx.raise_event(EVENT_INVOKER_FILTER_RESULT, event_data=event_data)
 
         # save to local context if it is turned on after command executed successfully
         if self.cli_ctx.local_context.is_on and command and command in self.commands_loader.command_table and \
@@ -686,6 +729,18 @@ class AzCliCommandInvoker(CommandInvoker):
             table_transformer=self.commands_loader.command_table[parsed_args.command].table_transformer,
             is_query_active=self.data['query_active'])
 
+    def _should_stream_output(self, parsed_args):
+        from azure.cli.core.commands.streaming import STREAMABLE_OUTPUT_FORMATS, is_streamable_query
+        if not self.cli_ctx.config.getboolean('core', 'stream_output', False):
+            return False
+        # Results of several --ids are collected anyway
+        if len(getattr(parsed_args, '_ids', None) or []) > 1:
+            return False
+        if getattr(parsed_args, '_query_examples', None) is not None:
+            return False
+        return getattr(parsed_args, '_output_format', None) in STREAMABLE_OUTPUT_FORMATS and \
+            is_streamable_query(getattr(parsed_args, '_jmespath_query', None))
+
     @staticmethod
     def _extract_parameter_names(args):
         # note: name start with more than 2 '-' will be treated as value e.g. certs in PEM format
@@ -708,6 +763,10 @@ class AzCliCommandInvoker(CommandInvoker):
             if _is_poller(result):
                 result = LongRunningOperation(cmd_copy.cli_ctx, 'Starting {}'.format(cmd_copy.name))(result)
             elif _is_paged(result):
+                if self.data.get('stream_output') and not cmd_copy.exception_handler:
+                    from azure.cli.core.commands.streaming import StreamedResult, stream_paged_result
+                    return StreamedResult(stream_paged_result(cmd_copy.cli_ctx, result, self.data['stream_query'],
+                                                              AzCliCommandInvoker.remove_additional_prop_layer))
                 result = list(result)
 
             result = todict(result, AzCliCommandInvoker.remove_additional_prop_layer)
@@ -719,27 +778,38 @@ class AzCliCommandInvoker(CommandInvoker):
                 return cmd_copy.exception_handler(ex)
             six.reraise(*sys.exc_info())
 
+    def _run_timed_job(self, expanded_arg, cmd_copy, id_arg):
+        start_time = time.time()
+        try:
+            return self._run_job(expanded_arg, cmd_copy)
+        finally:
+            if id_arg is not None:
+                logger.debug("Job for '%s' finished in %.3f seconds", id_arg, time.time() - start_time)
+
     def _run_jobs_serially(self, jobs, ids):
         results, exceptions = [], []
         for job, id_arg in zip(jobs, ids):
             expanded_arg, cmd_copy = job
             try:
-                results.append(self._run_job(expanded_arg, cmd_copy))
+                results.append(self._run_timed_job(expanded_arg, cmd_copy, id_arg))
             except(Exception, SystemExit) as ex:  # pylint: disable=broad-except
                 exceptions.append((ex, id_arg))
         return results, exceptions
 
     def _run_jobs_concurrently(self, jobs, ids):
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+        from concurrent.futures import ThreadPoolExecutor
+        max_workers = self.cli_ctx.config.getint('core', 'max_concurrent_ids', DEFAULT_MAX_CONCURRENT_IDS)
         tasks, results, exceptions = [], [], []
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            for expanded_arg, cmd_copy in jobs:
-                tasks.append(executor.submit(self._run_job, expanded_arg, cmd_copy))
-            for index, task in enumerate(as_completed(tasks)):
+        logger.debug('Running %d jobs with %d workers', len(jobs), max_workers)
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+            for (expanded_arg, cmd_copy), id_arg in zip(jobs, ids):
+                tasks.append(executor.submit(self._run_timed_job, expanded_arg, cmd_copy, id_arg))
+            # collect in submission order so that results follow the order of --ids and errors keep their ID
+            for task, id_arg in zip(tasks, ids):
                 try:
                     results.append(task.result())
                 except (Exception, SystemExit) as ex:  # pylint: disable=broad-except
-                    exceptions.append((ex, ids[index]))
+                    exceptions.append((ex, id_arg))
         return results, exceptions
 
     def resolve_warnings(self, cmd, parsed_args):
@@ -1117,8 +1187,8 @@ def _load_azure_exception_class():
 # pylint: disable=no-member
 def _is_paged(obj):
     # Since loading msrest is expensive, we avoid it until we have to
-    import collections
-    if isinstance(obj, collections.Iterable) \
+    import collections.abc
+    if isinstance(obj, collections.abc.Iterable) \
             and not isinstance(obj, list) \
             and not isinstance(obj, dict):
         from msrest.paging import Paged
@@ -3,6 +3,8 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import threading
+
 import azure.cli.core._debug as _debug
 from azure.cli.core.extension import EXTENSIONS_MOD_PREFIX
 from azure.cli.core.profiles._shared import get_client_class, SDKProfile
@@ -14,6 +16,11 @@ from knack.util import CLIError
 
 logger = get_logger(__name__)
 
+# The requests sessions shared by the management clients and the raw requests of the process, keyed by track, endpoint
+# and credential
+_HTTP_SESSIONS = {}
+_HTTP_SESSIONS_LOCK = threading.Lock()
+
 
 def _is_vendored_sdk_path(path_comps):
     return len(path_comps) >= 5 and path_comps[4] == 'vendored_sdks'
@@ -194,6 +201,17 @@ def _get_mgmt_service_client(cli_ctx,
         client_kwargs.update(_prepare_client_kwargs_track2(cli_ctx))
         client_kwargs['credential_scopes'] = resource_to_scopes(resource)
 
+    share_http_session = cli_ctx.config.getboolean('core', 'share_http_session', fallback=True)
+    # A track 1 credential sets the Authorization header of the session it signs, so the sessions are keyed by the
+    # credential as well as the endpoint, and the track 1 sessions by thread too, see _share_track1_session
+    session_key = (is_track2(client_type), client_kwargs.get('base_url'), resource, subscription_id,
+                   tuple(aux_subscriptions or ()), tuple(aux_tenants or ()))
+    if share_http_session and is_track2(client_type) and 'transport' not in client_kwargs:
+        from azure.core.pipeline.transport import RequestsTransport
+        session = _get_shared_http_session(cli_ctx, session_key, _init_track2_session)
+        # The transport takes the connection settings, like connection_verify, that the client would give to its own
+        client_kwargs['transport'] = RequestsTransport(session=session, session_owner=False, **client_kwargs)
+
     if subscription_bound:
         client = client_type(cred, subscription_id, **client_kwargs)
     else:
@@ -201,10 +219,90 @@ def _get_mgmt_service_client(cli_ctx,
 
     if not is_track2(client):
         configure_common_settings(cli_ctx, client)
+        if share_http_session:
+            _share_track1_session(cli_ctx, client, session_key)
 
     return client, subscription_id
 
 
+def _get_shared_http_session(cli_ctx, key, init_session):
+    """Get the requests Session of `key` shared by the management clients of the process, so that successive requests
+    to the same host reuse a kept-alive connection instead of doing a new TCP and TLS handshake.
+
+    :param init_session: a function called with the session when it is created, to configure it for its clients.
+    """
+    from requests import Session
+    from requests.adapters import HTTPAdapter
+    from azure.cli.core.commands import DEFAULT_MAX_CONCURRENT_IDS
+    with _HTTP_SESSIONS_LOCK:
+        session = _HTTP_SESSIONS.get(key)
+        if session is None:
+            logger.debug("Creating a shared HTTP session for endpoint '%s'", key[1])
+            session = Session()
+            # The jobs of --ids send their requests concurrently, so keep a connection for each of them
+            pool_size = max(cli_ctx.config.getint('core', 'max_concurrent_ids', fallback=DEFAULT_MAX_CONCURRENT_IDS),
+                            10)
+            for protocol in ('https://', 'http://'):
+                session.mount(protocol, HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+            init_session(session)
+            _HTTP_SESSIONS[key] = session
+    return session
+
+
+def close_shared_http_sessions():
+    """Close the shared sessions and their connections, at the end of an invocation."""
+    with _HTTP_SESSIONS_LOCK:
+        sessions = list(_HTTP_SESSIONS.values())
+        _HTTP_SESSIONS.clear()
+    for session in sessions:
+        session.close()
+
+
+def _init_track2_session(session):
+    # What azure-core does to the sessions it creates, as retries are done by its RetryPolicy
+    from urllib3 import Retry
+    session.trust_env = True
+    for adapter in session.adapters.values():
+        adapter.max_retries = Retry(total=False, redirect=False, raise_on_status=False)
+
+
+def _share_track1_session(cli_ctx, client, key):
+    from msrest.pipeline import Pipeline, HTTPPolicy, SansIOHTTPPolicy
+    from msrest.pipeline.requests import (PipelineRequestsHTTPSender, RequestsCredentialsPolicy,
+                                          RequestsPatchSession)
+    from msrest.universal_http.requests import RequestsHTTPSender
+
+    class SharedSessionHTTPSender(RequestsHTTPSender):
+        """Send the requests of every thread with the shared session of the thread. The jobs of --ids and the LRO
+        pollers send their requests from their own threads, and the credential signs the session of every request
+        with its Authorization header, so a session is never used by two threads at once.
+        """
+
+        @property
+        def session(self):
+            return _get_shared_http_session(cli_ctx, key + (threading.get_ident(),), self._init_session)
+
+        @session.setter
+        def session(self, value):
+            # The session created by the base class is never used
+            value.close()
+
+        def close(self):
+            # The shared sessions are closed at the end of the invocation
+            pass
+
+    config = client.config
+    # The default pipeline of msrest.ServiceClient, with a sender using the shared sessions
+    policies = [config.user_agent_policy, RequestsPatchSession(), config.http_logger_policy]
+    creds = config.credentials
+    if creds:
+        policies.insert(1, creds if isinstance(creds, (HTTPPolicy, SansIOHTTPPolicy))
+                        else RequestsCredentialsPolicy(creds))
+    config.pipeline = Pipeline(policies, PipelineRequestsHTTPSender(SharedSessionHTTPSender(config)))
+    # msrest closes the session after every request unless it is kept alive
+    config.keep_alive = True
+
+
 def get_data_service_client(cli_ctx, service_type, account_name, account_key, connection_string=None,
                             sas_token=None, socket_timeout=None, token_credential=None, endpoint_suffix=None,
                             location_mode=None):
@@ -0,0 +1,85 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Streaming of paged command results.
+
+When `core.stream_output` is turned on, the items of a paged result flow one by one through `todict`, the global
+transforms and the `--query` projection, and get written as soon as they are ready, instead of the whole result being
+collected in memory first. Only the JSON, TSV and none output formats and the queries that apply to every item
+separately, like `[].name` or `[?location=='westus'].{name:name}`, are supported. Otherwise the result is collected
+as usual.
+"""
+
+import collections
+
+from knack.events import EVENT_INVOKER_TRANSFORM_RESULT
+from knack.util import todict
+
+STREAMABLE_OUTPUT_FORMATS = ['json', 'tsv', 'none']
+# Number of items processed and written at once
+STREAM_CHUNK_SIZE = 100
+
+
+class StreamedResult:  # pylint: disable=too-few-public-methods
+    """A command result whose items are produced while it is iterated. It can only be iterated once."""
+
+    def __init__(self, items):
+        self._items = items
+
+    def __iter__(self):
+        return iter(self._items)
+
+
+def is_streamable_query(query):
+    """Whether a compiled JMESPath query applies to every item of a list separately.
+
+    Those are the projections and filter projections of the list itself, like `[].name`, `[*].name` or `[?a].b`.
+    Their result on a list is the concatenation of their results on each item.
+    """
+    if query is None:
+        return True
+    parsed = getattr(query, 'parsed', None)
+    if not isinstance(parsed, dict) or parsed.get('type') not in ('projection', 'filter_projection'):
+        return False
+    left = parsed['children'][0]
+    if left['type'] == 'flatten':
+        left = left['children'][0]
+    return left['type'] == 'identity'
+
+
+def apply_query(query, result):
+    """Apply a compiled JMESPath query to a whole result, like knack does."""
+    if query is None:
+        return result
+    from jmespath import Options
+    return query.search(result, Options(collections.OrderedDict))
+
+
+def iter_chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_paged_result(cli_ctx, paged, query=None, todict_callback=None):
+    """Run the items of a paged result through `todict`, the result transforms and the query, lazily.
+
+    The transforms get lists of items, like they get the whole list otherwise.
+    """
+    if query is not None:
+        from jmespath import Options
+        options = Options(collections.OrderedDict)
+    for chunk in iter_chunks(paged, STREAM_CHUNK_SIZE):
+        event_data = {'result': [todict(item, todict_callback) for item in chunk]}
+        cli_ctx.raise_event(EVENT_INVOKER_TRANSFORM_RESULT, event_data=event_data)
+        if query is None:
+            yield from event_data['result']
+        else:
+            yield from query.search(event_data['result'], options) or []
@@ -10,9 +10,61 @@ from azure.cli.core.util import b64_to_hex
 import knack.events as events
 
 
+class ResultTransformer:
+    """
+    Apply transforms to every dict of a command result, with a single walk of the result.
+
+    A transform is a function which updates a dict in place. It is applied to a dict before the values of the dict
+    are walked, and isn't applied to the values of the keys in its `skip_keys`, nor to anything within them.
+    """
+
+    def __init__(self):
+        self._transforms = ()
+        self._skip_keys = frozenset()
+        self._skipped_transforms = {}
+
+    def register(self, transform, skip_keys=None):
+        self._transforms += ((transform, frozenset(skip_keys or ())),)
+        self._skip_keys = self._skip_keys.union(skip_keys or ())
+        self._skipped_transforms = {}
+
+    def apply(self, obj):
+        if self._transforms:
+            self._walk(obj, self._transforms)
+
+    def __call__(self, _, **kwargs):
+        self.apply(kwargs['event_data']['result'])
+
+    def _get_child_transforms(self, transforms, key):
+        try:
+            return self._skipped_transforms[transforms, key]
+        except KeyError:
+            child_transforms = tuple(t for t in transforms if key not in t[1])
+            self._skipped_transforms[transforms, key] = child_transforms
+            return child_transforms
+
+    def _walk(self, obj, transforms):
+        if isinstance(obj, list):
+            for item in obj:
+                if isinstance(item, (dict, list)):
+                    self._walk(item, transforms)
+        elif isinstance(obj, dict):
+            for transform, _ in transforms:
+                transform(obj)
+            skip_keys = self._skip_keys
+            for key, value in obj.items():
+                if isinstance(value, (dict, list)):
+                    child_transforms = self._get_child_transforms(transforms, key) if key in skip_keys \
+                        else transforms
+                    if child_transforms:
+                        self._walk(value, child_transforms)
+
+
 def register_global_transforms(cli_ctx):
-    cli_ctx.register_event(events.EVENT_INVOKER_TRANSFORM_RESULT, _resource_group_transform)
-    cli_ctx.register_event(events.EVENT_INVOKER_TRANSFORM_RESULT, _x509_from_base64_to_hex_transform)
+    transformer = ResultTransformer()
+    transformer.register(_add_resource_group_to_dict, skip_keys=['sourceVault'])
+    transformer.register(_add_x509_hex_to_dict)
+    cli_ctx.register_event(events.EVENT_INVOKER_TRANSFORM_RESULT, transformer)
 
 
 def _parse_id(strid):
@@ -26,43 +78,38 @@ def _parse_id(strid):
     return parsed
 
 
-def _add_resource_group(obj):
-    if isinstance(obj, list):
-        for array_item in obj:
-            _add_resource_group(array_item)
-    elif isinstance(obj, dict):
-        try:
-            if 'resourcegroup' not in [x.lower() for x in obj.keys()]:
-                if obj['id']:
-                    obj['resourceGroup'] = _parse_id(obj['id'])['resource-group']
-        except (KeyError, IndexError, TypeError):
-            pass
-        for item_key in obj:
-            if item_key != 'sourceVault':
-                _add_resource_group(obj[item_key])
+def _add_resource_group_to_dict(obj):
+    # Most dicts have no id, so check it before looking for a resource group key in any case
+    resource_id = obj.get('id')
+    if not resource_id or 'resourceGroup' in obj:
+        return
+    try:
+        if not any(isinstance(k, str) and k.lower() == 'resourcegroup' for k in obj):
+            obj['resourceGroup'] = _parse_id(resource_id)['resource-group']
+    except (KeyError, IndexError, TypeError):
+        pass
 
 
-def _add_x509_hex(obj):
-    if isinstance(obj, list):
-        for array_item in obj:
-            _add_x509_hex(array_item)
-    elif isinstance(obj, dict):
-        try:
-            if 'x509ThumbprintHex' not in obj:
-                if obj['x509Thumbprint']:
-                    obj['x509ThumbprintHex'] = b64_to_hex(obj['x509Thumbprint'])
-        except (KeyError, IndexError, TypeError):
-            pass
-        for item_key in obj:
-            _add_x509_hex(obj[item_key])
+def _add_x509_hex_to_dict(obj):
+    if 'x509ThumbprintHex' in obj:
+        return
+    try:
+        if obj['x509Thumbprint']:
+            obj['x509ThumbprintHex'] = b64_to_hex(obj['x509Thumbprint'])
+    except (KeyError, IndexError, TypeError):
+        pass
 
 
-def _resource_group_transform(_, **kwargs):
-    _add_resource_group(kwargs['event_data']['result'])
+def _add_resource_group(obj):
+    transformer = ResultTransformer()
+    transformer.register(_add_resource_group_to_dict, skip_keys=['sourceVault'])
+    transformer.apply(obj)
 
 
-def _x509_from_base64_to_hex_transform(_, **kwargs):
-    _add_x509_hex(kwargs['event_data']['result'])
+def _add_x509_hex(obj):
+    transformer = ResultTransformer()
+    transformer.register(_add_x509_hex_to_dict)
+    transformer.apply(obj)
 
 
 def gen_dict_to_list_transform(key='value'):
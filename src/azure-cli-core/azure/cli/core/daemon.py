@@ -0,0 +1,295 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Resident `az` process for scripted workloads.
+
+When `core.use_daemon` is turned on, `az` forwards its arguments, environment variables and working directory to a
+resident process over a Unix socket, together with its stdin, stdout and stderr file descriptors. The client, in
+azure.cli.core._daemon_client, only depends on the standard library, so `az` forwards the command before importing
+Azure CLI. The resident process has already created the CLI and imported the command modules, so it only forks a child
+to run each command. The child loads the state of a run, like the session files, and builds the command table of the
+command from the imported modules. Every command runs in its own child process, which isolates `cli_ctx.data` and
+any other state between commands. The output goes straight to the streams of the calling process.
+
+The resident process is started in the background on first use. It restarts on the next command after the config,
+the cloud config, the installed extensions or the CLI itself changes, and it exits after `core.daemon_idle_timeout`
+seconds without a command. Commands that read from stdin or prompt still work, as the child uses the streams of
+the calling process. Only POSIX platforms are supported; elsewhere `az` runs every command in its own process.
+"""
+
+import json
+import os
+import socket
+import struct
+import sys
+
+from knack.log import get_logger
+
+from azure.cli.core._daemon_client import (_LENGTH, _STATUS_RESTARTING, _STATUS_RUN_LOCALLY, _STDIO_FDS,
+                                           _lock_daemon, _receive_exactly, _send_int, get_socket_path)
+
+logger = get_logger(__name__)
+
+DEFAULT_IDLE_TIMEOUT = 15 * 60
+
+_REQUEST_TIMEOUT = 10
+
+
+def _get_import_time_env(env):
+    # These are read when Azure CLI is imported, so the resident process can't apply them per command
+    return {k: v for k, v in env.items() if k == 'AZURE_CONFIG_DIR' or k.startswith('AZURE_EXTENSION_')}
+
+
+def _get_signature():
+    """Get the state of the files that the warmed-up process depends on."""
+    from importlib.util import find_spec
+    from azure.cli.core._environment import get_config_dir
+    from azure.cli.core.extension import EXTENSIONS_DIR, EXTENSIONS_SYS_DIR
+    main_spec = find_spec('azure.cli.__main__')
+    paths = [os.path.join(get_config_dir(), 'config'), os.path.join(get_config_dir(), 'clouds.config'),
+             EXTENSIONS_DIR, EXTENSIONS_SYS_DIR, os.path.abspath(__file__),
+             os.path.join(os.path.dirname(os.path.abspath(__file__)), '_daemon_client.py'),
+             main_spec.origin if main_spec else None]
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((path, st.st_mtime_ns, st.st_size))
+        except (OSError, TypeError):
+            signature.append((path, None, None))
+    return signature
+
+
+def _receive_request(sock):
+    import array
+    fds = array.array('i')
+    header, ancdata, _, _ = sock.recvmsg(_LENGTH.size, socket.CMSG_LEN(len(_STDIO_FDS) * fds.itemsize))
+    for level, kind, data in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(data[:len(data) - (len(data) % fds.itemsize)])
+    fds = list(fds)
+    try:
+        if len(header) < _LENGTH.size:
+            header += _receive_exactly(sock, _LENGTH.size - len(header)) or b''
+        data = _receive_exactly(sock, _LENGTH.unpack(header)[0])
+        if data is None:
+            raise ValueError('incomplete request')
+        return json.loads(data.decode('utf-8')), fds
+    except BaseException:
+        for fd in fds:
+            os.close(fd)
+        raise
+
+
+def _warm_up():
+    """Create the CLI and import all command modules, so that the children don't need to. Return the CLI or None."""
+    try:
+        from azure.cli.core import get_default_cli
+        import azure.cli.core.telemetry  # pylint: disable=unused-import
+        import azure.cli.core._profile  # pylint: disable=unused-import
+        import azure.cli.core.commands.client_factory  # pylint: disable=unused-import
+        cli = get_default_cli()
+        cli.invocation = cli.invocation_cls(cli_ctx=cli, parser_cls=cli.parser_cls,
+                                            commands_loader_cls=cli.commands_loader_cls, help_cls=cli.help_cls)
+        cli.invocation.commands_loader.load_command_table(None)
+        cli.invocation = None
+        return cli
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.debug("Failed to warm up the az daemon: %s", ex)
+        return None
+
+
+def _reset_cli(cli):
+    """Prepare the CLI created by the resident process for the command of the calling process."""
+    from azure.cli.core.cloud import get_active_cloud
+    from azure.cli.core.style import format_styled_text, THEME_DARK
+    # The streams, the environment and the working directory are those of the calling process now
+    cli.out_file = sys.stdout
+    cli.init_debug_log = []
+    cli.init_info_log = []
+    cli.enable_color = cli._should_enable_color()  # pylint: disable=protected-access
+    cli.only_show_errors = cli.config.getboolean('core', 'only_show_errors', fallback=False)
+    format_styled_text.theme = THEME_DARK
+    cli.data.clear()
+    cli.result = None
+    cli.load_invocation_state()
+    cli.cloud = get_active_cloud(cli)
+
+
+def _run_az(cli, args):
+    """Run `az <args>` like azure/cli/__main__.py does, with the CLI created by the resident process if any."""
+    import azure.cli.core.telemetry as telemetry
+    from knack.completion import ARGCOMPLETE_ENV_NAME
+    sys.argv = [sys.argv[0]] + list(args)
+    if cli is None:
+        from azure.cli.core import get_default_cli
+        cli = get_default_cli()
+    else:
+        _reset_cli(cli)
+    telemetry.set_application(cli, ARGCOMPLETE_ENV_NAME)
+    try:
+        telemetry.start()
+        exit_code = cli.invoke(list(args))
+        if exit_code == 0:
+            telemetry.set_success()
+    except KeyboardInterrupt:
+        telemetry.set_user_fault('Keyboard interrupt is captured.')
+        exit_code = 1
+    except SystemExit as ex:
+        exit_code = ex.code
+        if exit_code is None:
+            exit_code = 0
+        elif not isinstance(exit_code, int):
+            print(exit_code, file=sys.stderr)
+            exit_code = 1
+    finally:
+        telemetry.conclude()
+    return exit_code
+
+
+def _run_request(conn, request, fds, run):
+    import signal
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    for target, fd in zip(_STDIO_FDS, fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    # Reopen the streams, so that buffering and tty detection follow the streams of the calling process
+    sys.stdin = open(0, 'r', encoding=sys.stdin.encoding, errors=sys.stdin.errors, closefd=False)
+    sys.stdout = open(1, 'w', encoding=sys.stdout.encoding, errors=sys.stdout.errors, closefd=False)
+    sys.stderr = open(2, 'w', encoding=sys.stderr.encoding, errors='backslashreplace', closefd=False,
+                      buffering=1)
+    exit_code = 1
+    try:
+        os.environ.clear()
+        os.environ.update(request['env'])
+        os.chdir(request['cwd'])
+        _send_int(conn, os.getpid())
+        exit_code = run(request['argv'])
+    except KeyboardInterrupt:
+        exit_code = 1
+    except Exception:  # pylint: disable=broad-except
+        import traceback
+        traceback.print_exc()
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except (OSError, ValueError):
+                pass
+    try:
+        _send_int(conn, exit_code)
+    except OSError:
+        pass
+
+
+def _is_same_user(conn):
+    so_peercred = getattr(socket, 'SO_PEERCRED', None)
+    if so_peercred is None:
+        # The socket file is only accessible by the current user
+        return True
+    _, uid, _ = struct.unpack('3i', conn.getsockopt(socket.SOL_SOCKET, so_peercred, struct.calcsize('3i')))
+    return uid == os.getuid()
+
+
+def serve(socket_path=None, idle_timeout=None, run=None):
+    """Run the resident process, until it is idle or outdated.
+
+    :param run: a function called with the arguments of a command to run it, in a child process. By default the
+        command runs with the CLI warmed up by the resident process.
+    """
+    import signal
+    socket_path = socket_path or get_socket_path()
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    lock_file = _lock_daemon(socket_path + '.lock')
+    if lock_file is None:
+        logger.debug("Another az daemon is serving %s.", socket_path)
+        return
+    if idle_timeout is None:
+        from knack.config import CLIConfig
+        from azure.cli.core._config import ENV_VAR_PREFIX
+        from azure.cli.core._environment import get_config_dir
+        config = CLIConfig(config_dir=get_config_dir(), config_env_var_prefix=ENV_VAR_PREFIX)
+        idle_timeout = config.getint('core', 'daemon_idle_timeout', DEFAULT_IDLE_TIMEOUT)
+
+    if run is None:
+        from functools import partial
+        run = partial(_run_az, _warm_up())
+    signature = _get_signature()
+    env = _get_import_time_env(os.environ)
+    # The children are not waited for
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    old_umask = os.umask(0o077)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        listener.bind(socket_path)
+        os.umask(old_umask)
+        listener.listen(64)
+        listener.settimeout(idle_timeout)
+        logger.debug("The az daemon is listening on %s.", socket_path)
+        _accept_requests(listener, idle_timeout, signature, env, run)
+    finally:
+        listener.close()
+        try:
+            os.remove(socket_path)
+        except OSError:
+            pass
+        lock_file.close()
+
+
+def _accept_requests(listener, idle_timeout, signature, env, run):
+    """Run the commands sent to the listener, until it is idle or the process is outdated."""
+    while True:
+        try:
+            conn, _ = listener.accept()
+        except socket.timeout:
+            logger.debug("The az daemon has been idle for %s seconds.", idle_timeout)
+            return
+        try:
+            conn.settimeout(_REQUEST_TIMEOUT)
+            if not _is_same_user(conn):
+                conn.close()
+                continue
+            request, fds = _receive_request(conn)
+        except (OSError, ValueError) as ex:
+            logger.debug("Failed to receive the command: %s", ex)
+            conn.close()
+            continue
+        try:
+            if not _handle_request(listener, conn, request, fds, signature, env, run):
+                return
+        finally:
+            for fd in fds:
+                os.close(fd)
+            conn.close()
+
+
+def _handle_request(listener, conn, request, fds, signature, env, run):  # pylint: disable=too-many-arguments
+    """Run the command of a request in a child process.
+
+    :return: False if the resident process is outdated and must exit.
+    """
+    try:
+        if _get_signature() != signature:
+            _send_int(conn, _STATUS_RESTARTING)
+            return False
+        if _get_import_time_env(request['env']) != env:
+            _send_int(conn, _STATUS_RUN_LOCALLY)
+            return True
+
+        conn.settimeout(None)
+        pid = os.fork()
+        if pid == 0:
+            try:
+                listener.close()
+                _run_request(conn, request, fds, run)
+            finally:
+                os._exit(0)  # pylint: disable=protected-access
+    except OSError as ex:
+        logger.debug("Failed to run the command: %s", ex)
+    return True
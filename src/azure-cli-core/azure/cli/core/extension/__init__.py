@@ -51,7 +51,7 @@ class ExtensionNotInstalledException(Exception):
         return "The extension {} is not installed.".format(self.extension_name)
 
 
-class Extension:
+class Extension:  # pylint: disable=too-many-instance-attributes
 
     def __init__(self, name, ext_type, path=None):
         self.name = name
@@ -61,6 +61,8 @@ class Extension:
         self._metadata = None
         self._preview = None
         self._experimental = None
+        self._modname = None
+        self._compat_metadata = None
 
     @property
     def version(self):
@@ -118,6 +120,21 @@ class Extension:
     def get_metadata(self):
         raise NotImplementedError()
 
+    def get_modname(self):
+        """
+        Lazy load the name of the module of the extension, like 'azext_vwan'.
+        """
+        self._modname = self._modname or get_extension_modname(self.name, self.path)
+        return self._modname
+
+    def get_compat_metadata(self):
+        """
+        Lazy load the metadata needed to check the compatibility of the extension with the CLI core version.
+        """
+        if self._compat_metadata is None:
+            self._compat_metadata = _get_compat_metadata(self.get_metadata())
+        return self._compat_metadata
+
     @staticmethod
     def get_all():
         raise NotImplementedError()
@@ -181,7 +198,63 @@ class WheelExtension(Extension):
     def get_all():
         """
         Returns all wheel-based extensions.
+        The extensions and their metadata are cached in the extension registry, which is rebuilt when an extension
+        directory changes.
         """
+        exts = WheelExtension._get_all_from_registry()
+        if exts is None:
+            exts = WheelExtension._scan_all()
+            WheelExtension._register(exts)
+        return exts
+
+    @staticmethod
+    def _get_all_from_registry():
+        from azure.cli.core._session import EXTENSION_REGISTRY
+        entries = EXTENSION_REGISTRY.get('extensions')
+        if entries is None or EXTENSION_REGISTRY.get('key') != _get_extension_registry_key():
+            return None
+        exts = []
+        for entry in entries:
+            try:
+                if _get_mtime(entry['path']) != entry['mtime']:
+                    return None
+                ext = WheelExtension(entry['name'], entry['path'])
+                ext._version = entry['version']  # pylint: disable=protected-access
+                ext._modname = entry['modname']  # pylint: disable=protected-access
+                ext._preview = entry['preview']  # pylint: disable=protected-access
+                ext._experimental = entry['experimental']  # pylint: disable=protected-access
+                ext._compat_metadata = entry['compatMetadata']  # pylint: disable=protected-access
+            except (KeyError, TypeError):
+                return None
+            exts.append(ext)
+        logger.debug("Loaded %d extensions from the extension registry.", len(exts))
+        return exts
+
+    @staticmethod
+    def _register(exts):
+        from azure.cli.core._session import EXTENSION_REGISTRY
+        entries = []
+        for ext in exts:
+            try:
+                modname = ext.get_modname()
+            except (AssertionError, OSError):
+                modname = None
+            entries.append({
+                'name': ext.name,
+                'path': ext.path,
+                'mtime': _get_mtime(ext.path),
+                'version': ext.version,
+                'modname': modname,
+                'preview': ext.preview,
+                'experimental': ext.experimental,
+                'compatMetadata': _get_compat_metadata(ext.metadata)
+            })
+        with EXTENSION_REGISTRY.transaction():
+            EXTENSION_REGISTRY['key'] = _get_extension_registry_key()
+            EXTENSION_REGISTRY['extensions'] = entries
+
+    @staticmethod
+    def _scan_all():
         from glob import glob
         exts = []
         if os.path.isdir(EXTENSIONS_DIR):
@@ -271,6 +344,34 @@ class DevExtension(Extension):
 EXTENSION_TYPES = [WheelExtension, DevExtension]
 
 
+def _get_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _get_extension_registry_key():
+    # Installing or removing an extension changes the mtime of the extension directory.
+    # The compatibility of the extensions depends on the CLI core version.
+    from azure.cli.core import __version__ as core_version
+    return {'coreVersion': core_version,
+            'dirs': {ext_dir: _get_mtime(ext_dir) for ext_dir in (EXTENSIONS_DIR, EXTENSIONS_SYS_DIR)}}
+
+
+def invalidate_extension_registry():
+    from azure.cli.core._session import EXTENSION_REGISTRY
+    with EXTENSION_REGISTRY.transaction():
+        EXTENSION_REGISTRY.clear()
+
+
+def _get_compat_metadata(metadata):
+    if not metadata:
+        return {}
+    return {k: metadata[k] for k in ('name', EXT_METADATA_MINCLICOREVERSION, EXT_METADATA_MAXCLICOREVERSION)
+            if metadata.get(k) is not None}
+
+
 def ext_compat_with_cli(azext_metadata):
     from azure.cli.core import __version__ as core_version
     from pkg_resources import parse_version
@@ -20,7 +20,7 @@ from pkg_resources import parse_version
 from azure.cli.core import CommandIndex
 from azure.cli.core.util import CLIError, reload_module
 from azure.cli.core.extension import (extension_exists, build_extension_path, get_extensions, get_extension_modname,
-                                      get_extension, ext_compat_with_cli,
+                                      get_extension, ext_compat_with_cli, invalidate_extension_registry,
                                       EXT_METADATA_ISPREVIEW, EXT_METADATA_ISEXPERIMENTAL,
                                       WheelExtension, DevExtension, ExtensionNotInstalledException, WHEEL_INFO_RE)
 from azure.cli.core.telemetry import set_extension_management_detail
@@ -165,6 +165,7 @@ def _add_whl_ext(cli_ctx, source, ext_sha256=None, pip_extra_index_urls=None, pi
     dst = os.path.join(extension_path, whl_filename)
     shutil.copyfile(ext_file, dst)
     logger.debug('Saved the whl to %s', dst)
+    invalidate_extension_registry()
 
     return extension_name
 
@@ -344,6 +345,7 @@ def remove_extension(extension_name):
         # We call this just before we remove the extension so we can get the metadata before it is gone
         _augment_telemetry_with_ext_info(extension_name, ext)
         shutil.rmtree(ext.path, onerror=log_err)
+        invalidate_extension_registry()
         CommandIndex().invalidate()
     except ExtensionNotInstalledException as e:
         raise CLIError(e)
@@ -399,6 +401,7 @@ def update_extension(cmd=None, extension_name=None, index_url=None, pip_extra_in
             logger.error(err)
             logger.debug('Copying %s to %s', backup_dir, extension_path)
             shutil.copytree(backup_dir, extension_path)
+            invalidate_extension_registry()
             raise CLIError('Failed to update. Rolled {} back to {}.'.format(extension_name, cur_version))
         CommandIndex().invalidate()
     except ExtensionNotInstalledException as e:
@@ -9,8 +9,10 @@ import zipfile
 import tarfile
 import shutil
 import unittest
+import mock
 
-from azure.cli.core.extension import WheelExtension
+from azure.cli.core._session import Session
+from azure.cli.core.extension import WheelExtension, invalidate_extension_registry
 try:
     from azure.cli.core.extension.tests.latest import ExtensionTypeTestMixin, get_test_data_file
 except ImportError:
@@ -108,3 +110,50 @@ class TestWheelTypeExtensionMetadata(ExtensionTypeTestMixin):
         self.assertTrue(metadata['azext.isPreview'])
         self.assertTrue(metadata['azext.isExperimental'])
         self.assertEqual(metadata['azext.minCliCoreVersion'], '2.0.67')
+
+
+class TestWheelTypeExtensionRegistry(ExtensionTypeTestMixin):
+
+    def setUp(self):
+        super(TestWheelTypeExtensionRegistry, self).setUp()
+        self.ext_sys_dir = tempfile.mkdtemp()
+        self.registry = Session()
+        self.patchers = [mock.patch('azure.cli.core.extension.EXTENSIONS_DIR', self.ext_dir),
+                         mock.patch('azure.cli.core.extension.EXTENSIONS_SYS_DIR', self.ext_sys_dir),
+                         mock.patch('azure.cli.core._session.EXTENSION_REGISTRY', self.registry)]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.ext_sys_dir, ignore_errors=True)
+        super(TestWheelTypeExtensionRegistry, self).tearDown()
+
+    def _add_extension(self, ext_name):
+        zf = zipfile.ZipFile(get_test_data_file('wheel_0_30_0_packed_extension-0.1.0-py3-none-any.whl'))
+        zf.extractall(os.path.join(self.ext_dir, ext_name))
+
+    def test_extension_registry(self):
+        self._add_extension('hello')
+        ext = WheelExtension.get_all()[0]
+        self.assertEqual(ext.get_compat_metadata(), {'name': 'hello', 'azext.minCliCoreVersion': '2.0.67'})
+        entries = self.registry['extensions']
+        self.assertEqual([(e['name'], e['version'], e['modname'], e['preview']) for e in entries],
+                         [('hello', '0.1.0', 'azext_hello', True)])
+
+        # the extensions are loaded from the registry without reading their metadata
+        with mock.patch.object(WheelExtension, 'get_metadata', side_effect=AssertionError):
+            ext = WheelExtension.get_all()[0]
+            self.assertEqual((ext.name, ext.version, ext.preview, ext.experimental, ext.get_modname()),
+                             ('hello', '0.1.0', True, True, 'azext_hello'))
+            self.assertEqual(ext.get_compat_metadata()['azext.minCliCoreVersion'], '2.0.67')
+
+        # the registry is rebuilt when an extension directory changes
+        self._add_extension('hello2')
+        os.utime(self.ext_dir, ns=(0, 0))
+        self.assertEqual(sorted(e.name for e in WheelExtension.get_all()), ['hello', 'hello2'])
+        self.assertEqual(len(self.registry['extensions']), 2)
+
+        invalidate_extension_registry()
+        self.assertEqual(self.registry.data, {})
@@ -19,6 +19,7 @@ class DummyCli(AzCli):
         from azure.cli.core._config import GLOBAL_CONFIG_DIR, ENV_VAR_PREFIX
         from azure.cli.core._help import AzCliHelp
         from azure.cli.core._output import AzOutputProducer
+        from azure.cli.core._query import AzCliQuery
 
         from knack.completion import ARGCOMPLETE_ENV_NAME
 
@@ -30,6 +31,7 @@ class DummyCli(AzCli):
             parser_cls=AzCliCommandParser,
             logging_cls=AzCliLogging,
             output_cls=AzOutputProducer,
+            query_cls=AzCliQuery,
             help_cls=AzCliHelp,
             invocation_cls=AzCliCommandInvoker)
 
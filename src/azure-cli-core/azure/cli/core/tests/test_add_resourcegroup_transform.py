@@ -5,7 +5,7 @@
 
 import unittest
 from six import StringIO
-from azure.cli.core.commands.transform import _parse_id, _add_resource_group
+from azure.cli.core.commands.transform import _parse_id, _add_resource_group, register_global_transforms
 
 
 class TestResourceGroupTransform(unittest.TestCase):
@@ -85,6 +85,38 @@ class TestResourceGroupTransform(unittest.TestCase):
             'name': 'A name'
         })
 
+    def test_global_transforms_single_walk(self):
+        from knack.events import EVENT_INVOKER_TRANSFORM_RESULT
+        from azure.cli.core.mock import DummyCli
+
+        cli = DummyCli()
+        cli._event_handlers[EVENT_INVOKER_TRANSFORM_RESULT] = []
+        register_global_transforms(cli)
+        self.assertEqual(len(cli._event_handlers[EVENT_INVOKER_TRANSFORM_RESULT]), 1)
+
+        result = [{
+            'id': TestResourceGroupTransform.CORRECT_ID,
+            'ResourceGroup': 'existing',
+            'x509Thumbprint': 'qg==',
+            'secrets': [{
+                'sourceVault': {'id': TestResourceGroupTransform.CORRECT_ID, 'x509Thumbprint': 'qw=='},
+                'vault': {'id': TestResourceGroupTransform.CORRECT_ID}
+            }]
+        }, 'not a dict']
+        cli.raise_event(EVENT_INVOKER_TRANSFORM_RESULT, event_data={'result': result})
+        self.assertEqual(result, [{
+            'id': TestResourceGroupTransform.CORRECT_ID,
+            'ResourceGroup': 'existing',
+            'x509Thumbprint': 'qg==',
+            'x509ThumbprintHex': 'AA',
+            'secrets': [{
+                # sourceVault only gets the x509 transform
+                'sourceVault': {'id': TestResourceGroupTransform.CORRECT_ID, 'x509Thumbprint': 'qw==',
+                                'x509ThumbprintHex': 'AB'},
+                'vault': {'id': TestResourceGroupTransform.CORRECT_ID, 'resourceGroup': 'REsourceGROUPname'}
+            }]
+        }, 'not a dict'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,128 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import unittest
+from unittest import mock
+
+from msrest import Configuration, ServiceClient
+from msrest.authentication import BasicTokenAuthentication
+
+from azure.cli.core.commands.client_factory import _get_mgmt_service_client, close_shared_http_sessions
+from azure.cli.core.mock import DummyCli
+
+
+class _Track1Client:
+    def __init__(self, credentials, subscription_id, base_url=None, api_version=None):
+        self.config = Configuration(base_url)
+        self._client = ServiceClient(credentials, self.config)
+
+
+class _Track2Client:
+    def __init__(self, credential, subscription_id, **kwargs):
+        self.transport = kwargs.get('transport')
+
+
+def _get_login_credentials(subscription_id=None, **_):
+    return BasicTokenAuthentication({'access_token': 'token'}), subscription_id or '0000', 'tenant'
+
+
+@mock.patch('azure.cli.core._profile.Profile.get_login_credentials', side_effect=_get_login_credentials)
+class TestSharedHttpSession(unittest.TestCase):
+
+    def setUp(self):
+        self.cli_ctx = DummyCli()
+        self.addCleanup(close_shared_http_sessions)
+
+    def _get_session(self, client_type, **kwargs):
+        client, _ = _get_mgmt_service_client(self.cli_ctx, client_type, **kwargs)
+        if client_type is _Track2Client:
+            return client.transport.session
+        self.assertTrue(client._client.config.keep_alive)
+        return client._client.config.pipeline._sender.driver.session
+
+    def test_share_track1_session(self, _):
+        session = self._get_session(_Track1Client)
+        self.assertIs(self._get_session(_Track1Client), session)
+        self.assertIsNot(self._get_session(_Track1Client, subscription_id='1111'), session)
+        self.assertIsNot(self._get_session(_Track2Client), session)
+        # the redirects of the session are only patched by the first client
+        resolve_redirects = session.resolve_redirects
+        self._get_session(_Track1Client)
+        self.assertIs(session.resolve_redirects, resolve_redirects)
+
+        close_shared_http_sessions()
+        self.assertIsNot(self._get_session(_Track1Client), session)
+
+    def test_share_track1_session_by_thread(self, _):
+        import threading
+        client, _ = _get_mgmt_service_client(self.cli_ctx, _Track1Client)
+        driver = client._client.config.pipeline._sender.driver
+        sessions = []
+        # an LRO poller sends its requests from its own thread
+        thread = threading.Thread(target=lambda: sessions.extend([driver.session, driver.session]))
+        thread.start()
+        thread.join()
+        self.assertIs(sessions[0], sessions[1])
+        self.assertIsNot(sessions[0], driver.session)
+        self.assertIs(driver.session, self._get_session(_Track1Client))
+
+    def test_keep_credential_header_of_concurrent_jobs(self, _):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from requests import Response
+        from requests.adapters import HTTPAdapter
+        jobs = 5
+        barrier = threading.Barrier(jobs, timeout=10)
+
+        class _SyncedTokenAuthentication(BasicTokenAuthentication):
+            def signed_session(self, session=None):
+                session = super().signed_session(session)
+                # every job signs its session before any of them sends its request
+                barrier.wait()
+                return session
+
+        def get_login_credentials(subscription_id=None, **_):
+            token = {'access_token': threading.current_thread().name}
+            return _SyncedTokenAuthentication(token), subscription_id or '0000', 'tenant'
+
+        headers = []
+
+        def send(_, request, **__):
+            headers.append((request.headers['Authorization'], 'Bearer ' + threading.current_thread().name))
+            response = Response()
+            response.status_code = 200
+            response.request = request
+            response._content = b''
+            return response
+
+        def run_job():
+            client, _ = _get_mgmt_service_client(self.cli_ctx, _Track1Client)
+            service_client = client._client
+            service_client.send(service_client.get('/job'))
+
+        with mock.patch('azure.cli.core._profile.Profile.get_login_credentials', side_effect=get_login_credentials), \
+                mock.patch.object(HTTPAdapter, 'send', autospec=True, side_effect=send):
+            # like the jobs of --ids
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                for task in [executor.submit(run_job) for _ in range(jobs)]:
+                    task.result()
+
+        self.assertEqual(len(headers), jobs)
+        for header, expected_header in headers:
+            self.assertEqual(header, expected_header)
+
+    def test_share_track2_session(self, _):
+        session = self._get_session(_Track2Client)
+        self.assertIs(self._get_session(_Track2Client), session)
+        self.assertIsNot(self._get_session(_Track2Client, aux_tenants=['tenant2']), session)
+        self.assertFalse(session.adapters['https://'].max_retries.total)
+
+        with mock.patch.object(self.cli_ctx.config, 'getboolean', return_value=False):
+            client, _ = _get_mgmt_service_client(self.cli_ctx, _Track2Client)
+            self.assertIsNone(client.transport)
+
+
+if __name__ == '__main__':
+    unittest.main()
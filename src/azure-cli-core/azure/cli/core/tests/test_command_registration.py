@@ -160,10 +160,17 @@ class TestCommandRegistration(unittest.TestCase):
             return "azext_always_loaded"
 
     def _mock_get_extensions():
-        MockExtension = namedtuple('Extension', ['name', 'preview', 'experimental', 'path', 'get_metadata'])
-        return [MockExtension(name=__name__ + '.ExtCommandsLoader', preview=False, experimental=False, path=None, get_metadata=lambda: {}),
-                MockExtension(name=__name__ + '.Ext2CommandsLoader', preview=False, experimental=False, path=None, get_metadata=lambda: {}),
-                MockExtension(name=__name__ + '.ExtAlwaysLoadedCommandsLoader', preview=False, experimental=False, path=None, get_metadata=lambda: {})]
+        MockExtension = namedtuple('Extension', ['name', 'preview', 'experimental', 'path', 'get_metadata',
+                                                 'get_compat_metadata', 'get_modname'])
+
+        def _mock_extension(name):
+            from azure.cli.core import extension
+            return MockExtension(name=name, preview=False, experimental=False, path=None, get_metadata=lambda: {},
+                                 get_compat_metadata=lambda: {},
+                                 get_modname=lambda: extension.get_extension_modname(name, None))
+        return [_mock_extension(__name__ + '.ExtCommandsLoader'),
+                _mock_extension(__name__ + '.Ext2CommandsLoader'),
+                _mock_extension(__name__ + '.ExtAlwaysLoadedCommandsLoader')]
 
     def _mock_load_command_loader(loader, args, name, prefix):
 
@@ -234,6 +241,11 @@ class TestCommandRegistration(unittest.TestCase):
 
     expected_command_index = {'hello': ['azure.cli.command_modules.hello', 'azext_hello2', 'azext_hello1'],
                               'extra': ['azure.cli.command_modules.extra']}
+    expected_command_tree = {
+        'hello': {'mod-only': {'_modules': ['azure.cli.command_modules.hello']},
+                  'overridden': {'_modules': ['azure.cli.command_modules.hello', 'azext_hello2']},
+                  'ext-only': {'_modules': ['azext_hello1']}},
+        'extra': {'final': {'_modules': ['azure.cli.command_modules.extra']}}}
     expected_command_table = ['hello mod-only', 'hello overridden', 'extra final', 'hello ext-only']
 
     @mock.patch('importlib.import_module', _mock_import_lib)
@@ -274,12 +286,15 @@ class TestCommandRegistration(unittest.TestCase):
         command_index = CommandIndex(cli)
 
         def _set_index(dict_):
+            # Only keep the top-level index, like the one built by older versions
+            INDEX[CommandIndex._COMMAND_TREE] = {}
             INDEX[CommandIndex._COMMAND_INDEX] = dict_
 
         def _check_index():
             self.assertEqual(INDEX[CommandIndex._COMMAND_INDEX_VERSION], __version__)
             self.assertEqual(INDEX[CommandIndex._COMMAND_INDEX_CLOUD_PROFILE], cli.cloud.profile)
             self.assertDictEqual(INDEX[CommandIndex._COMMAND_INDEX], self.expected_command_index)
+            self.assertDictEqual(INDEX[CommandIndex._COMMAND_TREE], self.expected_command_tree)
 
         # Clear the command index
         _set_index({})
@@ -378,16 +393,23 @@ class TestCommandRegistration(unittest.TestCase):
         _check_index()
         self.assertListEqual(list(cmd_tbl), self.expected_command_table)
 
-        # Call again with the new command index. Irrelevant commands are not loaded
+        # Call again with the new command index. Only the modules owning the command are loaded
         cmd_tbl = loader.load_command_table(["hello", "overridden"])
         hello_overridden_cmd = cmd_tbl['hello overridden']
         self.assertTrue(isinstance(hello_overridden_cmd.command_source, ExtensionCommandSource))
+        self.assertTrue(hello_overridden_cmd.command_source.overrides_command)
+        _check_index()
+        self.assertListEqual(list(cmd_tbl), ['hello mod-only', 'hello overridden'])
+
+        # Command groups load the modules owning any command in the group
+        cmd_tbl = loader.load_command_table(["hello", "-h"])
         _check_index()
         self.assertListEqual(list(cmd_tbl), ['hello mod-only', 'hello overridden', 'hello ext-only'])
 
         del INDEX[CommandIndex._COMMAND_INDEX_VERSION]
         del INDEX[CommandIndex._COMMAND_INDEX_CLOUD_PROFILE]
         del INDEX[CommandIndex._COMMAND_INDEX]
+        del INDEX[CommandIndex._COMMAND_TREE]
 
     @mock.patch('importlib.import_module', _mock_import_lib)
     @mock.patch('pkgutil.iter_modules', _mock_iter_modules)
@@ -436,7 +458,11 @@ class TestCommandRegistration(unittest.TestCase):
         # Test command index is used by command with positional argument
         cmd_tbl = loader.load_command_table(["hello", "mod-only", "positional_argument"])
         self.assertDictEqual(INDEX[CommandIndex._COMMAND_INDEX], self.expected_command_index)
-        self.assertEqual(list(cmd_tbl), ['hello mod-only', 'hello overridden', 'hello ext-only'])
+        self.assertEqual(list(cmd_tbl), ['hello mod-only', 'hello overridden'])
+
+        # Test command index is used by extension command with positional argument
+        cmd_tbl = loader.load_command_table(["hello", "ext-only", "positional_argument"])
+        self.assertEqual(list(cmd_tbl), ['hello ext-only'])
 
         # Test command index is used by command with positional argument
         cmd_tbl = loader.load_command_table(["extra", "final", "positional_argument2"])
@@ -0,0 +1,150 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from azure.cli.core import daemon, _daemon_client
+
+
+def _fake_run(args):
+    print('out: {} {} {}'.format(' '.join(args), os.getcwd(), os.environ.get('AZ_DAEMON_TEST')))
+    print('err: {}'.format(sys.stderr.isatty()), file=sys.stderr)
+    return 3
+
+
+def _serve(socket_path):
+    daemon.serve(socket_path, idle_timeout=30, run=_fake_run)
+
+
+@unittest.skipUnless(_daemon_client.is_daemon_supported(), 'The az daemon requires Unix sockets')
+class TestDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.temp_dir, 'daemon.sock')
+        env_patch = mock.patch.dict('os.environ', {'AZURE_CONFIG_DIR': self.temp_dir, 'AZ_DAEMON_TEST': 'value'})
+        env_patch.start()
+        self.addCleanup(env_patch.stop)
+
+        self.server = multiprocessing.Process(target=_serve, args=(self.socket_path,))
+        self.server.start()
+        for _ in range(100):
+            if os.path.exists(self.socket_path):
+                break
+            time.sleep(0.05)
+
+    def tearDown(self):
+        if self.server.is_alive():
+            self.server.terminate()
+        self.server.join(5)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _request(self, args):
+        return self._request_socket(self.socket_path, args)
+
+    @staticmethod
+    def _request_socket(socket_path, args):
+        with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err, open(os.devnull) as stdin:
+            with mock.patch.object(_daemon_client, 'start_daemon') as start_daemon:
+                exit_code = _daemon_client.request_daemon(socket_path, args,
+                                                          fds=(stdin.fileno(), out.fileno(), err.fileno()))
+            out.seek(0)
+            err.seek(0)
+            return exit_code, out.read().decode(), err.read().decode(), start_daemon
+
+    def test_daemon_runs_command(self):
+        self.assertEqual(_daemon_client.get_socket_path(), self.socket_path)
+        exit_code, out, err, _ = self._request(['group', 'list'])
+        self.assertEqual(exit_code, 3)
+        self.assertEqual(out, 'out: group list {} value\n'.format(os.getcwd()))
+        # The command writes to the streams of the calling process
+        self.assertEqual(err, 'err: False\n')
+        self.assertTrue(self.server.is_alive())
+
+    def test_daemon_runs_command_locally_with_other_extension_dir(self):
+        with mock.patch.dict('os.environ', {'AZURE_EXTENSION_DIR': self.temp_dir}):
+            exit_code, out, _, start_daemon = self._request(['group', 'list'])
+        self.assertIsNone(exit_code)
+        self.assertEqual(out, '')
+        start_daemon.assert_not_called()
+
+    def test_daemon_restarts_after_config_change(self):
+        with open(os.path.join(self.temp_dir, 'config'), 'w') as f:
+            f.write('[core]\nuse_daemon = true\n')
+        exit_code, out, _, start_daemon = self._request(['group', 'list'])
+        self.assertIsNone(exit_code)
+        self.assertEqual(out, '')
+        start_daemon.assert_called_once()
+        self.server.join(5)
+        self.assertFalse(self.server.is_alive())
+
+    def test_daemon_exits_when_idle(self):
+        socket_path = os.path.join(self.temp_dir, 'idle.sock')
+        server = multiprocessing.Process(target=daemon.serve, args=(socket_path, 0.1, _fake_run))
+        server.start()
+        server.join(5)
+        self.assertFalse(server.is_alive())
+        self.assertFalse(os.path.exists(socket_path))
+        # The client starts the daemon again and runs the command itself
+        exit_code, _, _, start_daemon = self._request_socket(socket_path, ['group', 'list'])
+        self.assertIsNone(exit_code)
+        start_daemon.assert_called_once()
+
+    def test_run_in_daemon_opt_in(self):
+        with mock.patch.object(_daemon_client, 'request_daemon', return_value=0) as request_daemon:
+            self.assertIsNone(_daemon_client.run_in_daemon(['group', 'list']))
+            with mock.patch.dict('os.environ', {'AZURE_CORE_USE_DAEMON': 'true'}):
+                self.assertEqual(_daemon_client.run_in_daemon(['group', 'list']), 0)
+                self.assertIsNone(_daemon_client.run_in_daemon(['interactive']))
+                self.assertIsNone(_daemon_client.run_in_daemon([]))
+            with mock.patch.dict('os.environ', {'AZURE_CORE_USE_DAEMON': 'false'}):
+                self.assertIsNone(_daemon_client.run_in_daemon(['group', 'list']))
+        request_daemon.assert_called_once_with(self.socket_path, ['group', 'list'])
+
+    def test_daemon_enabled_in_config(self):
+        self.assertFalse(_daemon_client.is_daemon_enabled())
+        with open(os.path.join(self.temp_dir, 'config'), 'w') as f:
+            f.write('[core]\nuse_daemon = yes\n')
+        self.assertTrue(_daemon_client.is_daemon_enabled())
+
+    def test_run_az_reuses_cli(self):
+        cli = mock.MagicMock()
+        cli.invoke.return_value = 0
+        with mock.patch.object(daemon, '_reset_cli') as reset_cli, mock.patch.object(sys, 'argv', ['az']), \
+                mock.patch('azure.cli.core.telemetry.start'), mock.patch('azure.cli.core.telemetry.conclude'):
+            self.assertEqual(daemon._run_az(cli, ['group', 'list']), 0)
+        reset_cli.assert_called_once_with(cli)
+        cli.invoke.assert_called_once_with(['group', 'list'])
+
+    def test_reset_cli(self):
+        from contextlib import ExitStack
+        from azure.cli.core.mock import DummyCli
+        with ExitStack() as stack:
+            # The session files are shared by the process, keep them out of the config dir of the test
+            for name in ('ACCOUNT', 'CONFIG', 'SESSION', 'INDEX', 'VERSIONS', 'EXTENSION_REGISTRY'):
+                stack.enter_context(mock.patch('azure.cli.core._session.' + name))
+            stack.enter_context(mock.patch('azure.cli.core.util.handle_version_update'))
+            cli = DummyCli()
+            local_context = cli.local_context
+            cli.data['command'] = 'group list'
+            cli.data['completer_active'] = True
+            cli.out_file = None
+            daemon._reset_cli(cli)
+        # The state of the previous command is not kept
+        self.assertEqual(cli.data['command'], 'unknown')
+        self.assertFalse(cli.data['completer_active'])
+        self.assertIsNot(cli.local_context, local_context)
+        self.assertIs(cli.out_file, sys.stdout)
+
+
+if __name__ == '__main__':
+    unittest.main()
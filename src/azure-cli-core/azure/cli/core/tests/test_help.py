@@ -5,7 +5,9 @@
 
 from __future__ import print_function
 
+import io
 import logging
+import os
 import shutil
 import inspect
 from inspect import getmembers as inspect_getmembers
@@ -327,6 +329,123 @@ class TestHelpLoads(unittest.TestCase):
         with self.assertRaises(SystemExit):
             self.test_cli.invoke(["test", "alpha", "-h"])
 
+    # Mock logic in core.MainCommandsLoader.load_command_table for retrieving installed modules.
+    @mock.patch('pkgutil.iter_modules', side_effect=lambda x: [(None, MOCKED_COMMAND_LOADER_MOD, None)])
+    @mock.patch('azure.cli.core.commands._load_command_loader', side_effect=mock_load_command_loader)
+    def test_help_snapshot(self, mocked_load, mocked_pkg_util):
+        from azure.cli.core import CommandIndex
+        self.set_help_py()
+        env = {'AZURE_CONFIG_DIR': self._tempdirName, 'AZURE_CORE_USE_HELP_SNAPSHOT': 'true'}
+        with mock.patch.dict(os.environ, env):
+            # The help is rendered from the command table and kept in the snapshot
+            with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+                with self.assertRaises(SystemExit):
+                    self.test_cli.invoke(["test", "alpha", "-h"])
+            expected_help = stdout.getvalue()
+            self.assertIn("Foo Bar Baz Command is a fun command.", expected_help)
+
+            # The help is shown from the snapshot without loading the command table
+            mocked_load.reset_mock()
+            with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+                self.assertEqual(self.test_cli.invoke(["test", "alpha", "-h"]), 0)
+            self.assertEqual(stdout.getvalue(), expected_help)
+            mocked_load.assert_not_called()
+
+            # Configured defaults are shown in the help, so changing them invalidates the snapshot
+            with mock.patch.dict(os.environ, {'AZURE_DEFAULTS_GROUP': 'myrg'}):
+                with mock.patch('sys.stdout', new_callable=io.StringIO):
+                    with self.assertRaises(SystemExit):
+                        self.test_cli.invoke(["test", "alpha", "-h"])
+            mocked_load.assert_called()
+
+            # The help isn't shown from the snapshot when the local context is on
+            mocked_load.reset_mock()
+            with mock.patch.object(self.test_cli.local_context, 'is_on', True), \
+                    mock.patch('sys.stdout', new_callable=io.StringIO):
+                with self.assertRaises(SystemExit):
+                    self.test_cli.invoke(["test", "alpha", "-h"])
+            mocked_load.assert_called()
+
+            # Installing an extension invalidates the snapshot
+            mocked_load.reset_mock()
+            CommandIndex().invalidate()
+            with mock.patch('sys.stdout', new_callable=io.StringIO):
+                with self.assertRaises(SystemExit):
+                    self.test_cli.invoke(["test", "alpha", "-h"])
+            mocked_load.assert_called()
+
+    # Mock logic in core.MainCommandsLoader.load_command_table for retrieving installed modules.
+    @mock.patch('pkgutil.iter_modules', side_effect=lambda x: [(None, MOCKED_COMMAND_LOADER_MOD, None)])
+    @mock.patch('azure.cli.core.commands._load_command_loader', side_effect=mock_load_command_loader)
+    def test_help_index(self, mocked_load, mocked_pkg_util):
+        from azure.cli.core._help import get_help_index
+        self.set_help_py()
+        with mock.patch.dict(os.environ, {'AZURE_CONFIG_DIR': self._tempdirName}):
+            # The parsed help of the group and its commands is kept in the index
+            with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+                with self.assertRaises(SystemExit):
+                    self.test_cli.invoke(["test", "-h"])
+            expected_help = stdout.getvalue()
+            self.assertIn("Foo Bar Baz Group is a fun group.", expected_help)
+            help_index = get_help_index(self.test_cli)
+            self.assertEqual(help_index.get('test alpha')['data']['short-summary'], 'Foo Bar Command')
+            self.assertIn('test', help_index)
+
+            # The help is shown without parsing YAML
+            with mock.patch('yaml.safe_load', side_effect=AssertionError), \
+                    mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+                with self.assertRaises(SystemExit):
+                    self.test_cli.invoke(["test", "-h"])
+            self.assertEqual(stdout.getvalue(), expected_help)
+
+            # Changed help is parsed again
+            self.helps['test alpha'] = self.helps['test alpha'].replace('Foo Bar Command', 'New Command')
+            with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+                with self.assertRaises(SystemExit):
+                    self.test_cli.invoke(["test", "-h"])
+            self.assertIn("New Command.", stdout.getvalue())
+
+    @mock.patch('pkgutil.iter_modules', side_effect=lambda x: [(None, MOCKED_COMMAND_LOADER_MOD, None)])
+    @mock.patch('azure.cli.core.commands._load_command_loader', side_effect=mock_load_command_loader)
+    def test_help_index_of_help_file(self, mocked_load, mocked_pkg_util):
+        from azure.cli.core._help import AzCliHelp
+        from azure.cli.core._snapshot import Snapshot
+        self.set_help_py()
+        yaml_path = self.set_help_yaml()
+        create_invoker_and_load_cmds_and_args(self.test_cli)
+        expected_arg = self.test_cli.invocation.commands_loader.cmd_to_loader_map['test alpha'][0].__class__
+
+        def show_help():
+            with mock.patch('inspect.getfile', side_effect=get_mocked_inspect_getfile(expected_arg, yaml_path)), \
+                    mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+                with self.assertRaises(SystemExit):
+                    self.test_cli.invoke(["test", "-h"])
+            return stdout.getvalue()
+
+        with mock.patch.dict(os.environ, {'AZURE_CONFIG_DIR': self._tempdirName}):
+            self.assertIn("Group yaml summary.", show_help())
+
+            # The unchanged help file is neither read nor parsed, and the index isn't written again
+            with mock.patch.object(AzCliHelp, 'read_help_file', side_effect=AssertionError), \
+                    mock.patch('yaml.safe_load', side_effect=AssertionError), \
+                    mock.patch.object(Snapshot, 'update', side_effect=AssertionError):
+                self.assertIn("Group yaml summary.", show_help())
+
+            # A touched help file is read and hashed, but not parsed again
+            stat = os.stat(yaml_path)
+            os.utime(yaml_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            with mock.patch('yaml.safe_load', side_effect=AssertionError):
+                self.assertIn("Group yaml summary.", show_help())
+            with mock.patch.object(AzCliHelp, 'read_help_file', side_effect=AssertionError):
+                self.assertIn("Group yaml summary.", show_help())
+
+            # A changed help file is parsed again
+            with open(yaml_path) as f:
+                text = f.read()
+            with open(yaml_path, 'w') as f:
+                f.write(text.replace('Group yaml summary', 'New group yaml summary'))
+            self.assertIn("New group yaml summary.", show_help())
+
     # Mock logic in core.MainCommandsLoader.load_command_table for retrieving installed modules.
     @mock.patch('pkgutil.iter_modules', side_effect=lambda x: [(None, MOCKED_COMMAND_LOADER_MOD, None)])
     @mock.patch('azure.cli.core.commands._load_command_loader', side_effect=mock_load_command_loader)
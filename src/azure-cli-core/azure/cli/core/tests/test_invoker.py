@@ -0,0 +1,100 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import time
+import threading
+import unittest
+
+import mock
+
+from azure.cli.core.commands import AzCliCommandInvoker, _copy_cli_ctx_for_job
+from azure.cli.core.mock import DummyCli
+
+
+def _create_invoker(cli_ctx):
+    invoker = AzCliCommandInvoker.__new__(AzCliCommandInvoker)
+    invoker.cli_ctx = cli_ctx
+    return invoker
+
+
+class TestRunJobsConcurrently(unittest.TestCase):
+
+    def setUp(self):
+        self.cli_ctx = DummyCli()
+        self.ids = ['/subscriptions/sub/resourceGroups/rg/providers/Microsoft.Compute/virtualMachines/vm{}'.format(i)
+                    for i in range(8)]
+        self.jobs = [(i, None) for i in range(8)]
+
+    def test_run_jobs_concurrently_keeps_input_order(self):
+        def _run_job(expanded_arg, _):
+            # finish the first jobs last
+            time.sleep(0.01 * (8 - expanded_arg))
+            return expanded_arg
+
+        invoker = _create_invoker(self.cli_ctx)
+        with mock.patch.object(invoker, '_run_job', side_effect=_run_job):
+            results, exceptions = invoker._run_jobs_concurrently(self.jobs, self.ids)
+        self.assertEqual(results, list(range(8)))
+        self.assertEqual(exceptions, [])
+
+    def test_run_jobs_concurrently_attributes_errors_to_ids(self):
+        def _run_job(expanded_arg, _):
+            if expanded_arg in (1, 6):
+                time.sleep(0.01 * (8 - expanded_arg))
+                raise ValueError(str(expanded_arg))
+            return expanded_arg
+
+        invoker = _create_invoker(self.cli_ctx)
+        with mock.patch.object(invoker, '_run_job', side_effect=_run_job):
+            results, exceptions = invoker._run_jobs_concurrently(self.jobs, self.ids)
+        self.assertEqual(results, [0, 2, 3, 4, 5, 7])
+        self.assertEqual([(str(ex), id_arg) for ex, id_arg in exceptions],
+                         [('1', self.ids[1]), ('6', self.ids[6])])
+
+    def test_run_jobs_concurrently_max_concurrent_ids(self):
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def _run_job(expanded_arg, _):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.02)
+            with lock:
+                state['running'] -= 1
+            return expanded_arg
+
+        invoker = _create_invoker(self.cli_ctx)
+        with mock.patch.dict(os.environ, {'AZURE_CORE_MAX_CONCURRENT_IDS': '2'}), \
+                mock.patch.object(invoker, '_run_job', side_effect=_run_job):
+            results, _ = invoker._run_jobs_concurrently(self.jobs, self.ids)
+        self.assertEqual(results, list(range(8)))
+        self.assertEqual(state['peak'], 2)
+
+
+class TestCopyCliCtxForJob(unittest.TestCase):
+
+    def test_copy_cli_ctx_for_job_isolates_job_keys(self):
+        cli_ctx = DummyCli()
+        cli_ctx.refresh_request_id()
+        cli_ctx.data['subscription_id'] = None
+        cli_ctx.data['safe_params'] = ['--ids']
+
+        job_cli_ctx = _copy_cli_ctx_for_job(cli_ctx)
+        job_cli_ctx.data['subscription_id'] = '00000000-0000-0000-0000-000000000000'
+        job_cli_ctx.data['headers']['CommandName'] = 'vm show'
+
+        self.assertIsNone(cli_ctx.data['subscription_id'])
+        self.assertNotIn('CommandName', cli_ctx.data['headers'])
+        self.assertEqual(job_cli_ctx.data['headers']['x-ms-client-request-id'],
+                         cli_ctx.data['headers']['x-ms-client-request-id'])
+        # read-only state is shared rather than copied
+        self.assertIs(job_cli_ctx.data['safe_params'], cli_ctx.data['safe_params'])
+        self.assertIs(job_cli_ctx.config, cli_ctx.config)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -144,9 +144,16 @@ class TestParser(unittest.TestCase):
         return ext_name
 
     def _mock_get_extensions(**kwargs):
-        MockExtension = namedtuple('Extension', ['name', 'preview', 'experimental', 'path', 'get_metadata'])
-        return [MockExtension(name=__name__ + '.ExtCommandsLoader', preview=False, experimental=False, path=None, get_metadata=lambda: {}),
-                MockExtension(name=__name__ + '.Ext2CommandsLoader', preview=False, experimental=False, path=None, get_metadata=lambda: {})]
+        MockExtension = namedtuple('Extension', ['name', 'preview', 'experimental', 'path', 'get_metadata',
+                                                 'get_compat_metadata', 'get_modname'])
+
+        def _mock_extension(name):
+            from azure.cli.core import extension
+            return MockExtension(name=name, preview=False, experimental=False, path=None, get_metadata=lambda: {},
+                                 get_compat_metadata=lambda: {},
+                                 get_modname=lambda: extension.get_extension_modname(name, None))
+        return [_mock_extension(__name__ + '.ExtCommandsLoader'),
+                _mock_extension(__name__ + '.Ext2CommandsLoader')]
 
     def _mock_load_command_loader(loader, args, name, prefix):
         from enum import Enum
@@ -1618,10 +1618,11 @@ class TestProfile(unittest.TestCase):
         self.assertEqual(creds_cache.retrieve_cred_for_service_principal('myapp'), 'Secret')
         self.assertEqual(creds_cache.retrieve_cred_for_service_principal('myapp2'), 'junkcert.pem')
 
+    @mock.patch('os.replace', autospec=True)
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
     @mock.patch('os.fdopen', autospec=True)
     @mock.patch('os.open', autospec=True)
-    def test_credscache_add_new_sp_creds(self, _, mock_open_for_write, mock_read_file):
+    def test_credscache_add_new_sp_creds(self, _, mock_open_for_write, mock_read_file, _2):
         cli = DummyCli()
         test_sp = {
             "servicePrincipalId": "myapp",
@@ -1667,10 +1668,11 @@ class TestProfile(unittest.TestCase):
         self.assertEqual(creds_cache._service_principal_creds, [test_sp])
         self.assertFalse(mock_open_for_write.called)
 
+    @mock.patch('os.replace', autospec=True)
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
     @mock.patch('os.fdopen', autospec=True)
     @mock.patch('os.open', autospec=True)
-    def test_credscache_add_preexisting_sp_new_secret(self, _, mock_open_for_write, mock_read_file):
+    def test_credscache_add_preexisting_sp_new_secret(self, _, mock_open_for_write, mock_read_file, _2):
         cli = DummyCli()
         test_sp = {
             "servicePrincipalId": "myapp",
@@ -1717,10 +1719,11 @@ class TestProfile(unittest.TestCase):
         self.assertRaises(ValueError, creds_cache.retrieve_token_for_service_principal,
                           'myapp', 'resource1', 'mytenant2', False)
 
+    @mock.patch('os.replace', autospec=True)
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
     @mock.patch('os.fdopen', autospec=True)
     @mock.patch('os.open', autospec=True)
-    def test_credscache_remove_creds(self, _, mock_open_for_write, mock_read_file):
+    def test_credscache_remove_creds(self, _, mock_open_for_write, mock_read_file, _2):
         cli = DummyCli()
         test_sp = {
             "servicePrincipalId": "myapp",
@@ -1747,11 +1750,12 @@ class TestProfile(unittest.TestCase):
         mock_open_for_write.assert_called_with(mock.ANY, 'w+')
         self.assertEqual(mock_open_for_write.call_count, 2)
 
+    @mock.patch('os.replace', autospec=True)
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
     @mock.patch('os.fdopen', autospec=True)
     @mock.patch('os.open', autospec=True)
     @mock.patch('adal.AuthenticationContext', autospec=True)
-    def test_credscache_new_token_added_by_adal(self, mock_adal_auth_context, _, mock_open_for_write, mock_read_file):  # pylint: disable=line-too-long
+    def test_credscache_new_token_added_by_adal(self, mock_adal_auth_context, _, mock_open_for_write, mock_read_file, _2):  # pylint: disable=line-too-long
         cli = DummyCli()
         token_entry2 = {
             "accessToken": "new token",
@@ -1760,7 +1764,7 @@ class TestProfile(unittest.TestCase):
         }
 
         def acquire_token_side_effect(*args):  # pylint: disable=unused-argument
-            creds_cache.adal_token_cache.has_state_changed = True
+            creds_cache.adal_token_cache.add([token_entry2])
             return token_entry2
 
         def get_auth_context(_, authority, **kwargs):  # pylint: disable=unused-argument
@@ -1800,6 +1804,93 @@ class TestProfile(unittest.TestCase):
 
         self.assertTrue(re.findall(r'bad error for you', str(context.exception)))
 
+    def _create_token_file_entry(self, access_token, expires_in, resource='https://management.core.windows.net/'):
+        import datetime
+        entry = deepcopy(self.token_entry1)
+        entry['accessToken'] = access_token
+        entry['resource'] = resource
+        entry['_authority'] = 'https://login.microsoftonline.com/' + self.tenant_id
+        entry['expiresOn'] = str(datetime.datetime.now() + datetime.timedelta(seconds=expires_in))
+        return entry
+
+    def test_credscache_merges_changes_of_other_processes(self):
+        import tempfile
+        cli = DummyCli()
+        test_sp = {
+            "servicePrincipalId": "myapp",
+            "servicePrincipalTenant": "mytenant",
+            "accessToken": "Secret"
+        }
+        with tempfile.TemporaryDirectory() as temp_dir:
+            token_file = os.path.join(temp_dir, 'accessTokens.json')
+            with open(token_file, 'w') as f:
+                json.dump([self._create_token_file_entry('token1', 3600)], f)
+            with mock.patch.dict('os.environ', {'AZURE_ACCESS_TOKEN_FILE': token_file}):
+                creds_cache1 = CredsCache(cli, async_persist=False)
+                creds_cache2 = CredsCache(cli, async_persist=False)
+                creds_cache1.load_adal_token_cache()
+                creds_cache2.load_adal_token_cache()
+
+            # action
+            creds_cache1.save_service_principal_cred(test_sp)
+            creds_cache2.remove_cached_creds(self.user1)
+
+            # assert
+            with open(token_file) as f:
+                self.assertEqual(json.load(f), [test_sp])
+            self.assertEqual(creds_cache2._service_principal_creds, [test_sp])
+            self.assertFalse(os.path.exists(token_file + '.{}.tmp'.format(os.getpid())))
+
+    @mock.patch('adal.oauth2_client.OAuth2Client.get_token', autospec=True)
+    def test_credscache_refresh_expiring_token_once(self, mock_get_token):
+        import tempfile
+        cli = DummyCli()
+        mgmt_resource = 'https://management.core.windows.net/'
+        mock_get_token.return_value = {'accessToken': 'token2', 'refreshToken': 'refresh2', 'tokenType': 'Bearer',
+                                       'expiresOn': self._create_token_file_entry('', 3600)['expiresOn']}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            token_file = os.path.join(temp_dir, 'accessTokens.json')
+            with open(token_file, 'w') as f:
+                json.dump([self._create_token_file_entry('token1', 3600),
+                           self._create_token_file_entry('token3', 120, resource='https://vault.azure.net')], f)
+            with mock.patch.dict('os.environ', {'AZURE_ACCESS_TOKEN_FILE': token_file}):
+                creds_caches = [CredsCache(cli, auth_ctx_factory=_AUTH_CTX_FACTORY, async_persist=True)
+                                for _ in range(2)]
+
+            # a valid token is returned from the cache
+            for creds_cache in creds_caches:
+                _, token, _ = creds_cache.retrieve_token_for_user(self.user1, self.tenant_id, mgmt_resource)
+                self.assertEqual(token, 'token1')
+            self.assertEqual(creds_caches[0]._auth_contexts, {})
+
+            # a token expiring within the refresh window is refreshed by the first process only
+            for creds_cache in creds_caches:
+                _, token, _ = creds_cache.retrieve_token_for_user(self.user1, self.tenant_id,
+                                                                  'https://vault.azure.net')
+                self.assertEqual(token, 'token2')
+            self.assertEqual(mock_get_token.call_count, 1)
+            with open(token_file) as f:
+                tokens = {x['resource']: x for x in json.load(f)}
+            self.assertEqual(tokens['https://vault.azure.net']['accessToken'], 'token2')
+            self.assertEqual(tokens[mgmt_resource]['refreshToken'], 'refresh2')
+
+            # a failed refresh returns the token if it is still valid
+            with open(token_file, 'w') as f:
+                json.dump([self._create_token_file_entry('token3', 120)], f)
+            with mock.patch.dict('os.environ', {'AZURE_ACCESS_TOKEN_FILE': token_file}):
+                creds_cache = CredsCache(cli, auth_ctx_factory=_AUTH_CTX_FACTORY, async_persist=True)
+            mock_get_token.side_effect = AdalError('refresh failed')
+            _, token, _ = creds_cache.retrieve_token_for_user(self.user1, self.tenant_id, mgmt_resource)
+            self.assertEqual(token, 'token3')
+
+            # a failed refresh of an expired token raises
+            with open(token_file, 'w') as f:
+                json.dump([self._create_token_file_entry('token4', -7200)], f)
+            with mock.patch.dict('os.environ', {'AZURE_ACCESS_TOKEN_FILE': token_file}):
+                creds_cache = CredsCache(cli, auth_ctx_factory=_AUTH_CTX_FACTORY, async_persist=True)
+            with self.assertRaises(AdalError):
+                creds_cache.retrieve_token_for_user(self.user1, self.tenant_id, mgmt_resource)
+
     def test_service_principal_auth_client_secret(self):
         sp_auth = ServicePrincipalAuth('verySecret!')
         result = sp_auth.get_entry_to_persist('sp_id1', 'tenant1')
@@ -1472,10 +1472,11 @@ class TestProfile(unittest.TestCase):
         self.assertEqual(creds_cache.retrieve_cred_for_service_principal('myapp'), 'Secret')
         self.assertEqual(creds_cache.retrieve_cred_for_service_principal('myapp2'), 'junkcert.pem')
 
+    @mock.patch('os.replace', autospec=True)
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
     @mock.patch('os.fdopen', autospec=True)
     @mock.patch('os.open', autospec=True)
-    def test_credscache_add_new_sp_creds(self, _, mock_open_for_write, mock_read_file):
+    def test_credscache_add_new_sp_creds(self, _, mock_open_for_write, mock_read_file, _2):
         cli = DummyCli()
         test_sp = {
             "servicePrincipalId": "myapp",
@@ -1521,10 +1522,11 @@ class TestProfile(unittest.TestCase):
         self.assertEqual(creds_cache._service_principal_creds, [test_sp])
         self.assertFalse(mock_open_for_write.called)
 
+    @mock.patch('os.replace', autospec=True)
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
     @mock.patch('os.fdopen', autospec=True)
     @mock.patch('os.open', autospec=True)
-    def test_credscache_add_preexisting_sp_new_secret(self, _, mock_open_for_write, mock_read_file):
+    def test_credscache_add_preexisting_sp_new_secret(self, _, mock_open_for_write, mock_read_file, _2):
         cli = DummyCli()
         test_sp = {
             "servicePrincipalId": "myapp",
@@ -1564,10 +1566,11 @@ class TestProfile(unittest.TestCase):
         # we know the matching did go through)
         self.assertRaises(ValueError, creds_cache.retrieve_token_for_service_principal, 'myapp', 'resource1', 'mytenant', False)
 
+    @mock.patch('os.replace', autospec=True)
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
     @mock.patch('os.fdopen', autospec=True)
     @mock.patch('os.open', autospec=True)
-    def test_credscache_remove_creds(self, _, mock_open_for_write, mock_read_file):
+    def test_credscache_remove_creds(self, _, mock_open_for_write, mock_read_file, _2):
         cli = DummyCli()
         test_sp = {
             "servicePrincipalId": "myapp",
@@ -1594,11 +1597,12 @@ class TestProfile(unittest.TestCase):
         mock_open_for_write.assert_called_with(mock.ANY, 'w+')
         self.assertEqual(mock_open_for_write.call_count, 2)
 
+    @mock.patch('os.replace', autospec=True)
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
     @mock.patch('os.fdopen', autospec=True)
     @mock.patch('os.open', autospec=True)
     @mock.patch('adal.AuthenticationContext', autospec=True)
-    def test_credscache_new_token_added_by_adal(self, mock_adal_auth_context, _, mock_open_for_write, mock_read_file):  # pylint: disable=line-too-long
+    def test_credscache_new_token_added_by_adal(self, mock_adal_auth_context, _, mock_open_for_write, mock_read_file, _2):  # pylint: disable=line-too-long
         cli = DummyCli()
         token_entry2 = {
             "accessToken": "new token",
@@ -1607,7 +1611,7 @@ class TestProfile(unittest.TestCase):
         }
 
         def acquire_token_side_effect(*args):  # pylint: disable=unused-argument
-            creds_cache.adal_token_cache.has_state_changed = True
+            creds_cache.adal_token_cache.add([token_entry2])
             return token_entry2
 
         def get_auth_context(_, authority, **kwargs):  # pylint: disable=unused-argument
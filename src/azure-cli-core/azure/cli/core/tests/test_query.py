@@ -0,0 +1,84 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import unittest
+from collections import OrderedDict
+
+import jmespath
+from jmespath import Options
+from jmespath.exceptions import JMESPathError, JMESPathTypeError
+
+from azure.cli.core._query import AzCliQuery, CompiledQuery, compile_query
+
+DATA = [
+    {'name': 'vm1', 'location': 'westus', 'count': 0, 'enabled': True, 'tags': {'env': 'prod', 'team': 'a'},
+     'properties': {'hardwareProfile': {'vmSize': 'Standard_DS1'}, 'disks': [{'size': 30}, {'size': 10}]}},
+    {'name': 'vm2', 'location': 'eastus', 'count': 1, 'enabled': False, 'tags': None,
+     'properties': {'hardwareProfile': {'vmSize': 'Standard_DS2'}, 'disks': []}},
+    {'name': 'vm3', 'location': 'westus', 'count': 5, 'enabled': 1, 'tags': {'env': 'test'},
+     'properties': {'hardwareProfile': None, 'disks': [{'size': 5}]}},
+    {'name': '', 'location': None, 'count': 1.5, 'enabled': 0, 'tags': {}},
+    'not a dict',
+    None,
+    [{'name': 'nested'}],
+]
+
+QUERIES = [
+    '@', '[].name', '[*].name', '[].{n: name, loc: location, size: properties.hardwareProfile.vmSize}',
+    "[?location=='westus']", "[?location!='westus'].name", "[?location=='westus'].{name: name, env: tags.env}",
+    '[?count == `0`].name', '[?count == `1`].name', '[?enabled == `true`].name', '[?enabled == `false`].name',
+    '[?count > `0`].name', '[?count <= `1`].name', "[?name > 'vm1'].name", '[?tags.env].name',
+    "[?location=='westus' && tags.env=='prod'].name", "[?location=='eastus' || count > `1`].name",
+    '[?!enabled].name', '[?!count].name', 'length(@)', 'length([].name)', '[0]', '[-1]', '[1:3]', '[::-1].name',
+    '[].properties.disks[].size', '[].properties.disks[0].size', '[].[name, location]', '[].tags.*',
+    'sort_by([?name].{n: name}, &n)', 'max_by([?count].{c: count}, &c)', '[].name | [0]', 'sum([].count)',
+    "[?name && contains(name, 'vm')].name", '[].tags | [?env]', '[].name || `"x"`',
+    '{first: [0].name, all: length(@)}', '[? `true`].name', "[?location=='westus'] | length(@)",
+    '[].properties.hardwareProfile.vmSize',
+]
+
+
+class TestQuery(unittest.TestCase):
+
+    def test_compiled_query_matches_jmespath(self):
+        for query in QUERIES:
+            for options in (None, Options(OrderedDict)):
+                expected = jmespath.compile(query).search(DATA, options=options)
+                actual = compile_query(query).search(DATA, options=options)
+                self.assertEqual(actual, expected, query)
+                self.assertEqual(type(actual), type(expected), query)
+
+    def test_compiled_query_on_other_values(self):
+        for value in [{}, {'name': 'a'}, 'text', 1, None, [], [1, 2]]:
+            for query in ['name', '[].name', "[?name=='a']", '{n: name}', '[0]', '*.name', '!name']:
+                self.assertEqual(compile_query(query).search(value), jmespath.search(query, value), query)
+
+    def test_compiled_query_errors(self):
+        with self.assertRaises(JMESPathTypeError):
+            compile_query('length(@)').search(5)
+        with self.assertRaises(JMESPathError):
+            compile_query('unknown_function(@)').search(DATA)
+
+    def test_compiled_query_custom_functions(self):
+        from jmespath import functions
+
+        class CustomFunctions(functions.Functions):
+            @functions.signature({'types': ['string']})
+            def _func_shout(self, s):
+                return s.upper()
+
+        query = compile_query('[?name].name | [0] | shout(@)')
+        self.assertEqual(query.search(DATA, Options(custom_functions=CustomFunctions())), 'VM1')
+
+    def test_query_argument_type(self):
+        query = AzCliQuery.jmespath_type('[].name')
+        self.assertIsInstance(query, CompiledQuery)
+        self.assertEqual(query.parsed, jmespath.compile('[].name').parsed)
+        with self.assertRaises(ValueError):
+            AzCliQuery.jmespath_type('[].name[')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from azure.cli.core._session import Session
+
+
+def _set_keys(filename, prefix, count):
+    session = Session()
+    session.load(filename)
+    for i in range(count):
+        session['{}-{}'.format(prefix, i)] = i
+
+
+class TestSession(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.temp_dir, 'session.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _read_file(self):
+        with open(self.filename, 'r', encoding='utf-8-sig') as f:
+            return json.load(f)
+
+    def test_session_set_and_delete(self):
+        session = Session()
+        session.load(self.filename)
+        session['a'] = 1
+        session['b'] = {'c': 2}
+        self.assertEqual(self._read_file(), {'a': 1, 'b': {'c': 2}})
+
+        del session['a']
+        self.assertEqual(self._read_file(), {'b': {'c': 2}})
+
+        loaded = Session()
+        loaded.load(self.filename)
+        self.assertEqual(loaded.data, {'b': {'c': 2}})
+
+    def test_session_keeps_keys_of_other_processes(self):
+        session = Session()
+        session.load(self.filename)
+        other = Session()
+        other.load(self.filename)
+
+        session['a'] = 1
+        other['b'] = 2
+        session['c'] = 3
+        del other['a']
+        self.assertEqual(self._read_file(), {'b': 2, 'c': 3})
+        # The latest content is picked up on saving
+        self.assertEqual(other.data, {'b': 2, 'c': 3})
+
+    def test_session_transaction(self):
+        session = Session()
+        session.load(self.filename)
+        with mock.patch.object(session, '_write', wraps=session._write) as write:
+            with session.transaction():
+                session['a'] = 1
+                with session.transaction():
+                    session['b'] = 2
+                session['c'] = 3
+                del session['a']
+                write.assert_not_called()
+                self.assertFalse(self._read_file())
+            write.assert_called_once()
+        self.assertEqual(self._read_file(), {'b': 2, 'c': 3})
+
+    def test_session_transaction_failure(self):
+        session = Session()
+        session.load(self.filename)
+        session['a'] = 1
+        with self.assertRaises(ValueError):
+            with session.transaction():
+                session['a'] = 2
+                session['b'] = 3
+                raise ValueError('failed')
+        # Nothing of the failed transaction is saved, and the data is loaded again
+        self.assertEqual(self._read_file(), {'a': 1})
+        self.assertEqual(session.data, {'a': 1})
+        session['c'] = 4
+        self.assertEqual(self._read_file(), {'a': 1, 'c': 4})
+
+    def test_session_keeps_indirect_modifications(self):
+        session = Session()
+        session.load(self.filename)
+        other = Session()
+        other.load(self.filename)
+        session['a'] = {'b': 1}
+        other['c'] = 2
+
+        session['a']['b'] = 3
+        session['d'] = 4
+        self.assertEqual(session.data, {'a': {'b': 3}, 'c': 2, 'd': 4})
+        session.save()
+        self.assertEqual(self._read_file(), {'a': {'b': 3}, 'c': 2, 'd': 4})
+
+    def test_session_save_is_atomic(self):
+        session = Session()
+        session.load(self.filename)
+        session['a'] = 1
+
+        with mock.patch('json.dump', side_effect=ValueError('not serializable')):
+            with self.assertRaises(ValueError):
+                session['b'] = 2
+        self.assertEqual(self._read_file(), {'a': 1})
+        self.assertEqual([f for f in os.listdir(self.temp_dir) if f.endswith('.tmp')], [])
+
+    def test_session_concurrent_processes(self):
+        processes = [multiprocessing.Process(target=_set_keys, args=(self.filename, p, 10)) for p in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+        self.assertEqual(len(self._read_file()), 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from azure.cli.core._snapshot import Snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.temp_dir, 'snapshot.bin')
+        self.meta = {'version': '2.0.0', 'cloudProfile': 'latest'}
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_snapshot_update_and_get(self):
+        snapshot = Snapshot(self.filename, self.meta)
+        self.assertIsNone(snapshot.get('vm create'))
+        self.assertEqual(len(snapshot), 0)
+
+        self.assertTrue(snapshot.update({'vm create': {'help': 'create a vm', 'warnings': []}}))
+        self.assertTrue(snapshot.update({'vm': {'help': 'vm group', 'warnings': ['warning']}}))
+
+        snapshot = Snapshot(self.filename, self.meta)
+        self.assertEqual(len(snapshot), 2)
+        self.assertIn('vm', snapshot)
+        self.assertEqual(snapshot.get('vm create'), {'help': 'create a vm', 'warnings': []})
+        self.assertEqual(snapshot.get('vm'), {'help': 'vm group', 'warnings': ['warning']})
+        self.assertEqual(snapshot.get('vm delete', 'missing'), 'missing')
+        snapshot.close()
+
+        # Replace an existing record
+        snapshot.update({'vm': {'help': 'new vm group', 'warnings': []}})
+        self.assertEqual(snapshot.get('vm'), {'help': 'new vm group', 'warnings': []})
+        self.assertEqual(len(snapshot), 2)
+        snapshot.close()
+
+    def test_snapshot_outdated(self):
+        Snapshot(self.filename, self.meta).update({'vm': 'vm group'})
+
+        snapshot = Snapshot(self.filename, {'version': '2.1.0', 'cloudProfile': 'latest'})
+        self.assertIsNone(snapshot.get('vm'))
+        # Outdated records are dropped
+        snapshot.update({'vm create': 'create a vm'})
+        self.assertEqual(len(snapshot), 1)
+        snapshot.close()
+
+    def test_snapshot_corrupted(self):
+        with open(self.filename, 'wb') as f:
+            f.write(b'not a snapshot')
+        snapshot = Snapshot(self.filename, self.meta)
+        self.assertIsNone(snapshot.get('vm'))
+        self.assertTrue(snapshot.update({'vm': 'vm group'}))
+        self.assertEqual(snapshot.get('vm'), 'vm group')
+        snapshot.close()
+
+    def test_snapshot_invalidate(self):
+        snapshot = Snapshot(self.filename, self.meta)
+        snapshot.update({'vm': 'vm group'})
+        self.assertEqual(snapshot.get('vm'), 'vm group')
+
+        snapshot.invalidate()
+        self.assertFalse(os.path.exists(self.filename))
+        self.assertIsNone(snapshot.get('vm'))
+        # Invalidating a missing snapshot is fine
+        Snapshot(self.filename, self.meta).invalidate()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import io
+import json
+import unittest
+from unittest import mock
+
+from azure.core.paging import ItemPaged
+
+from azure.cli.core import AzCommandsLoader
+from azure.cli.core.commands import AzCliCommand
+from azure.cli.core.commands.streaming import StreamedResult, is_streamable_query
+from azure.cli.core.mock import DummyCli
+
+PAGE_SIZE = 3
+ITEM_COUNT = 8
+
+
+def _get_items(pages_fetched):
+    def _get_next(token):
+        start = int(token or 0)
+        pages_fetched.append(start)
+        return start
+
+    def _extract_data(start):
+        items = [{'id': '/subscriptions/sub/resourceGroups/rg{}/providers/p/t/name{}'.format(i % 2, i),
+                  'name': 'name{}'.format(i), 'location': 'west' if i % 3 else 'east'}
+                 for i in range(start, min(start + PAGE_SIZE, ITEM_COUNT))]
+        next_start = start + PAGE_SIZE
+        return (str(next_start) if next_start < ITEM_COUNT else None), iter(items)
+
+    return ItemPaged(_get_next, _extract_data)
+
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.pages_fetched = []
+
+        def _handler(_):
+            return _get_items(self.pages_fetched)
+
+        class TestCommandsLoader(AzCommandsLoader):
+
+            def load_command_table(self, args):
+                super(TestCommandsLoader, self).load_command_table(args)
+                self.command_table = {'list': AzCliCommand(self, 'list', _handler)}
+                return self.command_table
+
+        self.loader_cls = TestCommandsLoader
+
+    def _invoke(self, args, stream):
+        cli = DummyCli(commands_loader_cls=self.loader_cls)
+        out = io.StringIO()
+        with mock.patch.dict('os.environ', {'AZURE_CORE_STREAM_OUTPUT': str(stream).lower()}):
+            exit_code = cli.invoke(args, out_file=out)
+        self.assertEqual(exit_code, 0)
+        return cli, out.getvalue()
+
+    def _assert_same_output(self, args, streamed=True):
+        cli, expected = self._invoke(args, stream=False)
+        self.assertNotIsInstance(cli.result.result, StreamedResult)
+        cli, actual = self._invoke(args, stream=True)
+        self.assertEqual(isinstance(cli.result.result, StreamedResult), streamed)
+        self.assertEqual(actual, expected)
+        return actual
+
+    def test_streaming_json(self):
+        output = self._assert_same_output(['list', '-o', 'json'])
+        items = json.loads(output)
+        self.assertEqual(len(items), ITEM_COUNT)
+        # The global transforms apply to every item
+        self.assertEqual(items[3]['resourceGroup'], 'rg1')
+
+    def test_streaming_tsv(self):
+        output = self._assert_same_output(['list', '-o', 'tsv'])
+        self.assertEqual(len(output.splitlines()), ITEM_COUNT)
+
+    def test_streaming_none(self):
+        self.assertEqual(self._assert_same_output(['list', '-o', 'none']), '')
+        self.assertEqual(len(self.pages_fetched), 6)
+
+    def test_streaming_query(self):
+        self._assert_same_output(['list', '--query', '[].name', '-o', 'tsv'])
+        self._assert_same_output(['list', '--query', "[?location=='east'].{n: name, rg: resourceGroup}"])
+        self.assertEqual(self._assert_same_output(['list', '--query', "[?location=='north']"]), '[]\n')
+        # Queries over the whole list are applied to the collected result
+        self._assert_same_output(['list', '--query', '[1].name'], streamed=False)
+        self._assert_same_output(['list', '--query', 'length(@)'], streamed=False)
+
+    def test_streaming_table_output_is_collected(self):
+        self._assert_same_output(['list', '-o', 'table'], streamed=False)
+
+    def test_streaming_is_lazy(self):
+        cli = DummyCli(commands_loader_cls=self.loader_cls)
+        written = []
+
+        class _Out(io.StringIO):
+            def write(inner_self, s):  # pylint: disable=no-self-argument
+                written.append((s, len(self.pages_fetched)))
+                return super(_Out, inner_self).write(s)
+
+        with mock.patch('azure.cli.core.commands.streaming.STREAM_CHUNK_SIZE', 2), \
+                mock.patch.dict('os.environ', {'AZURE_CORE_STREAM_OUTPUT': 'true'}):
+            cli.invoke(['list', '-o', 'tsv'], out_file=_Out())
+        # The first rows are written before the last page is retrieved
+        self.assertEqual(written[0][1], 1)
+        self.assertEqual(written[-1][1], 3)
+
+    def test_is_streamable_query(self):
+        import jmespath
+        self.assertTrue(is_streamable_query(None))
+        for query in ['[].name', '[*].name', "[?a=='b']", '[?a].{n: name}', '[].tags']:
+            self.assertTrue(is_streamable_query(jmespath.compile(query)), query)
+        for query in ['[0]', '[].a | [0]', 'length(@)', 'name', 'sort_by(@, &name)', 'a[].b']:
+            self.assertFalse(is_streamable_query(jmespath.compile(query)), query)
+
+
+if __name__ == '__main__':
+    unittest.main()
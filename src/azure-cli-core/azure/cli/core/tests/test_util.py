@@ -9,6 +9,7 @@ import os
 import sys
 import unittest
 import mock
+import shutil
 import tempfile
 import json
 
@@ -18,6 +19,7 @@ from azure.cli.core.util import \
      should_disable_connection_verify, parse_proxy_resource_id, get_az_user_agent, get_az_rest_user_agent,
      _get_parent_proc_name)
 from azure.cli.core.mock import DummyCli
+from azure.cli.core.commands.client_factory import close_shared_http_sessions
 
 
 class TestUtils(unittest.TestCase):
@@ -378,6 +380,38 @@ class TestUtils(unittest.TestCase):
             request = send_mock.call_args.args[1]
             self.assertEqual(request.headers['User-Agent'], get_az_rest_user_agent() + ' env-ua ARG-UA')
 
+    @mock.patch('requests.Session.send', autospec=True)
+    def test_send_raw_request_output_file(self, send_mock):
+        import io
+        payload = os.urandom(3 * 1024 * 1024 + 5)
+        response = mock.MagicMock(ok=True, raw=io.BytesIO(payload))
+        send_mock.return_value = response
+
+        cli_ctx = DummyCli()
+        cli_ctx.data = {'command': 'rest'}
+        output_file = os.path.join(tempfile.mkdtemp(), 'payload.bin')
+        try:
+            send_raw_request(cli_ctx, 'GET', 'https://myaccount.blob.core.windows.net/mycontainer/myblob',
+                             skip_authorization_header=True, output_file=output_file)
+            # the payload is streamed to the file
+            self.assertTrue(send_mock.call_args.kwargs['stream'])
+            with open(output_file, 'rb') as f:
+                self.assertEqual(f.read(), payload)
+
+            # the requests share the same session
+            send_raw_request(cli_ctx, 'GET', 'https://myaccount.blob.core.windows.net/mycontainer/myblob',
+                             skip_authorization_header=True)
+            self.assertIs(send_mock.call_args_list[0].args[0], send_mock.call_args_list[1].args[0])
+            self.assertFalse(send_mock.call_args.kwargs['stream'])
+
+            # the session is closed at the end of the invocation
+            close_shared_http_sessions()
+            send_raw_request(cli_ctx, 'GET', 'https://myaccount.blob.core.windows.net/mycontainer/myblob',
+                             skip_authorization_header=True)
+            self.assertIsNot(send_mock.call_args_list[1].args[0], send_mock.call_args_list[2].args[0])
+        finally:
+            shutil.rmtree(os.path.dirname(output_file))
+
     def test_scopes_to_resource(self):
         from azure.cli.core.util import scopes_to_resource
         # scopes as a list
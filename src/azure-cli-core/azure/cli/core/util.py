@@ -325,8 +325,9 @@ def get_cached_latest_versions(versions=None):
                 return cache_versions.copy(), True
 
     versions, success = _update_latest_from_github(versions)
-    VERSIONS['versions'] = versions
-    VERSIONS[_VERSION_UPDATE_TIME] = str(datetime.datetime.now())
+    with VERSIONS.transaction():
+        VERSIONS['versions'] = versions
+        VERSIONS[_VERSION_UPDATE_TIME] = str(datetime.datetime.now())
     return versions.copy(), success
 
 
@@ -794,11 +795,26 @@ def check_connectivity(url='https://example.org', max_retries=5, timeout=1):
     return success
 
 
+# The chunk size used to stream a response to a file
+_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _get_raw_request_session(cli_ctx, url):
+    """Get the requests Session shared by the raw requests to the host of `url`, so that successive requests to the
+    same host reuse its connection instead of doing a new TLS handshake. The session is closed, with its cookies, at
+    the end of the invocation, like the sessions of the management clients."""
+    from urllib.parse import urlparse
+    from azure.cli.core.commands.client_factory import _get_shared_http_session
+    parsed = urlparse(url)
+    return _get_shared_http_session(cli_ctx, ('raw', '{}://{}'.format(parsed.scheme, parsed.netloc)),
+                                    lambda _: None)
+
+
 def send_raw_request(cli_ctx, method, url, headers=None, uri_parameters=None,  # pylint: disable=too-many-locals,too-many-branches,too-many-statements
                      body=None, skip_authorization_header=False, resource=None, output_file=None,
                      generated_client_request_id_name='x-ms-client-request-id'):
     import uuid
-    from requests import Session, Request
+    from requests import Request
     from requests.structures import CaseInsensitiveDict
 
     result = CaseInsensitiveDict()
@@ -913,15 +929,17 @@ def send_raw_request(cli_ctx, method, url, headers=None, uri_parameters=None,  #
                            "If access token is required, use --resource to specify the resource")
 
     # https://requests.readthedocs.io/en/latest/user/advanced/#prepared-requests
-    s = Session()
+    s = _get_raw_request_session(cli_ctx, url)
     req = Request(method=method, url=url, headers=headers, params=uri_parameters, data=body)
     prepped = s.prepare_request(req)
 
+    # Stream the payload to the output file instead of loading it in memory
+    stream = bool(output_file)
     # Merge environment settings into session
-    settings = s.merge_environment_settings(prepped.url, {}, None, not should_disable_connection_verify(), None)
+    settings = s.merge_environment_settings(prepped.url, {}, stream, not should_disable_connection_verify(), None)
     _log_request(prepped)
     r = s.send(prepped, **settings)
-    _log_response(r)
+    _log_response(r, stream=stream)
 
     if not r.ok:
         reason = r.reason
@@ -929,9 +947,12 @@ def send_raw_request(cli_ctx, method, url, headers=None, uri_parameters=None,  #
             reason += '({})'.format(r.text)
         raise CLIError(reason)
     if output_file:
+        import shutil
+        # Let urllib3 decode the gzip/deflate content encoding like `iter_content` does
+        r.raw.decode_content = True
         with open(output_file, 'wb') as fd:
-            for chunk in r.iter_content(chunk_size=128):
-                fd.write(chunk)
+            shutil.copyfileobj(r.raw, fd, _DOWNLOAD_CHUNK_SIZE)
+        r.close()
     return r
 
 
@@ -1179,8 +1200,9 @@ def handle_version_update():
         elif LooseVersion(VERSIONS['versions']['core']['local']) != LooseVersion(__version__):
             logger.debug("Azure CLI has been updated.")
             logger.debug("Clean up versions and refresh cloud endpoints information in local files.")
-            VERSIONS['versions'] = {}
-            VERSIONS['update_time'] = ''
+            with VERSIONS.transaction():
+                VERSIONS['versions'] = {}
+                VERSIONS['update_time'] = ''
             from azure.cli.core.cloud import refresh_known_clouds
             refresh_known_clouds()
     except Exception as ex:  # pylint: disable=broad-except
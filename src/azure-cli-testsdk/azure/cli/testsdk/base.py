@@ -20,7 +20,8 @@ from azure_devtools.scenario_tests.const import MOCKED_SUBSCRIPTION_ID, ENV_SKIP
 
 from .patches import (patch_load_cached_subscriptions, patch_main_exception_handler,
                       patch_retrieve_token_for_user, patch_long_run_operation_delay,
-                      patch_progress_controller, patch_get_current_system_username)
+                      patch_progress_controller, patch_get_current_system_username,
+                      patch_local_caches)
 from .exceptions import CliExecutionError
 from .utilities import find_recording_dir, StorageAccountKeyReplacer, GraphClientPasswordReplacer, GeneralNameReplacer
 from .reverse_dependency import get_dummy_cli
@@ -101,7 +102,7 @@ class ScenarioTest(ReplayableTest, CheckerMixin, unittest.TestCase):
             RequestUrlNormalizer(),
         ]
 
-        default_recording_patches = [patch_main_exception_handler]
+        default_recording_patches = [patch_main_exception_handler, patch_local_caches]
 
         default_replay_patches = [
             patch_main_exception_handler,
@@ -110,6 +111,7 @@ class ScenarioTest(ReplayableTest, CheckerMixin, unittest.TestCase):
             patch_load_cached_subscriptions,
             patch_retrieve_token_for_user,
             patch_progress_controller,
+            patch_local_caches,
         ]
 
         def _merge_lists(base, patches):
@@ -97,3 +97,13 @@ def patch_get_current_system_username(unit_test):
     mock_in_unit_test(unit_test,
                       'azure.cli.core.local_context._get_current_system_username',
                       _get_current_system_username)
+
+
+def patch_local_caches(unit_test):
+    # the names, SKUs and api-versions in a recording must come from the recorded responses, not from the caches of
+    # earlier tests
+    from unittest import mock
+    patcher = mock.patch.dict('os.environ', {'AZURE_ROLE_NAME_CACHE_TTL': '0', 'AZURE_VM_SKU_CACHE_TTL': '0',
+                                             'AZURE_RESOURCE_API_VERSION_CACHE_TTL': '0'})
+    patcher.start()
+    unit_test.addCleanup(patcher.stop)
@@ -9,6 +9,25 @@ import timeit
 start_time = timeit.default_timer()
 
 import sys
+
+
+def _load_daemon_client():
+    # Load the client of the resident process without importing azure.cli.core, as importing Azure CLI takes most of
+    # the time of a command which runs in the resident process
+    from importlib.machinery import PathFinder
+    from importlib.util import find_spec, module_from_spec
+    spec = PathFinder.find_spec('azure.cli.core._daemon_client',
+                                find_spec('azure.cli.core').submodule_search_locations)
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Run the command in the resident process if `core.use_daemon` is turned on
+daemon_exit_code = _load_daemon_client().run_in_daemon(sys.argv[1:])
+if daemon_exit_code is not None:
+    sys.exit(daemon_exit_code)
+
 import uuid
 
 import azure.cli.core.telemetry as telemetry
@@ -3,10 +3,13 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import collections
 import tarfile
 import os
 import re
 import codecs
+import io
+import zlib
 from io import open
 import requests
 from knack.log import get_logger
@@ -19,27 +22,22 @@ from ._constants import TASK_VALID_VSTS_URLS
 logger = get_logger(__name__)
 
 
+# The tar stream is compressed in blocks of this size in parallel, each block into a gzip member. The concatenation
+# of the members is a valid gzip stream.
+_GZIP_BLOCK_SIZE = 1024 * 1024
+# zlib default, much faster than the level 9 tarfile uses, for a slightly larger archive
+_GZIP_COMPRESS_LEVEL = 6
+# Number of packed source trees kept in the local cache by default
+_SOURCE_CACHE_SIZE_DEFAULT = 3
+_SOURCE_CACHE_VERSION = '2'
+
+
 def upload_source_code(cmd, client,
                        registry_name,
                        resource_group_name,
                        source_location,
-                       tar_file_path,
                        docker_file_path,
                        docker_file_in_tar):
-    _pack_source_code(source_location,
-                      tar_file_path,
-                      docker_file_path,
-                      docker_file_in_tar)
-
-    size = os.path.getsize(tar_file_path)
-    unit = 'GiB'
-    for S in ['Bytes', 'KiB', 'MiB', 'GiB']:
-        if size < 1024:
-            unit = S
-            break
-        size = size / 1024.0
-
-    logger.warning("Uploading archived source code from '%s'...", tar_file_path)
     upload_url = None
     relative_path = None
     try:
@@ -53,20 +51,47 @@ def upload_source_code(cmd, client,
     if not upload_url:
         raise CLIError("Failed to get a SAS URL to upload context.")
 
+    # The archive is uploaded while it is packed
+    cache_size = cmd.cli_ctx.config.getint('acr', 'source_cache_size', fallback=_SOURCE_CACHE_SIZE_DEFAULT)
+    cache_dir = os.path.join(cmd.cli_ctx.config.config_dir, 'acr', 'source_cache') if cache_size > 0 else None
+    archive = _ArchiveStream(_pack_source_code(source_location,
+                                               docker_file_path,
+                                               docker_file_in_tar,
+                                               cache_dir=cache_dir,
+                                               cache_size=cache_size))
+
+    logger.warning("Uploading archived source code from '%s'...", source_location)
     account_name, endpoint_suffix, container_name, blob_name, sas_token = get_blob_info(upload_url)
     BlockBlobService = get_sdk(cmd.cli_ctx, ResourceType.DATA_STORAGE, 'blob#BlockBlobService')
     BlockBlobService(account_name=account_name,
                      sas_token=sas_token,
-                     endpoint_suffix=endpoint_suffix).create_blob_from_path(
+                     endpoint_suffix=endpoint_suffix).create_blob_from_stream(
                          container_name=container_name,
                          blob_name=blob_name,
-                         file_path=tar_file_path)
+                         stream=archive)
+
+    size = archive.size
+    unit = 'GiB'
+    for S in ['Bytes', 'KiB', 'MiB', 'GiB']:
+        if size < 1024:
+            unit = S
+            break
+        size = size / 1024.0
+
     logger.warning("Sending context ({0:.3f} {1}) to registry: {2}...".format(
         size, unit, registry_name))
     return relative_path
 
 
-def _pack_source_code(source_location, tar_file_path, docker_file_path, docker_file_in_tar):
+def _pack_source_code(source_location, docker_file_path, docker_file_in_tar, cache_dir=None,
+                      cache_size=_SOURCE_CACHE_SIZE_DEFAULT):
+    """Pack the source code into a gzipped tar, and yield the chunks of the archive.
+
+    The source tree is packed into gzip members compressed in parallel. When `cache_dir` is set, they are cached
+    there under a hash of the tar headers and the content of the archived files, so an unchanged tree is not packed
+    again. The `cache_size`
+    most recently used archives are kept. The Dockerfile is added at the end.
+    """
     logger.warning("Packing source code into tar to upload...")
 
     original_docker_file_name = os.path.basename(docker_file_path.replace("\\", os.sep))
@@ -89,7 +114,7 @@ def _pack_source_code(source_location, tar_file_path, docker_file_path, docker_f
             # at this point, current item should just inherit from parent
             if index >= parent_matching_rule_index:
                 break
-            if re.match(item.pattern, tarinfo.name):
+            if item.regex.match(tarinfo.name):
                 logger.debug(".dockerignore: rule '%s' matches '%s'.",
                              item.rule, tarinfo.name)
                 return item.ignore, index
@@ -99,22 +124,162 @@ def _pack_source_code(source_location, tar_file_path, docker_file_path, docker_f
         # inherit from parent
         return parent_ignored, parent_matching_rule_index
 
-    with tarfile.open(tar_file_path, "w:gz") as tar:
-        # need to set arcname to empty string as the archive root path
-        _archive_file_recursively(tar,
-                                  source_location,
-                                  arcname="",
-                                  parent_ignored=False,
-                                  parent_matching_rule_index=ignore_list_size,
-                                  ignore_check=_ignore_check)
+    # The tar file is only used to create the tar headers
+    tar = tarfile.open(fileobj=io.BytesIO(), mode="w")
+    entries = []
+    # need to set arcname to empty string as the archive root path
+    _archive_file_recursively(tar,
+                              source_location,
+                              arcname="",
+                              parent_ignored=False,
+                              parent_matching_rule_index=ignore_list_size,
+                              ignore_check=_ignore_check,
+                              entries=entries)
+
+    cache_file = None
+    if cache_dir:
+        cache_file = os.path.join(cache_dir, '{}.tar.gz'.format(_get_source_fingerprint(tar, entries)))
+    if cache_file and os.path.isfile(cache_file):
+        logger.warning("Source code is unchanged, using the archive packed previously")
+        os.utime(cache_file)
+        with open(cache_file, "rb") as f:
+            yield from iter(lambda: f.read(_GZIP_BLOCK_SIZE), b'')
+    elif cache_file:
+        yield from _cache_source_archive(_compress_parallel(_iter_tar_blocks(tar, entries)), cache_file)
+        _prune_source_cache(cache_dir, cache_size)
+    else:
+        yield from _compress_parallel(_iter_tar_blocks(tar, entries))
+
+    # Add the Dockerfile if it's specified.
+    # In the case of run, there will be no Dockerfile.
+    entries = []
+    if docker_file_path:
+        entries.append((docker_file_path, tar.gettarinfo(docker_file_path, docker_file_in_tar)))
+    yield from _compress_parallel(_iter_tar_blocks(tar, entries, end_of_archive=True))
+
+
+def _iter_tar_blocks(tar, entries, end_of_archive=False):
+    """Yield the tar headers and the content of the files, like `TarFile.addfile` writes them."""
+    for name, tarinfo in entries:
+        yield tarinfo.tobuf(tar.format, tar.encoding, tar.errors)
+        if tarinfo.isreg():
+            remaining = tarinfo.size
+            with open(name, "rb") as f:
+                while remaining:
+                    data = f.read(min(remaining, _GZIP_BLOCK_SIZE))
+                    if not data:
+                        raise CLIError("'{}' was modified while it was archived.".format(name))
+                    remaining -= len(data)
+                    yield data
+            remainder = tarinfo.size % tarfile.BLOCKSIZE
+            if remainder:
+                yield tarfile.NUL * (tarfile.BLOCKSIZE - remainder)
+    if end_of_archive:
+        yield tarfile.NUL * (tarfile.BLOCKSIZE * 2)
+
+
+def _compress_parallel(chunks):
+    """Compress the chunks in blocks of about `_GZIP_BLOCK_SIZE` bytes, each into a gzip member, in parallel."""
+    from concurrent.futures import ThreadPoolExecutor
+    max_workers = os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # zlib releases the GIL while it compresses
+        pending = collections.deque()
+        block, block_size = [], 0
+        for chunk in chunks:
+            block.append(chunk)
+            block_size += len(chunk)
+            if block_size >= _GZIP_BLOCK_SIZE:
+                pending.append(executor.submit(_gzip_compress, b''.join(block)))
+                block, block_size = [], 0
+                # bound the memory used by the blocks waiting to be read
+                if len(pending) > max_workers * 2:
+                    yield pending.popleft().result()
+        if block:
+            pending.append(executor.submit(_gzip_compress, b''.join(block)))
+        while pending:
+            yield pending.popleft().result()
+
+
+def _gzip_compress(data):
+    compressor = zlib.compressobj(_GZIP_COMPRESS_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _prune_source_cache(cache_dir, cache_size):
+    try:
+        cache_files = sorted((os.path.join(cache_dir, f) for f in os.listdir(cache_dir) if f.endswith('.tar.gz')),
+                             key=os.path.getmtime, reverse=True)
+        for cache_file in cache_files[cache_size:]:
+            os.remove(cache_file)
+    except OSError as e:
+        logger.debug("Failed to clean up the source code cache '%s': %s", cache_dir, e)
+
+
+def _get_source_fingerprint(tar, entries):
+    """A hash of the tar headers and the content of the archived files.
+
+    The content is hashed, as an edit can keep the size and the modification time of a file. Hashing is much faster
+    than compressing.
+    """
+    import hashlib
+    fingerprint = hashlib.sha256(_SOURCE_CACHE_VERSION.encode())
+    fingerprint.update(str((_GZIP_BLOCK_SIZE, _GZIP_COMPRESS_LEVEL)).encode())
+    for name, tarinfo in entries:
+        fingerprint.update(tarinfo.tobuf(tar.format, tar.encoding, tar.errors))
+        if tarinfo.isreg():
+            content = hashlib.sha256()
+            with open(name, "rb") as f:
+                for data in iter(lambda: f.read(_GZIP_BLOCK_SIZE), b''):  # pylint: disable=cell-var-from-loop
+                    content.update(data)
+            fingerprint.update(content.digest())
+    return fingerprint.hexdigest()
+
 
-        # Add the Dockerfile if it's specified.
-        # In the case of run, there will be no Dockerfile.
-        if docker_file_path:
-            docker_file_tarinfo = tar.gettarinfo(
-                docker_file_path, docker_file_in_tar)
-            with open(docker_file_path, "rb") as f:
-                tar.addfile(docker_file_tarinfo, f)
+def _cache_source_archive(members, cache_file):
+    """Write the gzip members to the cache file while they are yielded. The file is complete once they all are."""
+    temp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        cache = open(temp_file, "wb")
+    except OSError as e:
+        logger.debug("Failed to cache the packed source code: %s", e)
+        yield from members
+        return
+    try:
+        with cache:
+            for member in members:
+                cache.write(member)
+                yield member
+        os.replace(temp_file, cache_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+class _ArchiveStream:  # pylint: disable=too-few-public-methods
+    """A readable stream over the chunks of an archive, which counts the bytes read."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b''
+        self.size = 0
+
+    def read(self, size=-1):
+        parts, length = [self._buffer], len(self._buffer)
+        while size < 0 or length < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            parts.append(chunk)
+            length += len(chunk)
+        data = b''.join(parts)
+        if 0 <= size < len(data):
+            data, self._buffer = data[:size], data[size:]
+        else:
+            self._buffer = b''
+        self.size += len(data)
+        return data
 
 
 class IgnoreRule:  # pylint: disable=too-few-public-methods
@@ -143,6 +308,7 @@ class IgnoreRule:  # pylint: disable=too-few-public-methods
                 if index < token_length:
                     self.pattern += "/"  # add back / if it's not the last
         self.pattern += "$"
+        self.regex = re.compile(self.pattern)
 
 
 def _load_dockerignore_file(source_location, original_docker_file_name):
@@ -181,7 +347,8 @@ def _load_dockerignore_file(source_location, original_docker_file_name):
     return ignore_list, len(ignore_list)
 
 
-def _archive_file_recursively(tar, name, arcname, parent_ignored, parent_matching_rule_index, ignore_check):
+def _archive_file_recursively(tar, name, arcname, parent_ignored, parent_matching_rule_index, ignore_check,
+                              entries):
     # create a TarInfo object from the file
     tarinfo = tar.gettarinfo(name, arcname)
 
@@ -193,19 +360,15 @@ def _archive_file_recursively(tar, name, arcname, parent_ignored, parent_matchin
         tarinfo, parent_ignored, parent_matching_rule_index)
 
     if not ignored:
-        # append the tar header and data to the archive
-        if tarinfo.isreg():
-            with open(name, "rb") as f:
-                tar.addfile(tarinfo, f)
-        else:
-            tar.addfile(tarinfo)
+        # the tar header and data are appended to the archive later
+        entries.append((name, tarinfo))
 
     # even the dir is ignored, its child items can still be included, so continue to scan
     if tarinfo.isdir():
         for f in os.listdir(name):
             _archive_file_recursively(tar, os.path.join(name, f), os.path.join(arcname, f),
                                       parent_ignored=ignored, parent_matching_rule_index=matching_rule_index,
-                                      ignore_check=ignore_check)
+                                      ignore_check=ignore_check, entries=entries)
 
 
 def check_remote_source_code(source_location):
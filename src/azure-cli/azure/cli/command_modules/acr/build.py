@@ -5,7 +5,6 @@
 
 
 import uuid
-import tempfile
 
 import os
 
@@ -59,9 +58,6 @@ def acr_build(cmd,  # pylint: disable=too-many-locals
 
         _check_local_docker_file(docker_file_path)
 
-        tar_file_path = os.path.join(tempfile.gettempdir(
-        ), 'build_archive_{}.tar.gz'.format(uuid.uuid4().hex))
-
         try:
             # NOTE: os.path.basename is unable to parse "\" in the file path
             original_docker_file_name = os.path.basename(
@@ -71,19 +67,12 @@ def acr_build(cmd,  # pylint: disable=too-many-locals
 
             source_location = upload_source_code(
                 cmd, client_registries, registry_name, resource_group_name,
-                source_location, tar_file_path,
-                docker_file_path, docker_file_in_tar)
+                source_location, docker_file_path, docker_file_in_tar)
             # For local source, the docker file is added separately into tar as the new file name (docker_file_in_tar)
             # So we need to update the docker_file_path
             docker_file_path = docker_file_in_tar
         except Exception as err:
             raise CLIError(err)
-        finally:
-            try:
-                logger.debug("Deleting the archived source code from '%s'...", tar_file_path)
-                os.remove(tar_file_path)
-            except OSError:
-                pass
     else:
         # NOTE: If docker_file_path is not specified, the default is Dockerfile. It's the same as docker build command.
         if not docker_file_path:
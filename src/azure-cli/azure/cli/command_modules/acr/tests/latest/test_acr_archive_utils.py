@@ -0,0 +1,100 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+from unittest import mock
+
+from azure.cli.command_modules.acr._archive_utils import _pack_source_code, _ArchiveStream
+
+
+class TestArchiveUtils(unittest.TestCase):
+
+    def setUp(self):
+        self.source_dir = tempfile.mkdtemp()
+        self.cache_dir = tempfile.mkdtemp()
+        files = {
+            'Dockerfile': b'FROM scratch\n',
+            '.dockerignore': b'# comment\n**/*.log\n!keep.log\nnode_modules\n',
+            'app/main.py': b'print("hello")\n',
+            'app/debug.log': b'debug\n',
+            'keep.log': b'keep\n',
+            'node_modules/lib/index.js': b'module.exports = {}\n',
+            '.git/HEAD': b'ref: refs/heads/main\n',
+            'data/large.bin': os.urandom(3 * 1024 * 1024 + 100),
+        }
+        for name, content in files.items():
+            path = os.path.join(self.source_dir, *name.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(content)
+        self.files = files
+
+    def tearDown(self):
+        shutil.rmtree(self.source_dir)
+        shutil.rmtree(self.cache_dir)
+
+    def _pack(self, **kwargs):
+        return b''.join(_pack_source_code(self.source_dir, os.path.join(self.source_dir, 'Dockerfile'),
+                                          'docker_file_in_tar', **kwargs))
+
+    def _read_archive(self, archive):
+        with tarfile.open(fileobj=io.BytesIO(archive), mode='r:gz') as tar:
+            return {m.name: tar.extractfile(m).read() if m.isreg() else None for m in tar.getmembers()}
+
+    def test_pack_source_code(self):
+        members = self._read_archive(self._pack())
+        self.assertEqual(sorted(name for name, content in members.items() if content is not None),
+                         ['.dockerignore', 'Dockerfile', 'app/main.py', 'data/large.bin', 'docker_file_in_tar',
+                          'keep.log'])
+        self.assertEqual(members['data/large.bin'], self.files['data/large.bin'])
+        self.assertEqual(members['docker_file_in_tar'], self.files['Dockerfile'])
+        self.assertIn('app', members)
+        self.assertNotIn('node_modules', members)
+
+    def test_pack_source_code_cache(self):
+        archive = self._pack(cache_dir=self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        # the unchanged tree is read from the cache
+        with mock.patch('azure.cli.command_modules.acr._archive_utils._cache_source_archive') as cache_mock:
+            self.assertEqual(self._pack(cache_dir=self.cache_dir), archive)
+        self.assertFalse(cache_mock.called)
+
+        # a modified tree is packed again, and the least recently used archive is removed
+        with open(os.path.join(self.source_dir, 'app', 'main.py'), 'ab') as f:
+            f.write(b'print("world")\n')
+        members = self._read_archive(self._pack(cache_dir=self.cache_dir, cache_size=1))
+        self.assertEqual(members['app/main.py'], b'print("hello")\nprint("world")\n')
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_pack_source_code_cache_checks_content(self):
+        self._pack(cache_dir=self.cache_dir)
+
+        # an edit which keeps the size and the modification time of the file is packed again
+        path = os.path.join(self.source_dir, 'app', 'main.py')
+        stat = os.stat(path)
+        with open(path, 'wb') as f:
+            f.write(b'print("HELLO")\n')
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        members = self._read_archive(self._pack(cache_dir=self.cache_dir))
+        self.assertEqual(members['app/main.py'], b'print("HELLO")\n')
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_archive_stream(self):
+        stream = _ArchiveStream(iter([b'abc', b'', b'defgh', b'i']))
+        self.assertEqual(stream.read(2), b'ab')
+        self.assertEqual(stream.read(4), b'cdef')
+        self.assertEqual(stream.read(), b'ghi')
+        self.assertEqual(stream.read(10), b'')
+        self.assertEqual(stream.size, 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+# pylint: disable=line-too-long
+
+import json
+import threading
+import time
+
+from knack.log import get_logger
+from knack.util import CLIError
+from azure.appconfiguration import ResourceReadOnlyError
+from azure.core.exceptions import HttpResponseError
+
+from ._constants import BulkWriteConstants, StatusCodes
+from ._models import convert_keyvalue_to_configurationsetting
+
+logger = get_logger(__name__)
+
+
+def __write_key_values_concurrently(azconfig_client, key_values):
+    """Set the key-values with bounded concurrency, and warn about the ones which failed."""
+    try:
+        failures = __set_key_values_concurrently(azconfig_client, key_values, (HttpResponseError,))
+    except CLIError:
+        raise
+    except Exception as exception:
+        raise CLIError(str(exception))
+
+    if failures:
+        exception_messages = []
+        for kv, exception in failures:
+            if isinstance(exception, ResourceReadOnlyError):
+                exception_messages.append("Failed to set read only key-value with key '{}' and label '{}'. Unlock the key-value before updating it.".format(kv.key, kv.label))
+            else:
+                exception_messages.append("Failed to set key-value with key '{}' and label '{}'. {}".format(kv.key, kv.label, str(exception)))
+        logger.warning('Failed to set %d out of %d key-values. The following error(s) occurred:\n%s\n',
+                       len(failures), len(key_values), json.dumps(exception_messages, indent=2, ensure_ascii=False))
+
+
+def __set_key_values_concurrently(azconfig_client, key_values, expected_errors):
+    """Set the key-values with bounded concurrency.
+
+    Returns the list of (key-value, exception) which failed with one of `expected_errors`. Any other exception is
+    raised once the requests in flight are done.
+    """
+    def _set(kv):
+        azconfig_client.set_configuration_setting(convert_keyvalue_to_configurationsetting(kv))
+    return __run_concurrently(_set, key_values, expected_errors)
+
+
+def __delete_key_values_concurrently(azconfig_client, key_values, expected_errors):
+    """Delete the key-values, if they are not modified since they were read, with bounded concurrency.
+
+    Returns the list of (key-value, exception) which failed with one of `expected_errors`. Any other exception is
+    raised once the requests in flight are done.
+    """
+    from azure.core import MatchConditions
+
+    def _delete(kv):
+        azconfig_client.delete_configuration_setting(key=kv.key,
+                                                     label=kv.label,
+                                                     etag=kv.etag,
+                                                     match_condition=MatchConditions.IfNotModified)
+    return __run_concurrently(_delete, key_values, expected_errors)
+
+
+def __run_concurrently(operation, key_values, expected_errors):
+    # A fixed number of workers take the key-values one at a time, so the number of requests in flight is bounded.
+    # When the store throttles a request, every worker waits for the retry-after interval before sending its next
+    # request, rather than each worker running into the request quota on its own.
+    from concurrent.futures import ThreadPoolExecutor
+
+    pending = iter(key_values)
+    lock = threading.Lock()
+    throttle = _Throttle()
+    failures = []
+    unexpected_errors = []
+
+    def _worker():
+        while True:
+            with lock:
+                kv = None if unexpected_errors else next(pending, None)
+            if kv is None:
+                return
+            try:
+                __run_with_retries(operation, kv, throttle)
+            except expected_errors as exception:
+                with lock:
+                    failures.append((kv, exception))
+            except Exception as exception:  # pylint: disable=broad-except
+                with lock:
+                    unexpected_errors.append(exception)
+
+    worker_count = min(BulkWriteConstants.MAX_CONCURRENCY, len(key_values))
+    if worker_count:
+        with ThreadPoolExecutor(max_workers=worker_count) as executor:
+            for _ in range(worker_count):
+                executor.submit(_worker)
+
+    if unexpected_errors:
+        raise unexpected_errors[0]
+    # Report the failures in the order of the key-values
+    order = {id(kv): index for index, kv in enumerate(key_values)}
+    return sorted(failures, key=lambda failure: order[id(failure[0])])
+
+
+def __run_with_retries(operation, kv, throttle):
+    for attempt in range(1, BulkWriteConstants.MAX_ATTEMPTS + 1):
+        throttle.wait()
+        try:
+            return operation(kv)
+        except HttpResponseError as exception:
+            if attempt == BulkWriteConstants.MAX_ATTEMPTS or \
+                    exception.status_code not in (StatusCodes.TOO_MANY_REQUESTS, StatusCodes.SERVICE_UNAVAILABLE):
+                raise
+            retry_after = _get_retry_after(exception.response)
+            if retry_after is None:
+                retry_after = BulkWriteConstants.DEFAULT_RETRY_AFTER * 2 ** (attempt - 1)
+            logger.debug("Request for key '%s' and label '%s' was throttled, retrying in %.1f seconds.",
+                         kv.key, kv.label, retry_after)
+            throttle.pause(retry_after)
+    return None
+
+
+def _get_retry_after(response):
+    headers = getattr(response, 'headers', None) or {}
+    for header, scale in (('retry-after-ms', 0.001), ('x-ms-retry-after-ms', 0.001), ('retry-after', 1)):
+        try:
+            return float(headers[header]) * scale
+        except (KeyError, TypeError, ValueError):
+            pass
+    return None
+
+
+class _Throttle:
+    """The time until which the workers of a bulk write hold their requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resume_at = 0
+
+    def pause(self, seconds):
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    def wait(self):
+        with self._lock:
+            delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
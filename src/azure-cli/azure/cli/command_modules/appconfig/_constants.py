@@ -19,6 +19,17 @@ class KeyVaultConstants:
     APPSVC_KEYVAULT_PREFIX = "@Microsoft.KeyVault"
 
 
+class BulkWriteConstants:
+    """Limits of the key-value writes of import, export and restore
+    """
+    # Requests in flight at a time. Kept below the size of the connection pool of the client.
+    MAX_CONCURRENCY = 8
+    # Attempts of a request throttled by the configuration store
+    MAX_ATTEMPTS = 5
+    # Pause in seconds when a throttled response has no retry-after header, doubled on each attempt
+    DEFAULT_RETRY_AFTER = 1
+
+
 class SearchFilterOptions:
     ANY_KEY = '*'
     ANY_LABEL = '*'
@@ -15,9 +15,9 @@ import yaml
 from jsondiff import JsonDiffer
 from knack.log import get_logger
 from knack.util import CLIError
-from azure.appconfiguration import ResourceReadOnlyError
 from azure.core.exceptions import HttpResponseError
 
+from ._bulk_write import __write_key_values_concurrently
 from ._constants import (FeatureFlagConstants, KeyVaultConstants)
 from ._utils import user_confirmation, prep_label_filter_for_url_encoding
 from ._models import (KeyValue, convert_configurationsetting_to_keyvalue,
@@ -67,10 +67,14 @@ class FeatureManagementReservedKeywords:
             select_keywords()
 
 
-def __compare_kvs_for_restore(restore_kvs, current_kvs):
+def __compare_kvs_for_restore(restore_kvs, current_kvs, compare_locked=True):
     # compares two lists and find those that are new or changed in the restore_kvs
     # optionally (delete == True) find the new ones in current_kvs for deletion
-    dict_current_kvs = {(kv.key, kv.label): (kv.value, kv.content_type, kv.locked, kv.tags) for kv in current_kvs}
+    # compare_locked == False ignores the lock state, which setting a key-value doesn't change
+    def _comparable(kv):
+        return kv.value, kv.content_type, kv.locked if compare_locked else None, kv.tags or {}
+
+    dict_current_kvs = {(kv.key, kv.label): _comparable(kv) for kv in current_kvs}
     kvs_to_restore = []
     kvs_to_modify = []
     kvs_to_delete = []
@@ -78,7 +82,7 @@ def __compare_kvs_for_restore(restore_kvs, current_kvs):
         current_tuple = dict_current_kvs.get((entry.key, entry.label), None)
         if current_tuple is None:
             kvs_to_restore.append(entry)
-        elif current_tuple != (entry.value, entry.content_type, entry.locked, entry.tags):
+        elif current_tuple != _comparable(entry):
             kvs_to_modify.append(entry)
 
     set_restore_kvs = {(kv.key, kv.label) for kv in restore_kvs}
@@ -337,7 +341,9 @@ def __write_kv_and_features_to_config_store(azconfig_client,
                                             features=None,
                                             label=None,
                                             preserve_labels=False,
-                                            content_type=None):
+                                            content_type=None,
+                                            current_kvs=None):
+    # current_kvs are the key-values read from the store for the preview, the unchanged ones are not written again
     if not key_values and not features:
         return
 
@@ -345,6 +351,7 @@ def __write_kv_and_features_to_config_store(azconfig_client,
     if features:
         key_values.extend(__convert_featureflag_list_to_keyvalue_list(features))
 
+    kvs_to_write = []
     for kv in key_values:
         set_kv = convert_keyvalue_to_configurationsetting(kv)
         if not preserve_labels:
@@ -354,14 +361,14 @@ def __write_kv_and_features_to_config_store(azconfig_client,
         if content_type and not __is_feature_flag(set_kv):
             set_kv.content_type = content_type
 
-        try:
-            azconfig_client.set_configuration_setting(set_kv)
-        except ResourceReadOnlyError:
-            logger.warning("Failed to set read only key-value with key '%s' and label '%s'. Unlock the key-value before updating it.", set_kv.key, set_kv.label)
-        except HttpResponseError as exception:
-            logger.warning("Failed to set key-value with key '%s' and label '%s'. %s", set_kv.key, set_kv.label, str(exception))
-        except Exception as exception:
-            raise CLIError(str(exception))
+        kvs_to_write.append(convert_configurationsetting_to_keyvalue(set_kv))
+
+    if current_kvs is not None:
+        kvs_to_add, kvs_to_modify, _ = __compare_kvs_for_restore(kvs_to_write, current_kvs, compare_locked=False)
+        logger.debug('Skipping %d unchanged key-values.', len(kvs_to_write) - len(kvs_to_add) - len(kvs_to_modify))
+        kvs_to_write = kvs_to_add + kvs_to_modify
+
+    __write_key_values_concurrently(azconfig_client, kvs_to_write)
 
 
 def __is_feature_flag(kv):
@@ -9,7 +9,6 @@ import json
 import time
 import sys
 
-from itertools import chain
 from knack.log import get_logger
 from knack.util import CLIError
 
@@ -22,15 +21,16 @@ from azure.core.exceptions import (HttpResponseError,
 
 from ._constants import (FeatureFlagConstants, KeyVaultConstants,
                          SearchFilterOptions, StatusCodes)
-from ._models import (convert_configurationsetting_to_keyvalue,
-                      convert_keyvalue_to_configurationsetting)
+from ._models import convert_configurationsetting_to_keyvalue
 from ._utils import get_appconfig_data_client, user_confirmation, prep_label_filter_for_url_encoding
 
 from ._kv_helpers import (__compare_kvs_for_restore, __read_kv_from_file, __read_features_from_file,
                           __write_kv_and_features_to_file, __read_kv_from_config_store, __is_json_content_type,
                           __write_kv_and_features_to_config_store, __discard_features_from_retrieved_kv, __read_kv_from_app_service,
                           __write_kv_to_app_service, __serialize_kv_list_to_comparable_json_object, __serialize_features_from_kv_list_to_comparable_json_object,
-                          __serialize_feature_list_to_comparable_json_object, __print_features_preview, __print_preview, __print_restore_preview)
+                          __serialize_feature_list_to_comparable_json_object, __print_features_preview, __print_preview, __print_restore_preview,
+                          __convert_featureflag_list_to_keyvalue_list)
+from ._bulk_write import __set_key_values_concurrently, __delete_key_values_concurrently
 from .feature import list_feature
 
 logger = get_logger(__name__)
@@ -127,14 +127,23 @@ def import_config(cmd,
         src_kvs = __read_kv_from_app_service(
             cmd, appservice_account=appservice_account, prefix_to_add=prefix, content_type=content_type)
 
+    # fetch key values from user's configstore, for the preview and to skip writing the unchanged ones
+    dest_kvs = __read_kv_from_config_store(azconfig_client,
+                                           key=SearchFilterOptions.ANY_KEY,
+                                           label=label if label else SearchFilterOptions.EMPTY_LABEL)
+    __discard_features_from_retrieved_kv(dest_kvs)
+
+    if src_features and not skip_features:
+        # Append all features to dest_features list
+        all_features = __read_kv_from_config_store(azconfig_client,
+                                                   key=FeatureFlagConstants.FEATURE_FLAG_PREFIX + '*',
+                                                   label=label if label else SearchFilterOptions.EMPTY_LABEL)
+        for feature in all_features:
+            if feature.content_type == FeatureFlagConstants.FEATURE_FLAG_CONTENT_TYPE:
+                dest_features.append(feature)
+
     # if customer needs preview & confirmation
     if not yes:
-        # fetch key values from user's configstore
-        dest_kvs = __read_kv_from_config_store(azconfig_client,
-                                               key=SearchFilterOptions.ANY_KEY,
-                                               label=label if label else SearchFilterOptions.EMPTY_LABEL)
-        __discard_features_from_retrieved_kv(dest_kvs)
-
         # generate preview and wait for user confirmation
         need_kv_change = __print_preview(
             old_json=__serialize_kv_list_to_comparable_json_object(keyvalues=dest_kvs, level=source),
@@ -142,14 +151,6 @@ def import_config(cmd,
 
         need_feature_change = False
         if src_features and not skip_features:
-            # Append all features to dest_features list
-            all_features = __read_kv_from_config_store(azconfig_client,
-                                                       key=FeatureFlagConstants.FEATURE_FLAG_PREFIX + '*',
-                                                       label=label if label else SearchFilterOptions.EMPTY_LABEL)
-            for feature in all_features:
-                if feature.content_type == FeatureFlagConstants.FEATURE_FLAG_CONTENT_TYPE:
-                    dest_features.append(feature)
-
             need_feature_change = __print_features_preview(
                 old_json=__serialize_features_from_kv_list_to_comparable_json_object(keyvalues=dest_features),
                 new_json=__serialize_features_from_kv_list_to_comparable_json_object(keyvalues=src_features))
@@ -162,12 +163,13 @@ def import_config(cmd,
     # append all feature flags to src_kvs list
     src_kvs.extend(src_features)
 
-    # import into configstore
+    # import into configstore, skipping the key-values which are unchanged
     __write_kv_and_features_to_config_store(azconfig_client,
                                             key_values=src_kvs,
                                             label=label,
                                             preserve_labels=preserve_labels,
-                                            content_type=content_type)
+                                            content_type=content_type,
+                                            current_kvs=dest_kvs + dest_features)
 
 
 def export_config(cmd,
@@ -246,27 +248,27 @@ def export_config(cmd,
                                         auth_mode=auth_mode,
                                         endpoint=endpoint)
 
+    if destination == 'appconfig':
+        # fetch the destination key values, for the preview and to skip writing the unchanged ones
+        dest_kvs = __read_kv_from_config_store(dest_azconfig_client,
+                                               key=SearchFilterOptions.ANY_KEY,
+                                               label=dest_label if dest_label else SearchFilterOptions.EMPTY_LABEL)
+        __discard_features_from_retrieved_kv(dest_kvs)
+
+        if not skip_features:
+            # Append all features to dest_features list
+            dest_features = list_feature(cmd,
+                                         feature='*',
+                                         label=dest_label if dest_label else SearchFilterOptions.EMPTY_LABEL,
+                                         name=dest_name,
+                                         connection_string=dest_connection_string,
+                                         all_=True,
+                                         auth_mode=dest_auth_mode,
+                                         endpoint=dest_endpoint)
+
     # if customer needs preview & confirmation
     if not yes:
-        if destination == 'appconfig':
-            # dest_kvs contains features and KV that match the label
-            dest_kvs = __read_kv_from_config_store(dest_azconfig_client,
-                                                   key=SearchFilterOptions.ANY_KEY,
-                                                   label=dest_label if dest_label else SearchFilterOptions.EMPTY_LABEL)
-            __discard_features_from_retrieved_kv(dest_kvs)
-
-            if not skip_features:
-                # Append all features to dest_features list
-                dest_features = list_feature(cmd,
-                                             feature='*',
-                                             label=dest_label if dest_label else SearchFilterOptions.EMPTY_LABEL,
-                                             name=dest_name,
-                                             connection_string=dest_connection_string,
-                                             all_=True,
-                                             auth_mode=dest_auth_mode,
-                                             endpoint=dest_endpoint)
-
-        elif destination == 'appservice':
+        if destination == 'appservice':
             dest_kvs = __read_kv_from_app_service(cmd, appservice_account=appservice_account)
 
         # generate preview and wait for user confirmation
@@ -292,7 +294,8 @@ def export_config(cmd,
                                         naming_convention=naming_convention)
     elif destination == 'appconfig':
         __write_kv_and_features_to_config_store(dest_azconfig_client, key_values=src_kvs, features=src_features,
-                                                label=dest_label, preserve_labels=preserve_labels)
+                                                label=dest_label, preserve_labels=preserve_labels,
+                                                current_kvs=dest_kvs + __convert_featureflag_list_to_keyvalue_list(dest_features))
     elif destination == 'appservice':
         __write_kv_to_app_service(cmd, key_values=src_kvs, appservice_account=appservice_account)
 
@@ -675,34 +678,28 @@ def restore_key(cmd,
                 return
 
         keys_to_restore = len(kvs_to_restore) + len(kvs_to_modify) + len(kvs_to_delete)
-        restored_so_far = 0
-
-        for kv in chain(kvs_to_restore, kvs_to_modify):
-            set_kv = convert_keyvalue_to_configurationsetting(kv)
-            try:
-                azconfig_client.set_configuration_setting(set_kv)
-                restored_so_far += 1
-            except ResourceReadOnlyError:
-                exception = "Failed to update read-only key-value with key '{}' and label '{}'. Unlock the key-value before updating it.".format(set_kv.key, set_kv.label)
-                exception_messages.append(exception)
-            except ResourceModifiedError:
-                exception = "Failed to update key-value with key '{}' and label '{}' due to a conflicting operation.".format(set_kv.key, set_kv.label)
-                exception_messages.append(exception)
-
-        for kv in kvs_to_delete:
-            try:
-                azconfig_client.delete_configuration_setting(key=kv.key,
-                                                             label=kv.label,
-                                                             etag=kv.etag,
-                                                             match_condition=MatchConditions.IfNotModified)
-                restored_so_far += 1
-            except ResourceReadOnlyError:
+
+        failures = __set_key_values_concurrently(azconfig_client,
+                                                 kvs_to_restore + kvs_to_modify,
+                                                 (ResourceReadOnlyError, ResourceModifiedError))
+        for kv, exception in failures:
+            if isinstance(exception, ResourceReadOnlyError):
+                exception = "Failed to update read-only key-value with key '{}' and label '{}'. Unlock the key-value before updating it.".format(kv.key, kv.label)
+            else:
+                exception = "Failed to update key-value with key '{}' and label '{}' due to a conflicting operation.".format(kv.key, kv.label)
+            exception_messages.append(exception)
+
+        delete_failures = __delete_key_values_concurrently(azconfig_client,
+                                                           kvs_to_delete,
+                                                           (ResourceReadOnlyError, ResourceModifiedError))
+        for kv, exception in delete_failures:
+            if isinstance(exception, ResourceReadOnlyError):
                 exception = "Failed to delete read-only key-value with key '{}' and label '{}'. Unlock the key-value before deleting it.".format(kv.key, kv.label)
-                exception_messages.append(exception)
-            except ResourceModifiedError:
+            else:
                 exception = "Failed to delete key-value with key '{}' and label '{}' due to a conflicting operation.".format(kv.key, kv.label)
-                exception_messages.append(exception)
+            exception_messages.append(exception)
 
+        restored_so_far = keys_to_restore - len(failures) - len(delete_failures)
         if restored_so_far != keys_to_restore:
             logger.error('Failed after restoring %d out of %d keys. The following error(s) occurred:\n%s\n',
                          restored_so_far, keys_to_restore, json.dumps(exception_messages, indent=2, ensure_ascii=False))
@@ -0,0 +1,120 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import unittest
+from unittest import mock
+
+from azure.appconfiguration import ResourceReadOnlyError
+from azure.core.exceptions import HttpResponseError
+
+from azure.cli.command_modules.appconfig._bulk_write import __set_key_values_concurrently as set_key_values_concurrently
+from azure.cli.command_modules.appconfig._kv_helpers import __write_kv_and_features_to_config_store as write_kv_and_features_to_config_store
+from azure.cli.command_modules.appconfig._constants import FeatureFlagConstants
+from azure.cli.command_modules.appconfig._featuremodels import FeatureFlag, FeatureState
+from azure.cli.command_modules.appconfig._models import KeyValue
+from azure.cli.command_modules.appconfig.keyvalue import import_config, export_config
+
+
+def _throttled_error(headers):
+    error = HttpResponseError(message='Too many requests')
+    error.status_code = 429
+    error.response = mock.MagicMock(headers=headers)
+    return error
+
+
+class TestKeyValueBulkWrites(unittest.TestCase):
+
+    @mock.patch('time.sleep')
+    def test_set_key_values_concurrently(self, sleep_mock):
+        client = mock.MagicMock()
+        throttled = set()
+
+        def _set(setting):
+            if setting.key == 'readonly':
+                raise ResourceReadOnlyError(message='The key is read only')
+            if setting.key == 'throttled' and setting.key not in throttled:
+                throttled.add(setting.key)
+                raise _throttled_error({'retry-after-ms': '1500'})
+        client.set_configuration_setting.side_effect = _set
+
+        key_values = [KeyValue(key='key{}'.format(i), value='value') for i in range(20)]
+        key_values += [KeyValue(key='readonly', value='value'), KeyValue(key='throttled', value='value')]
+        failures = set_key_values_concurrently(client, key_values, (HttpResponseError,))
+
+        self.assertEqual(client.set_configuration_setting.call_count, 23)
+        self.assertEqual([(kv.key, type(ex)) for kv, ex in failures], [('readonly', ResourceReadOnlyError)])
+        # the next requests wait for the retry-after interval of the throttled response
+        self.assertTrue(any(call[0][0] > 1 for call in sleep_mock.call_args_list))
+
+    @mock.patch('time.sleep')
+    def test_set_key_values_gives_up_when_throttled(self, _):
+        client = mock.MagicMock()
+        client.set_configuration_setting.side_effect = _throttled_error({})
+
+        failures = set_key_values_concurrently(client, [KeyValue(key='key', value='value')], (HttpResponseError,))
+        self.assertEqual(client.set_configuration_setting.call_count, 5)
+        self.assertEqual(len(failures), 1)
+
+    def test_write_kv_skips_unchanged_key_values(self):
+        client = mock.MagicMock()
+        current_kvs = [KeyValue(key='same', value='value', label='dev', tags={}, locked=True),
+                       KeyValue(key='changed', value='old', label='dev', tags={}),
+                       KeyValue(key='same', value='value', label='prod', tags={})]
+        key_values = [KeyValue(key='same', value='value'),
+                      KeyValue(key='changed', value='new'),
+                      KeyValue(key='new', value='value')]
+
+        write_kv_and_features_to_config_store(client, key_values=key_values, label='dev', current_kvs=current_kvs)
+
+        written = sorted((call[0][0].key, call[0][0].label) for call in client.set_configuration_setting.call_args_list)
+        self.assertEqual(written, [('changed', 'dev'), ('new', 'dev')])
+
+
+class TestImportExportWrites(unittest.TestCase):
+
+    def _written(self, client):
+        return sorted((call[0][0].key, call[0][0].label) for call in client.set_configuration_setting.call_args_list)
+
+    @mock.patch('azure.cli.command_modules.appconfig.keyvalue.__read_features_from_file')
+    @mock.patch('azure.cli.command_modules.appconfig.keyvalue.__read_kv_from_file')
+    @mock.patch('azure.cli.command_modules.appconfig.keyvalue.__read_kv_from_config_store')
+    @mock.patch('azure.cli.command_modules.appconfig.keyvalue.get_appconfig_data_client')
+    def test_import_with_yes_skips_unchanged_key_values(self, get_client_mock, read_store_mock, read_file_mock,
+                                                        read_features_mock):
+        client = get_client_mock.return_value
+        feature = KeyValue(key='.appconfig.featureflag/beta', value='{"id": "beta"}', label='dev', tags={},
+                           content_type=FeatureFlagConstants.FEATURE_FLAG_CONTENT_TYPE)
+        read_file_mock.return_value = [KeyValue(key='same', value='value'), KeyValue(key='changed', value='new')]
+        read_features_mock.return_value = [KeyValue(key=feature.key, value=feature.value, label='dev', tags={},
+                                                    content_type=feature.content_type)]
+        read_store_mock.side_effect = [[KeyValue(key='same', value='value', label='dev', tags={}),
+                                        KeyValue(key='changed', value='old', label='dev', tags={})],
+                                       [feature]]
+
+        import_config(mock.MagicMock(), 'file', label='dev', yes=True, path='settings.json', format_='json')
+
+        self.assertEqual(self._written(client), [('changed', 'dev')])
+
+    @mock.patch('azure.cli.command_modules.appconfig.keyvalue.list_feature')
+    @mock.patch('azure.cli.command_modules.appconfig.keyvalue.__read_kv_from_config_store')
+    @mock.patch('azure.cli.command_modules.appconfig.keyvalue.get_appconfig_data_client')
+    def test_export_with_yes_skips_unchanged_key_values(self, get_client_mock, read_store_mock, list_feature_mock):
+        src_client, dest_client = mock.MagicMock(), mock.MagicMock()
+        get_client_mock.side_effect = [src_client, dest_client]
+        read_store_mock.side_effect = [[KeyValue(key='same', value='value', label='dev', tags={}),
+                                        KeyValue(key='changed', value='new', label='dev', tags={})],
+                                       [KeyValue(key='same', value='value', label='prod', tags={}),
+                                        KeyValue(key='changed', value='old', label='prod', tags={})]]
+        list_feature_mock.side_effect = [
+            [FeatureFlag('beta', label='dev', state=FeatureState.ON, conditions={'client_filters': []})],
+            [FeatureFlag('beta', label='prod', state=FeatureState.ON, conditions={'client_filters': []})]]
+
+        export_config(mock.MagicMock(), 'appconfig', label='dev', yes=True, dest_name='dest', dest_label='prod')
+
+        self.assertEqual(self._written(dest_client), [('changed', 'prod')])
+
+
+if __name__ == '__main__':
+    unittest.main()
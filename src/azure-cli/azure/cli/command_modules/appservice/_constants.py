@@ -69,3 +69,8 @@ GENERATE_RANDOM_APP_NAMES = os.path.abspath(os.path.join(os.path.abspath(__file_
                                                          '../resources/GenerateRandomAppNames.json'))
 
 PUBLIC_CLOUD = "AzureCloud"
+
+# Interval in seconds between the polls of the zip deployment status. It grows while the status doesn't change.
+ZIP_DEPLOY_POLL_INTERVAL_MIN = 0.5
+ZIP_DEPLOY_POLL_INTERVAL_MAX = 5
+ZIP_DEPLOY_TIMEOUT_DEFAULT = 900
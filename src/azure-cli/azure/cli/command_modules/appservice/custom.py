@@ -56,14 +56,15 @@ from .vsts_cd_provider import VstsContinuousDeliveryProvider
 from ._params import AUTH_TYPES, MULTI_CONTAINER_TYPES
 from ._client_factory import web_client_factory, ex_handler_factory, providers_client_factory
 from ._appservice_utils import _generic_site_operation
-from .utils import _normalize_sku, get_sku_name, retryable_method
+from .utils import _normalize_sku, get_sku_name, retryable_method, ProgressFileReader
 from ._create_util import (zip_contents_from_dir, get_runtime_version_details, create_resource_group, get_app_details,
                            should_create_new_rg, set_location, get_site_availability, get_profile_username,
                            get_plan_to_use, get_lang_from_content, get_rg_to_use, get_sku_to_use,
                            detect_os_form_src, get_current_stack_from_runtime, generate_default_app_name)
 from ._constants import (FUNCTIONS_STACKS_API_JSON_PATHS, FUNCTIONS_STACKS_API_KEYS,
                          FUNCTIONS_LINUX_RUNTIME_VERSION_REGEX, FUNCTIONS_WINDOWS_RUNTIME_VERSION_REGEX,
-                         NODE_EXACT_VERSION_DEFAULT, RUNTIME_STACKS, FUNCTIONS_NO_V2_REGIONS, PUBLIC_CLOUD)
+                         NODE_EXACT_VERSION_DEFAULT, RUNTIME_STACKS, FUNCTIONS_NO_V2_REGIONS, PUBLIC_CLOUD,
+                         ZIP_DEPLOY_POLL_INTERVAL_MIN, ZIP_DEPLOY_POLL_INTERVAL_MAX, ZIP_DEPLOY_TIMEOUT_DEFAULT)
 
 logger = get_logger(__name__)
 
@@ -417,22 +418,28 @@ def enable_zip_deploy(cmd, resource_group_name, name, src, timeout=None, slot=No
     import requests
     import os
     from azure.cli.core.util import should_disable_connection_verify
-    # Read file content
-    with open(os.path.realpath(os.path.expanduser(src)), 'rb') as fs:
-        zip_content = fs.read()
-        logger.warning("Starting zip deployment. This operation can take a while to complete ...")
-        res = requests.post(zip_url, data=zip_content, headers=headers, verify=not should_disable_connection_verify())
-        logger.warning("Deployment endpoint responded with status code %d", res.status_code)
-
-    # check if there's an ongoing process
-    if res.status_code == 409:
-        raise CLIError("There may be an ongoing deployment or your app setting has WEBSITE_RUN_FROM_PACKAGE. "
-                       "Please track your deployment in {} and ensure the WEBSITE_RUN_FROM_PACKAGE app setting "
-                       "is removed.".format(deployment_status_url))
-
-    # check the status of async deployment
-    response = _check_zip_deployment_status(cmd, resource_group_name, name, deployment_status_url,
-                                            authorization, timeout)
+    # The upload and the status polls share the connections of the session
+    with requests.Session() as session:
+        session.verify = not should_disable_connection_verify()
+        # Stream the file content, rather than reading it in memory
+        with open(os.path.realpath(os.path.expanduser(src)), 'rb') as fs:
+            logger.warning("Starting zip deployment. This operation can take a while to complete ...")
+            zip_content = ProgressFileReader(fs, _get_upload_progress_callback(cmd))
+            try:
+                res = session.post(zip_url, data=zip_content, headers=headers)
+            finally:
+                cmd.cli_ctx.get_progress_controller().end()
+            logger.warning("Deployment endpoint responded with status code %d", res.status_code)
+
+        # check if there's an ongoing process
+        if res.status_code == 409:
+            raise CLIError("There may be an ongoing deployment or your app setting has WEBSITE_RUN_FROM_PACKAGE. "
+                           "Please track your deployment in {} and ensure the WEBSITE_RUN_FROM_PACKAGE app setting "
+                           "is removed.".format(deployment_status_url))
+
+        # check the status of async deployment
+        response = _check_zip_deployment_status(cmd, resource_group_name, name, deployment_status_url,
+                                                authorization, timeout, session=session)
     return response
 
 
@@ -526,6 +533,25 @@ def remove_remote_build_app_settings(cmd, resource_group_name, name, slot):
             logger.warning("App settings may not be propagated to the SCM site")
 
 
+def _get_upload_progress_callback(cmd):
+    progress_controller = cmd.cli_ctx.get_progress_controller()
+    last_message = None
+
+    # https://gist.github.com/vladignatyev/06860ec2040cb497f0f3
+    def progress_callback(current, total):
+        total_length = 30
+        filled_length = int(round(total_length * current) / float(total))
+        percents = round(100.0 * current / float(total), 1)
+        progress_bar = '=' * filled_length + '-' * (total_length - filled_length)
+        progress_message = 'Uploading {} {}%'.format(progress_bar, percents)
+        # The callback can be called for every few KB of the file
+        nonlocal last_message
+        if progress_message != last_message:
+            last_message = progress_message
+            progress_controller.add(message=progress_message)
+    return progress_callback
+
+
 def upload_zip_to_storage(cmd, resource_group_name, name, src, slot=None):
     settings = get_app_settings(cmd, resource_group_name, name, slot)
 
@@ -544,17 +570,8 @@ def upload_zip_to_storage(cmd, resource_group_name, name, src, slot=None):
     if not block_blob_service.exists(container_name):
         block_blob_service.create_container(container_name)
 
-    # https://gist.github.com/vladignatyev/06860ec2040cb497f0f3
-    def progress_callback(current, total):
-        total_length = 30
-        filled_length = int(round(total_length * current) / float(total))
-        percents = round(100.0 * current / float(total), 1)
-        progress_bar = '=' * filled_length + '-' * (total_length - filled_length)
-        progress_message = 'Uploading {} {}%'.format(progress_bar, percents)
-        cmd.cli_ctx.get_progress_controller().add(message=progress_message)
-
     block_blob_service.create_blob_from_path(container_name, blob_name, src, validate_content=True,
-                                             progress_callback=progress_callback)
+                                             progress_callback=_get_upload_progress_callback(cmd))
 
     now = datetime.datetime.now()
     blob_start = now - datetime.timedelta(minutes=10)
@@ -3228,22 +3245,28 @@ def list_locations(cmd, sku, linux_workers_enabled=None):
     return [geo_region for geo_region in web_client_geo_regions if geo_region.name in providers_client_locations_list]
 
 
-def _check_zip_deployment_status(cmd, rg_name, name, deployment_status_url, authorization, timeout=None):
+def _check_zip_deployment_status(cmd, rg_name, name, deployment_status_url, authorization, timeout=None,
+                                 session=None):
     import requests
     from azure.cli.core.util import should_disable_connection_verify
-    total_trials = (int(timeout) // 2) if timeout else 450
-    num_trials = 0
-    while num_trials < total_trials:
-        time.sleep(2)
-        response = requests.get(deployment_status_url, headers=authorization,
-                                verify=not should_disable_connection_verify())
+    if session is None:
+        with requests.Session() as session:
+            session.verify = not should_disable_connection_verify()
+            return _check_zip_deployment_status(cmd, rg_name, name, deployment_status_url, authorization, timeout,
+                                                session=session)
+    deadline = time.time() + (int(timeout) if timeout else ZIP_DEPLOY_TIMEOUT_DEFAULT)
+    # Poll often while the deployment makes progress, and less often while it doesn't
+    poll_interval = ZIP_DEPLOY_POLL_INTERVAL_MIN
+    last_state = None
+    res_dict = {}
+    while time.time() < deadline:
+        time.sleep(min(poll_interval, max(deadline - time.time(), 0)))
+        response = session.get(deployment_status_url, headers=authorization)
         try:
             res_dict = response.json()
         except json.decoder.JSONDecodeError:
             logger.warning("Deployment status endpoint %s returns malformed data. Retrying...", deployment_status_url)
             res_dict = {}
-        finally:
-            num_trials = num_trials + 1
 
         if res_dict.get('status', 0) == 3:
             _configure_default_logging(cmd, rg_name, name)
@@ -3253,6 +3276,12 @@ def _check_zip_deployment_status(cmd, rg_name, name, deployment_status_url, auth
             break
         if 'progress' in res_dict:
             logger.info(res_dict['progress'])  # show only in debug mode, customers seem to find this confusing
+        state = (res_dict.get('status'), res_dict.get('progress'))
+        if state != last_state:
+            poll_interval = ZIP_DEPLOY_POLL_INTERVAL_MIN
+        else:
+            poll_interval = min(poll_interval * 2, ZIP_DEPLOY_POLL_INTERVAL_MAX)
+        last_state = state
     # if the deployment is taking longer than expected
     if res_dict.get('status', 0) != 4:
         _configure_default_logging(cmd, rg_name, name)
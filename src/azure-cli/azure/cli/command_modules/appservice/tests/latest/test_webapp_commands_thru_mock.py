@@ -27,7 +27,9 @@ from azure.cli.command_modules.appservice.custom import (set_deployment_user,
                                                          restore_deleted_webapp,
                                                          list_snapshots,
                                                          restore_snapshot,
-                                                         create_managed_ssl_cert)
+                                                         create_managed_ssl_cert,
+                                                         enable_zip_deploy_webapp,
+                                                         _check_zip_deployment_status)
 
 # pylint: disable=line-too-long
 from vsts_cd_manager.continuous_delivery_manager import ContinuousDeliveryResult
@@ -436,6 +438,55 @@ class TestWebappMocked(unittest.TestCase):
         client.certificates.create_or_update.assert_called_once_with(name=host_name, resource_group_name=rg_name,
                                                                      certificate_envelope=cert_def)
 
+    @mock.patch('azure.cli.command_modules.appservice.custom.time.sleep')
+    @mock.patch('requests.Session')
+    @mock.patch('azure.cli.command_modules.appservice.custom._get_scm_url', return_value='https://scm')
+    @mock.patch('azure.cli.command_modules.appservice.custom._get_site_credential', return_value=('usr', 'pwd'))
+    def test_enable_zip_deploy_streams_file(self, _, get_scm_url_mock, session_mock, sleep_mock):
+        import os
+        import tempfile
+        cmd_mock = _get_test_cmd()
+        session = session_mock.return_value.__enter__.return_value
+        uploaded = []
+
+        def _post(url, data, headers):
+            # the content is read in chunks, like when it is sent
+            self.assertEqual(len(data), 3 * 8192 + 10)
+            for chunk in iter(lambda: data.read(8192), b''):
+                uploaded.append(chunk)
+            return FakedResponse(202)
+
+        session.post.side_effect = _post
+        statuses = [{'status': 1, 'progress': 'Extracting'}] * 3 + [{'status': 4}]
+        session.get.return_value.json.side_effect = statuses
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            src = os.path.join(temp_dir, 'app.zip')
+            with open(src, 'wb') as f:
+                f.write(b'x' * (3 * 8192 + 10))
+            result = enable_zip_deploy_webapp(cmd_mock, 'rg', 'name', src)
+
+        self.assertEqual(result, {'status': 4})
+        self.assertEqual(len(uploaded), 4)
+        session.post.assert_called_once_with('https://scm/api/zipdeploy?isAsync=true', data=mock.ANY,
+                                             headers=mock.ANY)
+        # the polls use the connections of the upload, and back off while the status doesn't change
+        self.assertEqual(session.get.call_count, 4)
+        self.assertEqual([c[0][0] for c in sleep_mock.call_args_list], [0.5, 0.5, 1, 2])
+
+    @mock.patch('azure.cli.command_modules.appservice.custom.time.sleep')
+    @mock.patch('requests.Session')
+    def test_check_zip_deployment_status_closes_own_session(self, session_mock, _):
+        cmd_mock = _get_test_cmd()
+        session = session_mock.return_value.__enter__.return_value
+        session.get.return_value.json.return_value = {'status': 4}
+
+        result = _check_zip_deployment_status(cmd_mock, 'rg', 'name', 'https://scm/api/deployments/latest', {})
+
+        self.assertEqual(result, {'status': 4})
+        session.get.assert_called_once_with('https://scm/api/deployments/latest', headers={})
+        session_mock.return_value.__exit__.assert_called_once()
+
 
 class FakedResponse(object):  # pylint: disable=too-few-public-methods
     def __init__(self, status_code):
@@ -67,3 +67,24 @@ def retryable_method(retries=3, interval_sec=5, excpt_type=Exception):
                 time.sleep(interval_sec)
         return call
     return decorate
+
+
+class ProgressFileReader:
+    """Read a file in chunks for a streamed upload, and report how much of it was read."""
+
+    def __init__(self, file, progress_callback=None):
+        import os
+        self._file = file
+        self._size = os.fstat(file.fileno()).st_size - file.tell()
+        self._read = 0
+        self._progress_callback = progress_callback
+
+    def __len__(self):
+        return self._size
+
+    def read(self, size=-1):
+        data = self._file.read(size)
+        self._read += len(data)
+        if self._progress_callback and self._size:
+            self._progress_callback(self._read, self._size)
+        return data
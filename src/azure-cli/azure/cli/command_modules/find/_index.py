@@ -0,0 +1,180 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import math
+import os
+import re
+from collections import Counter
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+FIND_INDEX_FILE = 'findIndex.bin'
+_FORMAT_VERSION = 1
+
+# The weights of the terms of the fields of a command
+_NAME_WEIGHT = 4
+_SUMMARY_WEIGHT = 2
+_PARAMETER_WEIGHT = 1
+_EXAMPLE_WEIGHT = 1
+
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+
+_STOP_WORDS = {'a', 'an', 'and', 'az', 'by', 'for', 'from', 'how', 'i', 'in', 'is', 'it', 'of', 'on', 'or', 'the',
+               'to', 'with'}
+
+
+def tokenize(text):
+    """Split text into lowercase terms, like 'List the VMs' into ['list', 'vm']. Plurals are reduced to the
+    singular form by dropping the trailing 's'."""
+    return [term[:-1] if len(term) > 2 and term.endswith('s') and not term.endswith('ss') else term
+            for term in re.findall(r'[a-z0-9]+', text.lower()) if term not in _STOP_WORDS]
+
+
+def get_command_documents(cli_ctx):
+    """Get the documents to index of all the commands of the CLI and the installed extensions.
+
+    The parameter names are taken from the help and the examples, because loading the arguments of all the commands
+    takes much longer than loading the command table.
+    """
+    from azure.cli.core import MainCommandsLoader
+    from azure.cli.core._help import AzCliHelp
+    from knack.help_files import helps
+
+    loader = MainCommandsLoader(cli_ctx)
+    # Load all the modules and extensions
+    loader.load_command_table([])
+    help_ctx = AzCliHelp(cli_ctx)
+    documents = []
+    for command in sorted(loader.command_table):
+        data = None
+        if helps.get(command):
+            try:
+                data = help_ctx.load_help_data(command, helps[command])
+            except Exception as ex:  # pylint: disable=broad-except
+                logger.debug("Failed to load the help of '%s': %s", command, ex)
+        if not isinstance(data, dict):
+            data = {}
+        examples = [{'name': (ex.get('name') or '').strip(), 'text': (ex.get('text') or '').strip()}
+                    for ex in data.get('examples') or [] if isinstance(ex, dict) and _is_supported(cli_ctx, ex)]
+        parameters = {param['name'] for param in data.get('parameters') or []
+                      if isinstance(param, dict) and isinstance(param.get('name'), str)}
+        for example in examples:
+            parameters.update(re.findall(r'(?<!\S)--?[a-zA-Z][\w-]*', example['text']))
+        summary = data.get('short-summary')
+        if not summary:
+            description = loader.command_table[command].description
+            summary = description.split('\n')[0] if isinstance(description, str) else ''
+        documents.append({'command': command, 'summary': summary.strip(), 'parameters': sorted(parameters),
+                          'examples': examples})
+    help_ctx.save_help_index()
+    return documents
+
+
+def _is_supported(cli_ctx, example):
+    supported_profiles = example.get('supported-profiles')
+    unsupported_profiles = example.get('unsupported-profiles')
+    if supported_profiles:
+        return cli_ctx.cloud.profile in [profile.strip() for profile in supported_profiles.split(',')]
+    if unsupported_profiles:
+        return cli_ctx.cloud.profile not in [profile.strip() for profile in unsupported_profiles.split(',')]
+    return True
+
+
+def get_find_index(cli_ctx):
+    """Get the local search index of the commands, valid for the CLI version, cloud profile and the installed
+    extensions it is built with."""
+    from azure.cli.core import __version__
+    from azure.cli.core._snapshot import Snapshot
+    from azure.cli.core.extension import get_extensions
+    extensions = sorted([ext.name, ext.version] for ext in get_extensions())
+    meta = {'version': _FORMAT_VERSION, 'coreVersion': __version__, 'cloudProfile': cli_ctx.cloud.profile,
+            'extensions': extensions}
+    return FindIndex(Snapshot(os.path.join(cli_ctx.config.config_dir, FIND_INDEX_FILE), meta))
+
+
+class FindIndex:
+    """
+    An inverted index of the commands, over their names, help summaries, parameter names and examples, stored in a
+    `Snapshot`.
+
+    A 'term/<term>' record holds the (document, weighted term frequency) postings of a term, and a 'doc/<document>'
+    record holds the command name, summary and examples of a command. A query only loads the postings of its terms
+    and the documents of the top results, which are ranked with BM25.
+    """
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def is_built(self):
+        return 'stats' in self._snapshot
+
+    def build(self, documents):
+        """Replace the index with `documents`.
+
+        :param documents: a list of dicts with 'command', 'summary', 'parameters' and 'examples', the examples
+            being dicts with 'name' and 'text'.
+        :return: True if the index is saved.
+        """
+        postings = {}
+        lengths = []
+        records = {}
+        for doc_id, doc in enumerate(documents):
+            terms = Counter()
+            for term in tokenize(doc['command']):
+                terms[term] += _NAME_WEIGHT
+            for term in tokenize(doc.get('summary') or ''):
+                terms[term] += _SUMMARY_WEIGHT
+            for parameter in doc.get('parameters') or []:
+                for term in tokenize(parameter):
+                    terms[term] += _PARAMETER_WEIGHT
+            for example in doc.get('examples') or []:
+                for term in tokenize('{} {}'.format(example['name'], example['text'])):
+                    terms[term] += _EXAMPLE_WEIGHT
+            for term, frequency in terms.items():
+                postings.setdefault(term, []).append((doc_id, frequency))
+            lengths.append(sum(terms.values()))
+            records['doc/{}'.format(doc_id)] = {'command': doc['command'], 'summary': doc.get('summary') or '',
+                                                'examples': doc.get('examples') or []}
+        records.update(('term/' + term, term_postings) for term, term_postings in postings.items())
+        records['commands'] = {doc['command']: doc_id for doc_id, doc in enumerate(documents)}
+        records['stats'] = {'lengths': lengths, 'averageLength': sum(lengths) / len(lengths) if lengths else 0}
+        self._snapshot.invalidate()
+        return self._snapshot.update(records)
+
+    def get_command(self, command):
+        """Get the document of a command, like 'vm create', or None if it isn't indexed."""
+        doc_id = (self._snapshot.get('commands') or {}).get(command)
+        return None if doc_id is None else self._snapshot.get('doc/{}'.format(doc_id))
+
+    def get_group_commands(self, group):
+        """Get the documents of the commands in a group, like 'vm', in the order of the command names."""
+        prefix = group + ' '
+        commands = self._snapshot.get('commands') or {}
+        return [self._snapshot.get('doc/{}'.format(doc_id))
+                for command, doc_id in sorted(commands.items()) if command.startswith(prefix)]
+
+    def search(self, query, top=5):
+        """Get the documents of the commands best matching the query, best match first."""
+        stats = self._snapshot.get('stats')
+        if not stats:
+            return []
+        lengths = stats['lengths']
+        average_length = stats['averageLength'] or 1
+        scores = Counter()
+        for term in set(tokenize(query)):
+            term_postings = self._snapshot.get('term/' + term)
+            if not term_postings:
+                continue
+            idf = math.log(1 + (len(lengths) - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+            for doc_id, frequency in term_postings:
+                norm = _K1 * (1 - _B + _B * lengths[doc_id] / average_length)
+                scores[doc_id] += idf * frequency * (_K1 + 1) / (frequency + norm)
+        # Break ties by document ID, so that the results are stable
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))[:top]
+        return [self._snapshot.get('doc/{}'.format(doc_id)) for doc_id, _ in ranked]
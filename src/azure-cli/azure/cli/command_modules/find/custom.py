@@ -30,41 +30,88 @@ EXTENSION_NAME = 'find'
 Example = namedtuple("Example", "title snippet")
 
 
-def process_query(cli_term):
+def process_query(cmd, cli_term):
     if not cli_term:
         logger.error('Please provide a search term e.g. az find "vm"')
     else:
         print(random.choice(WAIT_MESSAGE), file=sys.stderr)
-        response = call_aladdin_service(cli_term)
-
-        if response.status_code != 200:
-            logger.error('Unexpected Error: If it persists, please file a bug.')
-        else:
-            if (platform.system() == 'Windows' and should_enable_styling()):
-                colorama.init(convert=True)
-            has_pruned_answer = False
-            answer_list = json.loads(response.content)
-            if not answer_list:
-                print("\nSorry I am not able to help with [" + cli_term + "]."
-                      "\nTry typing the beginning of a command e.g. " + style_message('az vm') + ".", file=sys.stderr)
-            else:
-                if answer_list[0]['source'] == 'pruned':
+        has_pruned_answer = False
+        has_remote_error = False
+        examples = get_local_examples(cmd.cli_ctx, cli_term)
+        # The remote service is only used when the local index has no answer
+        if not examples and cmd.cli_ctx.config.getboolean('find', 'use_remote', fallback=True):
+            try:
+                response = call_aladdin_service(cli_term)
+            except requests.RequestException as ex:
+                logger.debug('Failed to call the remote service: %s', ex)
+                response = None
+            if response is not None and response.status_code != 200:
+                logger.error('Unexpected Error: If it persists, please file a bug.')
+                has_remote_error = True
+            elif response is not None:
+                answer_list = json.loads(response.content)
+                if answer_list and answer_list[0]['source'] == 'pruned':
                     has_pruned_answer = True
                     answer_list.pop(0)
-                print("\nHere are the most common ways to use [" + cli_term + "]: \n", file=sys.stderr)
-
-                for answer in answer_list:
-                    cleaned_answer = clean_from_http_answer(answer)
-                    print(style_message(cleaned_answer.title))
-                    print(cleaned_answer.snippet + '\n')
-                if has_pruned_answer:
-                    print(style_message("More commands and examples are available in the latest version of the CLI. "
-                                        "Please update for the best experience.\n"))
+                examples = [clean_from_http_answer(answer) for answer in answer_list]
+
+        if (platform.system() == 'Windows' and should_enable_styling()):
+            colorama.init(convert=True)
+        if not examples:
+            if not has_remote_error:
+                print("\nSorry I am not able to help with [" + cli_term + "]."
+                      "\nTry typing the beginning of a command e.g. " + style_message('az vm') + ".",
+                      file=sys.stderr)
+        else:
+            print("\nHere are the most common ways to use [" + cli_term + "]: \n", file=sys.stderr)
+
+            for example in examples:
+                print(style_message(example.title))
+                print(example.snippet + '\n')
+            if has_pruned_answer:
+                print(style_message("More commands and examples are available in the latest version of the CLI. "
+                                    "Please update for the best experience.\n"))
     from azure.cli.core.util import show_updates_available
     show_updates_available(new_line_after=True)
     print(SURVEY_PROMPT)
 
 
+def get_local_examples(cli_ctx, cli_term, top=5):
+    """Get examples from the local search index of the commands, which is built on first use.
+
+    For a command, like "az vm create", the examples of the command are returned. For a group, like "az vm", an
+    example of the best matching commands of the group is returned. Otherwise, an example of the best matching
+    commands is returned.
+    """
+    from azure.cli.command_modules.find._index import get_find_index, get_command_documents
+    index = get_find_index(cli_ctx)
+    if not index.is_built():
+        logger.warning('Building the local search index of the commands. This is only done once for the installed '
+                       'version of the CLI and extensions.')
+        index.build(get_command_documents(cli_ctx))
+
+    term = ' '.join(cli_term.split())
+    command = term[3:] if term.lower().startswith('az ') else term
+    doc = index.get_command(command)
+    if doc:
+        examples = [Example(ex['name'], ex['text']) for ex in doc['examples'][:top]]
+        return examples or [Example(doc['summary'], 'az {} -h'.format(doc['command']))]
+
+    group_docs = index.get_group_commands(command)
+    if group_docs:
+        docs = [d for d in index.search(term, top=len(group_docs)) if d['command'].startswith(command + ' ')]
+        docs = (docs or group_docs)[:top]
+    else:
+        docs = index.search(term, top=top)
+    examples = []
+    for doc in docs:
+        if doc['examples']:
+            examples.append(Example(doc['examples'][0]['name'], doc['examples'][0]['text']))
+        else:
+            examples.append(Example(doc['summary'], 'az {} -h'.format(doc['command'])))
+    return examples
+
+
 def get_generated_examples(cli_term):
     examples = []
     response = call_aladdin_service(cli_term)
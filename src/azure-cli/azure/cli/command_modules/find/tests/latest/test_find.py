@@ -3,13 +3,32 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import io
 import json
+import os
+import shutil
+import tempfile
 import unittest
 import mock
 import requests
 
-from azure.cli.command_modules.find.custom import (Example, call_aladdin_service,
-                                                   get_generated_examples, clean_from_http_answer)
+from azure.cli.core.mock import DummyCli
+from azure.cli.command_modules.find._index import FindIndex, tokenize
+from azure.cli.command_modules.find.custom import (Example, call_aladdin_service, get_local_examples,
+                                                   get_generated_examples, clean_from_http_answer, process_query)
+
+
+DOCUMENTS = [
+    {'command': 'storage account create', 'summary': 'Create a storage account.', 'parameters': ['--sku'],
+     'examples': [{'name': 'Create a storage account.', 'text': 'az storage account create -n account -g rg'}]},
+    {'command': 'storage blob list', 'summary': 'List blobs in a given container.', 'parameters': ['--container-name'],
+     'examples': [{'name': 'List all blobs.', 'text': 'az storage blob list -c container'}]},
+    {'command': 'storage blob upload', 'summary': 'Upload a file to a storage blob.', 'parameters': ['--file'],
+     'examples': []},
+    {'command': 'vm create', 'summary': 'Create an Azure Virtual Machine.', 'parameters': ['--image'],
+     'examples': [{'name': 'Create a default Ubuntu VM.', 'text': 'az vm create -n MyVm -g rg --image UbuntuLTS'},
+                  {'name': 'Create a VM with a public IP.', 'text': 'az vm create -n MyVm -g rg --public-ip-sku Standard'}]}
+]
 
 
 def create_valid_http_response():
@@ -77,6 +96,64 @@ class FindCustomCommandTest(unittest.TestCase):
 
             self.assertEqual(0, len(examples))
 
+    def test_process_query_remote_error(self):
+        mock_response = requests.Response()
+        mock_response.status_code = 500
+        cmd = mock.MagicMock(cli_ctx=DummyCli())
+        with mock.patch('azure.cli.command_modules.find.custom.get_local_examples', return_value=[]), \
+                mock.patch('azure.cli.command_modules.find.custom.call_aladdin_service', return_value=mock_response), \
+                mock.patch('azure.cli.core.util.show_updates_available'), \
+                mock.patch('azure.cli.command_modules.find.custom.logger') as logger_mock, \
+                mock.patch('sys.stderr', new_callable=io.StringIO) as stderr_mock:
+            process_query(cmd, 'vm')
+        # the error is reported once, without the message for a term without answers
+        logger_mock.error.assert_called_once()
+        self.assertNotIn('Sorry', stderr_mock.getvalue())
+
+
+class FindIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        from azure.cli.core._snapshot import Snapshot
+        self.temp_dir = tempfile.mkdtemp()
+        self.index = FindIndex(Snapshot(os.path.join(self.temp_dir, 'findIndex.bin'), {'version': 1}))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize('List the VMs of a --resource-group'), ['list', 'vm', 'resource', 'group'])
+
+    def test_find_index_search(self):
+        self.assertFalse(self.index.is_built())
+        self.index.build(DOCUMENTS)
+        self.assertTrue(self.index.is_built())
+
+        self.assertEqual(self.index.get_command('vm create')['summary'], 'Create an Azure Virtual Machine.')
+        self.assertIsNone(self.index.get_command('vm delete'))
+        self.assertEqual([d['command'] for d in self.index.get_group_commands('storage blob')],
+                         ['storage blob list', 'storage blob upload'])
+        self.assertEqual([d['command'] for d in self.index.search('list the blobs of a container')][0],
+                         'storage blob list')
+        self.assertEqual([d['command'] for d in self.index.search('create storage account', top=1)],
+                         ['storage account create'])
+        self.assertEqual(self.index.search('unknown'), [])
+
+    def test_get_local_examples(self):
+        cli_ctx = DummyCli()
+        with mock.patch('azure.cli.command_modules.find._index.get_find_index', return_value=self.index), \
+                mock.patch('azure.cli.command_modules.find._index.get_command_documents',
+                           return_value=DOCUMENTS) as get_documents_mock:
+            # the index is built on first use
+            self.assertEqual(get_local_examples(cli_ctx, 'az vm create'),
+                             [Example(ex['name'], ex['text']) for ex in DOCUMENTS[3]['examples']])
+            self.assertEqual(set(get_local_examples(cli_ctx, 'az storage blob')),
+                             {Example('List all blobs.', 'az storage blob list -c container'),
+                              Example('Upload a file to a storage blob.', 'az storage blob upload -h')})
+            self.assertEqual(get_local_examples(cli_ctx, 'new storage account', top=1),
+                             [Example('Create a storage account.', 'az storage account create -n account -g rg')])
+            get_documents_mock.assert_called_once_with(cli_ctx)
+
 
 if __name__ == '__main__':
     unittest.main()
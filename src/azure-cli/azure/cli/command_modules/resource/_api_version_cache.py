@@ -0,0 +1,98 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Process-wide cache of the api-versions resolved from the resource providers, persisted under the config dir.
+
+Generic `az resource` commands resolve the api-version of every resource from `providers.get(namespace)`. The
+resolved versions are shared by the concurrent jobs of an `--ids` invocation and kept on disk for
+`resource.api_version_cache_ttl` seconds (one day by default, 0 disables the cache), so repeated calls for
+resources of the same type skip the providers API.
+"""
+
+import os
+import threading
+import time
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+API_VERSION_CACHE_TTL = 24 * 60 * 60
+API_VERSION_CACHE_FILE = 'resourceApiVersions.json'
+
+_lock = threading.Lock()
+_key_locks = {}
+_memory_cache = {}
+_disk_cache = None
+
+
+def _get_disk_cache():
+    global _disk_cache  # pylint: disable=global-statement
+    if _disk_cache is None:
+        from azure.cli.core._environment import get_config_dir
+        from azure.cli.core._session import Session
+        disk_cache = Session()
+        try:
+            disk_cache.load(os.path.join(get_config_dir(), API_VERSION_CACHE_FILE))
+        except (OSError, IOError):
+            logger.debug('Failed to load the api-version cache, it will only be kept in memory.')
+            disk_cache.filename = None
+        _disk_cache = disk_cache
+    return _disk_cache
+
+
+def _get_cache_key(rcf, resource_provider_namespace, resource_type, latest_include_preview):
+    config = getattr(rcf, 'config', None) or getattr(rcf, '_config', None)
+    base_url = getattr(config, 'base_url', None) or getattr(rcf, '_base_url', None)
+    subscription_id = getattr(config, 'subscription_id', None)
+    if not all(isinstance(part, str) for part in (base_url, subscription_id, resource_provider_namespace,
+                                                  resource_type)):
+        # not a real management client (e.g. in unit tests), don't cache
+        return None
+    # the base url identifies the cloud
+    return '|'.join([base_url.rstrip('/').lower(), subscription_id.lower(), resource_provider_namespace.lower(),
+                     resource_type.lower(), str(bool(latest_include_preview))])
+
+
+def _is_fresh(entry, ttl):
+    return isinstance(entry, dict) and entry.get('apiVersion') and time.time() - entry.get('time', 0) < ttl
+
+
+def get_cached_api_version(cli_ctx, rcf, resource_provider_namespace, resource_type, latest_include_preview,
+                           resolve):
+    """ Return the cached api-version for the resource type, calling resolve() on a miss. Concurrent misses for the
+    same key wait for the first lookup instead of querying the provider again. """
+    ttl = cli_ctx.config.getint('resource', 'api_version_cache_ttl', API_VERSION_CACHE_TTL) if cli_ctx else 0
+    key = _get_cache_key(rcf, resource_provider_namespace, resource_type, latest_include_preview)
+    if key is None or ttl <= 0:
+        return resolve()
+
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        entry = _memory_cache.get(key)
+        if not _is_fresh(entry, ttl):
+            with _lock:
+                entry = _get_disk_cache().get(key)
+        if _is_fresh(entry, ttl):
+            logger.debug("Using cached api-version '%s' for %s/%s", entry['apiVersion'],
+                         resource_provider_namespace, resource_type)
+            _memory_cache[key] = entry
+            return entry['apiVersion']
+
+        api_version = resolve()
+        entry = {'apiVersion': api_version, 'time': time.time()}
+        with _lock:
+            _memory_cache[key] = entry
+            disk_cache = _get_disk_cache()
+            try:
+                with disk_cache.transaction():
+                    for expired_key in [k for k, v in disk_cache.items() if not _is_fresh(v, ttl)]:
+                        del disk_cache[expired_key]
+                    disk_cache[key] = entry
+            except (OSError, IOError):
+                logger.debug('Failed to save the api-version cache.')
+        return api_version
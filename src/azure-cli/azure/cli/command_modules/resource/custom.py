@@ -2899,7 +2899,8 @@ class _ResourceUtils:  # pylint: disable=too-many-instance-attributes
         if api_version is None:
             if resource_id:
                 api_version = _ResourceUtils._resolve_api_version_by_id(self.rcf, resource_id,
-                                                                        latest_include_preview=latest_include_preview)
+                                                                        latest_include_preview=latest_include_preview,
+                                                                        cli_ctx=cli_ctx)
             else:
                 _validate_resource_inputs(resource_group_name, resource_provider_namespace,
                                           resource_type, resource_name)
@@ -2907,7 +2908,8 @@ class _ResourceUtils:  # pylint: disable=too-many-instance-attributes
                                                                  resource_provider_namespace,
                                                                  parent_resource_path,
                                                                  resource_type,
-                                                                 latest_include_preview=latest_include_preview)
+                                                                 latest_include_preview=latest_include_preview,
+                                                                 cli_ctx=cli_ctx)
 
         self.resource_group_name = resource_group_name
         self.resource_provider_namespace = resource_provider_namespace
@@ -3111,31 +3113,36 @@ class _ResourceUtils:  # pylint: disable=too-many-instance-attributes
 
     @staticmethod
     def resolve_api_version(rcf, resource_provider_namespace, parent_resource_path, resource_type,
-                            latest_include_preview=False):
-        provider = rcf.providers.get(resource_provider_namespace)
+                            latest_include_preview=False, cli_ctx=None):
+        from azure.cli.command_modules.resource._api_version_cache import get_cached_api_version
 
         # If available, we will use parent resource's api-version
         resource_type_str = (parent_resource_path.split('/')[0] if parent_resource_path else resource_type)
 
-        rt = [t for t in provider.resource_types
-              if t.resource_type.lower() == resource_type_str.lower()]
-        if not rt:
-            raise IncorrectUsageError('Resource type {} not found.'.format(resource_type_str))
-        if len(rt) == 1 and rt[0].api_versions:
-            # If latest_include_preview is true,
-            # the last api-version will be taken regardless of whether it is preview version or not
-            if latest_include_preview:
-                return rt[0].api_versions[0]
-            # Take the latest stable version first.
-            # if there is no stable version, the latest preview version will be taken.
-            npv = [v for v in rt[0].api_versions if 'preview' not in v.lower()]
-            return npv[0] if npv else rt[0].api_versions[0]
-        raise IncorrectUsageError(
-            'API version is required and could not be resolved for resource {}'
-            .format(resource_type))
+        def _resolve():
+            provider = rcf.providers.get(resource_provider_namespace)
+            rt = [t for t in provider.resource_types
+                  if t.resource_type.lower() == resource_type_str.lower()]
+            if not rt:
+                raise IncorrectUsageError('Resource type {} not found.'.format(resource_type_str))
+            if len(rt) == 1 and rt[0].api_versions:
+                # If latest_include_preview is true,
+                # the last api-version will be taken regardless of whether it is preview version or not
+                if latest_include_preview:
+                    return rt[0].api_versions[0]
+                # Take the latest stable version first.
+                # if there is no stable version, the latest preview version will be taken.
+                npv = [v for v in rt[0].api_versions if 'preview' not in v.lower()]
+                return npv[0] if npv else rt[0].api_versions[0]
+            raise IncorrectUsageError(
+                'API version is required and could not be resolved for resource {}'
+                .format(resource_type))
+
+        return get_cached_api_version(cli_ctx, rcf, resource_provider_namespace, resource_type_str,
+                                      latest_include_preview, _resolve)
 
     @staticmethod
-    def _resolve_api_version_by_id(rcf, resource_id, latest_include_preview=False):
+    def _resolve_api_version_by_id(rcf, resource_id, latest_include_preview=False, cli_ctx=None):
         parts = parse_resource_id(resource_id)
 
         if len(parts) == 2 and parts['subscription'] is not None and parts['resource_group'] is not None:
@@ -3162,4 +3169,4 @@ class _ResourceUtils:  # pylint: disable=too-many-instance-attributes
             resource_type = parts['type']
 
         return _ResourceUtils.resolve_api_version(rcf, namespace, parent, resource_type,
-                                                  latest_include_preview=latest_include_preview)
+                                                  latest_include_preview=latest_include_preview, cli_ctx=cli_ctx)
@@ -91,6 +91,51 @@ class TestApiCheck(unittest.TestCase):
                                    resource_group_name='rg', rcf=rcf, latest_include_preview=True)
         self.assertEqual(res_utils.api_version, "2016-01-01-preview")
 
+    def test_resolve_api_version_cache(self):
+        # Verifies resolved api-versions are cached per cloud, subscription and resource type.
+        import os
+        import shutil
+        import tempfile
+        from unittest import mock
+        from azure.cli.core.mock import DummyCli
+        from azure.cli.command_modules.resource import _api_version_cache
+
+        config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config_dir, True)
+        cli = DummyCli()
+        rcf = self._get_mock_client()
+        rcf.config.base_url = 'https://management.azure.com'
+        rcf.config.subscription_id = '00000000-0000-0000-0000-000000000000'
+
+        with mock.patch.dict(os.environ, {'AZURE_CONFIG_DIR': config_dir}), \
+                mock.patch.object(_api_version_cache, '_memory_cache', {}), \
+                mock.patch.object(_api_version_cache, '_disk_cache', None):
+            for _ in range(3):
+                res_utils = _ResourceUtils(cli, resource_type='Mock/test', resource_name='vnet1',
+                                           resource_group_name='rg', rcf=rcf)
+                self.assertEqual(res_utils.api_version, "2016-01-01")
+            self.assertEqual(rcf.providers.get.call_count, 1)
+
+            res_utils = _ResourceUtils(cli, resource_type='Mock/test', resource_name='vnet1',
+                                       resource_group_name='rg', rcf=rcf, latest_include_preview=True)
+            self.assertEqual(res_utils.api_version, "2016-01-01-preview")
+            self.assertEqual(rcf.providers.get.call_count, 2)
+
+            # a new process reads the versions back from disk
+            _api_version_cache._memory_cache.clear()
+            _api_version_cache._disk_cache = None
+            res_utils = _ResourceUtils(cli, resource_type='Mock/test', resource_name='vnet1',
+                                       resource_group_name='rg', rcf=rcf)
+            self.assertEqual(res_utils.api_version, "2016-01-01")
+            self.assertEqual(rcf.providers.get.call_count, 2)
+            self.assertTrue(os.path.isfile(os.path.join(config_dir, _api_version_cache.API_VERSION_CACHE_FILE)))
+
+            # a zero ttl disables the cache
+            with mock.patch.dict(os.environ, {'AZURE_RESOURCE_API_VERSION_CACHE_TTL': '0'}):
+                _ResourceUtils(cli, resource_type='Mock/test', resource_name='vnet1',
+                               resource_group_name='rg', rcf=rcf)
+            self.assertEqual(rcf.providers.get.call_count, 3)
+
     def _get_mock_client(self):
         client = MagicMock()
         provider = MagicMock()
@@ -0,0 +1,97 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+import time
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_NAME_CACHE_TTL = 10  # minutes
+
+ROLE_DEFINITIONS = 'roleDefinitions'
+PRINCIPALS = 'principals'
+
+
+def get_name_cache(cli_ctx, tenant_id):
+    """Get the name cache of the tenant, or None if `role.name_cache_ttl` is 0."""
+    from azure.cli.core.util import is_guid
+    ttl = cli_ctx.config.getint('role', 'name_cache_ttl', fallback=DEFAULT_NAME_CACHE_TTL)
+    if ttl <= 0 or not isinstance(tenant_id, str) or not is_guid(tenant_id):
+        return None
+    return NameCache(os.path.join(cli_ctx.config.config_dir, 'role_name_cache', tenant_id + '.json'), ttl * 60)
+
+
+class NameCache:
+    """
+    The names of the role definitions and principals of a tenant, keyed by ID, cached on disk for a short time so
+    that successive role assignment listings don't resolve them again.
+
+    The file is a JSON object like {"principals": {"<object id>": ["<name>", <timestamp>]}}.
+    """
+
+    def __init__(self, filename, ttl):
+        self.filename = filename
+        self.ttl = ttl
+        self._entries = None
+        self._modified = False
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.filename, 'r') as f:
+                    self._entries = json.load(f)
+            except (OSError, IOError, ValueError) as ex:
+                if not isinstance(ex, FileNotFoundError):
+                    logger.debug("Failed to load name cache %s: %s", self.filename, ex)
+                self._entries = {}
+            if not isinstance(self._entries, dict):
+                self._entries = {}
+        return self._entries
+
+    def get(self, kind, ids):
+        """Get the names of the unexpired entries of `ids`, as a dict keyed by ID."""
+        now = time.time()
+        entries = self._load().get(kind) or {}
+        result = {}
+        for i in ids:
+            entry = entries.get(i)
+            if isinstance(entry, list) and len(entry) == 2 and now - entry[1] <= self.ttl:
+                result[i] = entry[0]
+        return result
+
+    def set(self, kind, names):
+        """Add the names, a dict keyed by ID."""
+        if not names:
+            return
+        now = time.time()
+        self._load().setdefault(kind, {}).update({i: [name, now] for i, name in names.items()})
+        self._modified = True
+
+    def save(self):
+        """Save the entries, without the expired ones, if any were added."""
+        if not self._modified:
+            return
+        import tempfile
+        now = time.time()
+        entries = {kind: {i: entry for i, entry in kind_entries.items()
+                          if isinstance(entry, list) and len(entry) == 2 and now - entry[1] <= self.ttl}
+                   for kind, kind_entries in self._entries.items() if isinstance(kind_entries, dict)}
+        directory = os.path.dirname(self.filename)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(self.filename), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(entries, f)
+                os.replace(temp_path, self.filename)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        except (OSError, IOError) as ex:
+            logger.debug("Failed to save name cache %s: %s", self.filename, ex)
+        self._modified = False
@@ -46,6 +46,8 @@ ROLE_ASSIGNMENT_CREATE_WARNING = (
 
 logger = get_logger(__name__)
 
+_MAX_CONCURRENT_GRAPH_REQUESTS = 5
+
 # pylint: disable=too-many-lines
 
 
@@ -218,11 +220,32 @@ def list_role_assignments(cmd, assignee=None, role=None, resource_group_name=Non
 
     # 1. fill in logic names to get things understandable.
     # (it's possible that associated roles and principals were deleted, and we just do nothing.)
-    # 2. fill in role names
-    role_defs = list(definitions_client.list(
-        scope=scope or ('/subscriptions/' + definitions_client.config.subscription_id)))
+    # 2. the names resolved recently are taken from the name cache of the tenant
+    from ._name_cache import get_name_cache
+    name_cache = get_name_cache(cmd.cli_ctx, getattr(graph_client.config, 'tenant_id', None))
     worker = MultiAPIAdaptor(cmd.cli_ctx)
-    role_dics = {i.id: worker.get_role_property(i, 'role_name') for i in role_defs}
+    _fill_role_definition_names(worker, definitions_client, scope, results, name_cache)
+    _fill_principal_names(worker, graph_client, results, name_cache)
+    if name_cache:
+        name_cache.save()
+    for r in results:
+        if not r.get('additionalProperties'):  # remove the useless "additionalProperties"
+            r.pop('additionalProperties', None)
+    return results
+
+
+def _fill_role_definition_names(worker, definitions_client, scope, results, name_cache):
+    from ._name_cache import ROLE_DEFINITIONS
+    role_definition_ids = set(worker.get_role_property(i, 'roleDefinitionId')
+                              for i in results if not i.get('roleDefinitionName'))
+    role_dics = name_cache.get(ROLE_DEFINITIONS, role_definition_ids) if name_cache else {}
+    if role_definition_ids - set(role_dics):
+        role_defs = list(definitions_client.list(
+            scope=scope or ('/subscriptions/' + definitions_client.config.subscription_id)))
+        listed_role_dics = {i.id: worker.get_role_property(i, 'role_name') for i in role_defs}
+        role_dics.update(listed_role_dics)
+        if name_cache:
+            name_cache.set(ROLE_DEFINITIONS, listed_role_dics)
     for i in results:
         if not i.get('roleDefinitionName'):
             if role_dics.get(worker.get_role_property(i, 'roleDefinitionId')):
@@ -231,28 +254,31 @@ def list_role_assignments(cmd, assignee=None, role=None, resource_group_name=Non
             else:
                 i['roleDefinitionName'] = None  # the role definition might have been deleted
 
-    # fill in principal names
+
+def _fill_principal_names(worker, graph_client, results, name_cache):
+    from ._name_cache import PRINCIPALS
     principal_ids = set(worker.get_role_property(i, 'principalId')
                         for i in results if worker.get_role_property(i, 'principalId'))
-
-    if principal_ids:
-        try:
-            principals = _get_object_stubs(graph_client, principal_ids)
-            principal_dics = {i.object_id: _get_displayable_name(i) for i in principals}
-
-            for i in [r for r in results if not r.get('principalName')]:
-                i['principalName'] = ''
-                if principal_dics.get(worker.get_role_property(i, 'principalId')):
-                    worker.set_role_property(i, 'principalName',
-                                             principal_dics[worker.get_role_property(i, 'principalId')])
-        except (CloudError, GraphErrorException) as ex:
-            # failure on resolving principal due to graph permission should not fail the whole thing
-            logger.info("Failed to resolve graph object information per error '%s'", ex)
-
-    for r in results:
-        if not r.get('additionalProperties'):  # remove the useless "additionalProperties"
-            r.pop('additionalProperties', None)
-    return results
+    if not principal_ids:
+        return
+    try:
+        principal_dics = name_cache.get(PRINCIPALS, principal_ids) if name_cache else {}
+        unresolved_principal_ids = principal_ids - set(principal_dics)
+        if unresolved_principal_ids:
+            principals = _get_object_stubs(graph_client, unresolved_principal_ids)
+            resolved_principal_dics = {i.object_id: _get_displayable_name(i) for i in principals}
+            principal_dics.update(resolved_principal_dics)
+            if name_cache:
+                name_cache.set(PRINCIPALS, resolved_principal_dics)
+
+        for i in [r for r in results if not r.get('principalName')]:
+            i['principalName'] = ''
+            if principal_dics.get(worker.get_role_property(i, 'principalId')):
+                worker.set_role_property(i, 'principalName',
+                                         principal_dics[worker.get_role_property(i, 'principalId')])
+    except (CloudError, GraphErrorException) as ex:
+        # failure on resolving principal due to graph permission should not fail the whole thing
+        logger.info("Failed to resolve graph object information per error '%s'", ex)
 
 
 def update_role_assignment(cmd, role_assignment):
@@ -428,13 +454,14 @@ def _backfill_assignments_for_co_admins(cli_ctx, auth_client, assignee=None):
     if not co_admins:
         return []
 
-    result, users = [], []
-    for i in range(0, len(co_admins), 10):  # graph allows up to 10 query filters, so split into chunks here
-        upn_queries = ["userPrincipalName eq '{}'".format(x.email_address)
-                       for x in co_admins[i:i + 10]]
-        temp = list(list_users(graph_client.users, query_filter=' or '.join(upn_queries)))
-        users += temp
-    upns = {u.user_principal_name: u.object_id for u in users}
+    def _list_users(admins):
+        upn_queries = ["userPrincipalName eq '{}'".format(x.email_address) for x in admins]
+        return list(list_users(graph_client.users, query_filter=' or '.join(upn_queries)))
+
+    result = []
+    # graph allows up to 10 query filters, so split into chunks here
+    users = _map_graph_requests(_list_users, [co_admins[i:i + 10] for i in range(0, len(co_admins), 10)])
+    upns = {u.user_principal_name: u.object_id for u in itertools.chain.from_iterable(users)}
     for admin in co_admins:
         na_text = 'NA(classic admins)'
         email = admin.email_address
@@ -1801,12 +1828,23 @@ def _resolve_object_id(cli_ctx, assignee, fallback_to_object_id=False):
 
 def _get_object_stubs(graph_client, assignees):
     from azure.graphrbac.models import GetObjectsParameters
-    result = []
+
+    def _get_objects(object_ids):
+        params = GetObjectsParameters(include_directory_object_references=True, object_ids=object_ids)
+        return list(graph_client.objects.get_objects_by_object_ids(params))
+
     assignees = list(assignees)  # callers could pass in a set
-    for i in range(0, len(assignees), 1000):
-        params = GetObjectsParameters(include_directory_object_references=True, object_ids=assignees[i:i + 1000])
-        result += list(graph_client.objects.get_objects_by_object_ids(params))
-    return result
+    chunks = _map_graph_requests(_get_objects, [assignees[i:i + 1000] for i in range(0, len(assignees), 1000)])
+    return list(itertools.chain.from_iterable(chunks))
+
+
+def _map_graph_requests(func, chunks):
+    """Call `func` on every chunk of a graph query concurrently, and return the results in the order of the chunks."""
+    if len(chunks) <= 1:
+        return [func(chunk) for chunk in chunks]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(len(chunks), _MAX_CONCURRENT_GRAPH_REQUESTS)) as executor:
+        return list(executor.map(func, chunks))
 
 
 def _get_owner_url(cli_ctx, owner_object_id):
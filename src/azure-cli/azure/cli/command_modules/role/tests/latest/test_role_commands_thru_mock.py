@@ -5,6 +5,7 @@
 import json
 import os
 import tempfile
+import time
 import unittest
 import uuid
 import mock
@@ -403,9 +404,37 @@ class TestRoleMocked(unittest.TestCase):
         for i in range(0, 2001, 1000):
             object_groups.append([i for i in range(i, min(i + 1000, 2001))])
 
-        for call, group in zip(graph_client.objects.get_objects_by_object_ids.call_args_list, object_groups):
-            args, _ = call
-            self.assertEqual(args[0].object_ids, group)
+        # the chunks are requested concurrently, so in any order
+        called_groups = [args[0].object_ids for args, _ in graph_client.objects.get_objects_by_object_ids.call_args_list]
+        self.assertEqual(sorted(called_groups), object_groups)
+
+    def test_get_object_stubs_keeps_order(self):
+        graph_client = mock.MagicMock()
+        assignees = [str(i) for i in range(2500)]
+        graph_client.objects.get_objects_by_object_ids.side_effect = \
+            lambda params: [mock.MagicMock(object_id=i) for i in params.object_ids]
+
+        result = _get_object_stubs(graph_client, assignees)
+
+        self.assertEqual([x.object_id for x in result], assignees)
+
+    def test_name_cache(self):
+        from azure.cli.command_modules.role._name_cache import NameCache, PRINCIPALS
+        cache_dir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(cache_dir, 'role_name_cache', 'tenant.json')
+            cache = NameCache(filename, 600)
+            self.assertEqual(cache.get(PRINCIPALS, ['id1', 'id2']), {})
+            cache.set(PRINCIPALS, {'id1': 'user1@contoso.com'})
+            cache.save()
+
+            cache = NameCache(filename, 600)
+            self.assertEqual(cache.get(PRINCIPALS, ['id1', 'id2']), {'id1': 'user1@contoso.com'})
+            with mock.patch('time.time', return_value=time.time() + 601):
+                self.assertEqual(NameCache(filename, 600).get(PRINCIPALS, ['id1']), {})
+        finally:
+            import shutil
+            shutil.rmtree(cache_dir)
 
 
 class FakedError(object):  # pylint: disable=too-few-public-methods
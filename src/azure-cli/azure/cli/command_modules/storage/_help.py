@@ -711,6 +711,9 @@ examples:
   - name: Delete all blobs with the format 'cli-201x-xx-xx.txt' except cli-2018-xx-xx.txt' and 'cli-2019-xx-xx.txt' in a container.
     text: |
         az storage blob delete-batch -s mycontainer --pattern cli-201[!89]-??-??.txt
+  - name: Delete all the blobs in a container with many blobs, deleting up to 32 blobs at a time.
+    text: |
+        az storage blob delete-batch -s mycontainer --max-concurrent-files 32
 """
 
 helps['storage blob download-batch'] = """
@@ -744,6 +747,9 @@ examples:
   - name: Download all blobs with the format 'cli-201x-xx-xx.txt' except cli-2018-xx-xx.txt' and 'cli-2019-xx-xx.txt' in container to current path.
     text: |
         az storage blob download-batch -d . -s mycontainer --pattern cli-201[!89]-??-??.txt
+  - name: Download all blobs in a container, transferring up to 16 blobs at a time.
+    text: |
+        az storage blob download-batch -d . -s mycontainer --max-concurrent-files 16
 """
 
 helps['storage blob exists'] = """
@@ -1023,6 +1029,12 @@ examples:
   - name: Upload all files with the format 'cli-201x-xx-xx.txt' except cli-2018-xx-xx.txt' and 'cli-2019-xx-xx.txt' in a container.
     text: |
         az storage blob upload-batch -d mycontainer -s <path-to-directory> --pattern cli-201[!89]-??-??.txt
+  - name: Upload a directory with many small files, transferring up to 16 files at a time.
+    text: |
+        az storage blob upload-batch -d mycontainer -s <path-to-directory> --max-concurrent-files 16
+  - name: Upload only the files that changed since the last upload and delete the blobs whose local file was removed.
+    text: |
+        az storage blob upload-batch -d mycontainer -s <path-to-directory> --sync --delete-destination
 """
 
 helps['storage blob url'] = """
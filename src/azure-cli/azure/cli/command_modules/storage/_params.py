@@ -705,6 +705,15 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.argument('maxsize_condition', arg_group='Content Control')
         c.argument('validate_content', action='store_true', min_api='2016-05-31', arg_group='Content Control')
         c.argument('blob_type', options_list=('--type', '-t'), arg_type=get_enum_type(get_blob_types()))
+        c.argument('max_concurrent_files', type=int, is_preview=True,
+                   help='Maximum number of files to upload in parallel. When greater than 1, the progress reports '
+                        'finished files and the aggregated throughput instead of per-file progress.')
+        c.argument('sync', action='store_true', is_preview=True,
+                   help='Only upload the files that are new or changed since the last upload. The size, mtime and MD5 '
+                        'of uploaded files are recorded in a local manifest under the configuration directory.')
+        c.argument('delete_destination', action='store_true', is_preview=True,
+                   help='Delete the blobs under the destination path that have no matching local file. Only '
+                        'applies with --sync.')
         c.extra('no_progress', progress_type)
         c.extra('socket_timeout', socket_timeout_type)
 
@@ -725,6 +734,9 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.extra('socket_timeout', socket_timeout_type)
         c.argument('max_connections', type=int,
                    help='Maximum number of parallel connections to use when the blob size exceeds 64MB.')
+        c.argument('max_concurrent_files', type=int, is_preview=True,
+                   help='Maximum number of blobs to download in parallel. When greater than 1, the progress reports '
+                        'finished blobs and the aggregated throughput instead of per-blob progress.')
 
     with self.argument_context('storage blob delete') as c:
         from .sdkutil import get_delete_blob_snapshot_type_names
@@ -736,6 +748,9 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.argument('delete_snapshots', arg_type=get_enum_type(get_delete_blob_snapshot_type_names()),
                    help='Required if the blob has associated snapshots.')
         c.argument('lease_id', help='The active lease id for the blob.')
+        c.argument('max_concurrent_files', type=int, is_preview=True,
+                   help='Maximum number of blobs to delete in parallel. Deletion starts while the container is '
+                        'still being listed.')
 
     with self.argument_context('storage blob lease') as c:
         c.argument('blob_name', arg_type=blob_name_type)
@@ -853,6 +853,9 @@ def process_blob_upload_batch_parameters(cmd, namespace):
     # 2. try to extract account name and container name from destination string
     _process_blob_batch_container_parameters(cmd, namespace, source=False)
 
+    if namespace.delete_destination and not namespace.sync:
+        raise CLIError('usage error: --delete-destination is only valid with --sync')
+
     # 3. collect the files to be uploaded
     namespace.source = os.path.realpath(namespace.source)
     namespace.source_files = [c for c in glob_files_locally(namespace.source, namespace.pattern)]
@@ -0,0 +1,91 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import threading
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+MANIFEST_DIR_NAME = 'blob_sync_manifest'
+
+
+def _compute_md5(file_path):
+    import base64
+    md5 = hashlib.md5()
+    with open(file_path, 'rb') as stream:
+        for chunk in iter(lambda: stream.read(4 * 1024 * 1024), b''):
+            md5.update(chunk)
+    # same encoding as the Content-MD5 property of a blob
+    return base64.b64encode(md5.digest()).decode('utf-8')
+
+
+class BlobSyncManifest(object):
+    """
+    Local record of the files uploaded by `az storage blob upload-batch --sync`, kept under the config dir next to
+    the object cache. Each entry maps a blob name to the size, mtime and MD5 of the local file it was uploaded from and
+    the ETag of the resulting blob, so unchanged files are neither re-hashed nor re-uploaded on the next run.
+    """
+
+    def __init__(self, account_name, container_name, source, destination_path=None):
+        from azure.cli.core._environment import get_config_dir
+        key = hashlib.sha256('{}|{}'.format(source, destination_path or '').encode('utf-8')).hexdigest()
+        self.path = os.path.join(get_config_dir(), MANIFEST_DIR_NAME, account_name or '', container_name,
+                                 '{}.json'.format(key))
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f).get('entries', {})
+        except (OSError, IOError, ValueError, AttributeError):
+            return {}
+
+    def save(self):
+        from azure.cli.command_modules.storage.util import mkdir_p
+        mkdir_p(os.path.dirname(self.path))
+        temp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+        with self._lock:
+            with open(temp_path, 'w') as f:
+                json.dump({'entries': self._entries}, f)
+        # replace atomically so that an interrupted run never leaves a truncated manifest behind
+        os.replace(temp_path, self.path)
+
+    def local_state(self, blob_name, file_path):
+        """ Return the size, mtime and MD5 of a local file, reusing the recorded MD5 when size and mtime match. """
+        stat = os.stat(file_path)
+        entry = self._entries.get(blob_name)
+        if entry and entry.get('path') == file_path and entry.get('size') == stat.st_size \
+                and entry.get('mtime') == stat.st_mtime:
+            md5 = entry.get('md5')
+        else:
+            md5 = _compute_md5(file_path)
+        return {'path': file_path, 'size': stat.st_size, 'mtime': stat.st_mtime, 'md5': md5}
+
+    def is_unchanged(self, blob_name, local_state, blob):
+        """ Whether the remote blob already holds the content of the local file. """
+        if blob is None or blob.properties.content_length != local_state['size']:
+            return False
+        content_settings = getattr(blob.properties, 'content_settings', None)
+        remote_md5 = getattr(content_settings, 'content_md5', None)
+        if remote_md5:
+            return remote_md5 == local_state['md5']
+        # blobs uploaded in blocks have no Content-MD5, trust the recorded upload if nobody changed the blob since
+        entry = self._entries.get(blob_name)
+        return bool(entry) and entry.get('md5') == local_state['md5'] and entry.get('etag') == blob.properties.etag
+
+    def record(self, blob_name, local_state, etag):
+        entry = dict(local_state)
+        entry['etag'] = etag
+        with self._lock:
+            self._entries[blob_name] = entry
+
+    def forget(self, blob_name):
+        with self._lock:
+            self._entries.pop(blob_name, None)
@@ -17,7 +17,8 @@ from azure.cli.command_modules.storage.util import (create_blob_service_from_sto
                                                     create_short_lived_container_sas,
                                                     filter_none, collect_blobs, collect_blob_objects, collect_files,
                                                     mkdir_p, guess_content_type, normalize_blob_file_path,
-                                                    check_precondition_success)
+                                                    check_precondition_success, run_batch_transfers,
+                                                    iter_batch_transfers, BatchTransferProgress)
 from knack.log import get_logger
 from knack.util import CLIError
 
@@ -302,18 +303,18 @@ def storage_blob_copy_batch(cmd, client, source_client, container_name=None,
 
 # pylint: disable=unused-argument
 def storage_blob_download_batch(client, source, destination, source_container_name, pattern=None, dryrun=False,
-                                progress_callback=None, max_connections=2):
+                                progress_callback=None, max_connections=2, max_concurrent_files=1):
 
-    def _download_blob(blob_service, container, destination_folder, normalized_blob_name, blob_name):
+    def _download_blob(blob_service, container, destination_folder, normalized_blob_name, blob_name,
+                       blob_progress_callback=None):
         # TODO: try catch IO exception
         destination_path = os.path.join(destination_folder, normalized_blob_name)
         destination_folder = os.path.dirname(destination_path)
         if not os.path.exists(destination_folder):
             mkdir_p(destination_folder)
 
-        blob = blob_service.get_blob_to_path(container, blob_name, destination_path, max_connections=max_connections,
-                                             progress_callback=progress_callback)
-        return blob.name
+        return blob_service.get_blob_to_path(container, blob_name, destination_path, max_connections=max_connections,
+                                             progress_callback=blob_progress_callback)
 
     source_blobs = collect_blobs(client, source_container_name, pattern)
     blobs_to_download = {}
@@ -340,14 +341,26 @@ def storage_blob_download_batch(client, source, destination, source_container_na
     if progress_callback:
         progress_callback.reuse = True
 
-    results = []
-    for index, blob_normed in enumerate(blobs_to_download):
-        # add blob name and number to progress message
-        if progress_callback:
-            progress_callback.message = '{}/{}: "{}"'.format(
-                index + 1, len(blobs_to_download), blobs_to_download[blob_normed])
-        results.append(_download_blob(
-            client, source_container_name, destination, blob_normed, blobs_to_download[blob_normed]))
+    if max_concurrent_files > 1:
+        # the per-chunk progress of concurrent downloads cannot share one hook, report finished blobs instead
+        progress = BatchTransferProgress(progress_callback, len(blobs_to_download))
+
+        def _download_blob_concurrently(blob_normed):
+            blob = _download_blob(client, source_container_name, destination, blob_normed,
+                                  blobs_to_download[blob_normed])
+            progress.file_done(blob.name, blob.properties.content_length)
+            return blob.name
+
+        results = run_batch_transfers(_download_blob_concurrently, blobs_to_download, max_concurrent_files)
+    else:
+        results = []
+        for index, blob_normed in enumerate(blobs_to_download):
+            # add blob name and number to progress message
+            if progress_callback:
+                progress_callback.message = '{}/{}: "{}"'.format(
+                    index + 1, len(blobs_to_download), blobs_to_download[blob_normed])
+            results.append(_download_blob(client, source_container_name, destination, blob_normed,
+                                          blobs_to_download[blob_normed], progress_callback).name)
 
     # end progress hook
     if progress_callback:
@@ -362,7 +375,8 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
                               content_settings=None, metadata=None, validate_content=False,
                               maxsize_condition=None, max_connections=2, lease_id=None, progress_callback=None,
                               if_modified_since=None, if_unmodified_since=None, if_match=None,
-                              if_none_match=None, timeout=None, dryrun=False):
+                              if_none_match=None, timeout=None, dryrun=False, max_concurrent_files=1, sync=False,
+                              delete_destination=False):
     def _create_return_result(blob_name, blob_content_settings, upload_result=None):
         blob_name = normalize_blob_file_path(destination_path, blob_name)
         return {
@@ -374,6 +388,11 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
     source_files = source_files or []
     t_content_settings = cmd.get_models('blob.models#ContentSettings')
 
+    manifest, local_states, orphan_blobs = None, {}, []
+    if sync:
+        manifest, source_files, local_states, orphan_blobs = _prepare_blob_sync(
+            client, source, source_files, destination_container_name, destination_path, pattern)
+
     results = []
     if dryrun:
         logger.info('upload action: from %s to %s', source, destination)
@@ -384,6 +403,9 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
         results = []
         for src, dst in source_files:
             results.append(_create_return_result(dst, guess_content_type(src, content_settings, t_content_settings)))
+        if delete_destination:
+            for blob_name in orphan_blobs:
+                logger.info('  - delete %s', blob_name)
     else:
         @check_precondition_success
         def _upload_blob(*args, **kwargs):
@@ -393,36 +415,113 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
         if progress_callback:
             progress_callback.reuse = True
 
-        for index, source_file in enumerate(source_files):
+        def _upload_source_file(source_file, blob_progress_callback=None):
             src, dst = source_file
-            # logger.warning('uploading %s', src)
             guessed_content_settings = guess_content_type(src, content_settings, t_content_settings)
-
-            # add blob name and number to progress message
-            if progress_callback:
-                progress_callback.message = '{}/{}: "{}"'.format(
-                    index + 1, len(source_files), normalize_blob_file_path(destination_path, dst))
-
             include, result = _upload_blob(cmd, client, file_path=src, container_name=destination_container_name,
                                            blob_name=normalize_blob_file_path(destination_path, dst),
                                            blob_type=blob_type, content_settings=guessed_content_settings,
                                            metadata=metadata, validate_content=validate_content,
                                            maxsize_condition=maxsize_condition, max_connections=max_connections,
-                                           lease_id=lease_id, progress_callback=progress_callback,
+                                           lease_id=lease_id, progress_callback=blob_progress_callback,
                                            if_modified_since=if_modified_since,
                                            if_unmodified_since=if_unmodified_since, if_match=if_match,
                                            if_none_match=if_none_match, timeout=timeout)
-            if include:
-                results.append(_create_return_result(dst, guessed_content_settings, result))
-        # end progress hook
-        if progress_callback:
-            progress_callback.hook.end()
-        num_failures = len(source_files) - len(results)
-        if num_failures:
-            logger.warning('%s of %s files not uploaded due to "Failed Precondition"', num_failures, len(source_files))
+            if not include:
+                return None
+            if manifest:
+                blob_name = normalize_blob_file_path(destination_path, dst)
+                manifest.record(blob_name, local_states[blob_name], getattr(result, 'etag', None))
+            return _create_return_result(dst, guessed_content_settings, result)
+
+        try:
+            if max_concurrent_files > 1:
+                # the per-chunk progress of concurrent uploads cannot share one hook, report finished files instead
+                progress = BatchTransferProgress(progress_callback, len(source_files))
+
+                def _upload_source_file_concurrently(source_file):
+                    result = _upload_source_file(source_file)
+                    progress.file_done(normalize_blob_file_path(destination_path, source_file[1]),
+                                       os.path.getsize(source_file[0]))
+                    return result
+
+                results = list(filter_none(run_batch_transfers(_upload_source_file_concurrently, source_files,
+                                                               max_concurrent_files)))
+            else:
+                for index, source_file in enumerate(source_files):
+                    # add blob name and number to progress message
+                    if progress_callback:
+                        progress_callback.message = '{}/{}: "{}"'.format(
+                            index + 1, len(source_files), normalize_blob_file_path(destination_path, source_file[1]))
+
+                    result = _upload_source_file(source_file, progress_callback)
+                    if result is not None:
+                        results.append(result)
+            # end progress hook
+            if progress_callback:
+                progress_callback.hook.end()
+            num_failures = len(source_files) - len(results)
+            if num_failures:
+                logger.warning('%s of %s files not uploaded due to "Failed Precondition"', num_failures,
+                               len(source_files))
+            if manifest and delete_destination:
+                _delete_orphan_blobs(client, manifest, destination_container_name, orphan_blobs, timeout,
+                                     max_concurrent_files)
+        finally:
+            # keep the files uploaded so far in the manifest, even if an upload or a delete failed
+            if manifest:
+                manifest.save()
     return results
 
 
+def _prepare_blob_sync(client, source, source_files, container_name, destination_path, pattern):
+    """
+    Load the sync manifest of the source and the destination, and compare the local files against it. Return the
+    manifest, the files to upload, their local state keyed by blob name and the names of the orphan blobs.
+    """
+    from azure.cli.command_modules.storage.blob_sync_manifest import BlobSyncManifest
+    manifest = BlobSyncManifest(client.account_name, container_name, source, destination_path)
+    num_source_files = len(source_files)
+    source_files, local_states, orphan_blobs = _diff_blob_sync_manifest(
+        client, manifest, source_files, container_name, destination_path, pattern)
+    logger.info('%s of %s files are unchanged since the last upload', num_source_files - len(source_files),
+                num_source_files)
+    return manifest, source_files, local_states, orphan_blobs
+
+
+def _delete_orphan_blobs(client, manifest, container_name, orphan_blobs, timeout, max_concurrent_files):
+    def _delete_orphan_blob(blob_name):
+        client.delete_blob(container_name, blob_name, timeout=timeout)
+        manifest.forget(blob_name)
+
+    run_batch_transfers(_delete_orphan_blob, orphan_blobs, max_concurrent_files)
+    if orphan_blobs:
+        logger.warning('%s blobs without a matching local file were deleted', len(orphan_blobs))
+
+
+def _diff_blob_sync_manifest(client, manifest, source_files, container_name, destination_path, pattern):
+    """
+    Compare the local files against the blobs under the destination path. Return the files that are new or changed,
+    the local state of those files keyed by blob name and the names of the blobs that have no local file.
+    """
+    remote_pattern = normalize_blob_file_path(destination_path, pattern or '*') if destination_path or pattern \
+        else None
+    remote_blobs = dict(collect_blob_objects(client, container_name, remote_pattern))
+
+    changed_files, local_states = [], {}
+    for src, dst in source_files:
+        blob_name = normalize_blob_file_path(destination_path, dst)
+        local_state = manifest.local_state(blob_name, src)
+        blob = remote_blobs.pop(blob_name, None)
+        if manifest.is_unchanged(blob_name, local_state, blob):
+            # refresh the entry so the next run can skip hashing this file
+            manifest.record(blob_name, local_state, blob.properties.etag)
+        else:
+            changed_files.append((src, dst))
+            local_states[blob_name] = local_state
+    return changed_files, local_states, sorted(remote_blobs)
+
+
 def transform_blob_type(cmd, blob_type):
     """
     get_blob_types() will get ['block', 'page', 'append']
@@ -581,7 +680,7 @@ def show_blob(cmd, client, container_name, blob_name, snapshot=None, lease_id=No
 
 def storage_blob_delete_batch(client, source, source_container_name, pattern=None, lease_id=None,
                               delete_snapshots=None, if_modified_since=None, if_unmodified_since=None, if_match=None,
-                              if_none_match=None, timeout=None, dryrun=False):
+                              if_none_match=None, timeout=None, dryrun=False, max_concurrent_files=1):
     @check_precondition_success
     def _delete_blob(blob_name):
         delete_blob_args = {
@@ -597,9 +696,8 @@ def storage_blob_delete_batch(client, source, source_container_name, pattern=Non
         }
         return client.delete_blob(**delete_blob_args)
 
-    source_blobs = list(collect_blob_objects(client, source_container_name, pattern))
-
     if dryrun:
+        source_blobs = list(collect_blob_objects(client, source_container_name, pattern))
         from datetime import timezone
         delete_blobs = []
         if_modified_since_utc = if_modified_since.replace(tzinfo=timezone.utc) if if_modified_since else None
@@ -617,10 +715,24 @@ def storage_blob_delete_batch(client, source, source_container_name, pattern=Non
             logger.warning('  - %s', blob)
         return []
 
-    results = [result for include, result in (_delete_blob(blob[0]) for blob in source_blobs) if include]
-    num_failures = len(source_blobs) - len(results)
-    if num_failures:
-        logger.warning('%s of %s blobs not deleted due to "Failed Precondition"', num_failures, len(source_blobs))
+    def _delete_listed_blob(blob):
+        include, _ = _delete_blob(blob[0])
+        return blob[0], include
+
+    # start deleting as soon as the first page of the listing arrives instead of listing the whole container first
+    num_blobs = 0
+    failed_blobs = []
+    for blob_name, include in iter_batch_transfers(_delete_listed_blob,
+                                                   collect_blob_objects(client, source_container_name, pattern),
+                                                   max_concurrent_files):
+        num_blobs += 1
+        if not include:
+            failed_blobs.append(blob_name)
+    if failed_blobs:
+        logger.warning('%s of %s blobs not deleted due to "Failed Precondition"', len(failed_blobs), num_blobs)
+        logger.info('blobs not deleted due to "Failed Precondition":')
+        for blob_name in failed_blobs:
+            logger.info('  - %s', blob_name)
 
 
 def generate_sas_blob_uri(client, container_name, blob_name, permission=None,
@@ -0,0 +1,138 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import time
+import unittest
+
+from azure.cli.command_modules.storage.util import run_batch_transfers, iter_batch_transfers, BatchTransferProgress
+
+
+class TestRunBatchTransfers(unittest.TestCase):
+    def test_run_batch_transfers_serial(self):
+        thread_ids = set()
+
+        def _transfer(item):
+            thread_ids.add(threading.current_thread().ident)
+            return item * 2
+
+        self.assertEqual(run_batch_transfers(_transfer, range(5)), [0, 2, 4, 6, 8])
+        self.assertEqual(thread_ids, {threading.current_thread().ident})
+
+    def test_run_batch_transfers_keeps_input_order(self):
+        def _transfer(item):
+            # finish the earlier items last
+            time.sleep(0.01 * (5 - item))
+            return item
+
+        self.assertEqual(run_batch_transfers(_transfer, range(5), max_concurrent_files=5), [0, 1, 2, 3, 4])
+
+    def test_run_batch_transfers_is_bounded(self):
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def _transfer(item):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.01)
+            with lock:
+                state['running'] -= 1
+            return item
+
+        self.assertEqual(len(run_batch_transfers(_transfer, range(20), max_concurrent_files=3)), 20)
+        self.assertLessEqual(state['peak'], 3)
+
+    def test_run_batch_transfers_does_not_wait_for_slow_items(self):
+        others_done = threading.Event()
+        lock = threading.Lock()
+        state = {'done': 0}
+
+        def _transfer(item):
+            if item == 0:
+                # the other items are transferred while the first one is still running
+                return others_done.wait(5)
+            with lock:
+                state['done'] += 1
+                if state['done'] == 9:
+                    others_done.set()
+            return item
+
+        results = run_batch_transfers(_transfer, range(10), max_concurrent_files=2)
+        self.assertEqual(results, [True] + list(range(1, 10)))
+
+    def test_run_batch_transfers_raises_first_error(self):
+        def _transfer(item):
+            if item == 3:
+                raise ValueError('transfer failed')
+            return item
+
+        with self.assertRaisesRegex(ValueError, 'transfer failed'):
+            run_batch_transfers(_transfer, range(10), max_concurrent_files=4)
+
+    def test_iter_batch_transfers_consumes_items_lazily(self):
+        pulled = []
+
+        def _items():
+            for i in range(100):
+                pulled.append(i)
+                yield i
+
+        results = iter_batch_transfers(lambda item: item, _items(), max_concurrent_files=2)
+        self.assertEqual(next(results), 0)
+        # only a bounded window of items is listed ahead of the transfers
+        self.assertLessEqual(len(pulled), 6)
+        self.assertEqual(list(results), list(range(1, 100)))
+
+    def test_iter_batch_transfers_bounds_results_behind_slow_item(self):
+        release = threading.Event()
+        pulled = []
+        state = {}
+
+        def _items():
+            for i in range(100):
+                pulled.append(i)
+                yield i
+
+        def _transfer(item):
+            if item == 0:
+                release.wait(5)
+            return item
+
+        def _release():
+            time.sleep(0.5)
+            state['pulled'] = len(pulled)
+            release.set()
+
+        thread = threading.Thread(target=_release)
+        thread.start()
+        results = list(iter_batch_transfers(_transfer, _items(), max_concurrent_files=2))
+        thread.join()
+        # the items after the stalled first one are only transferred up to a multiple of the workers
+        self.assertLessEqual(state['pulled'], 16)
+        self.assertEqual(results, list(range(100)))
+
+
+class TestBatchTransferProgress(unittest.TestCase):
+    def test_progress_reports_finished_files(self):
+        calls = []
+
+        def _progress_callback(current, total):
+            calls.append((current, total, _progress_callback.message))
+
+        progress = BatchTransferProgress(_progress_callback, 2)
+        progress.file_done('a.txt', 1024)
+        progress.file_done('b.txt', 2048)
+
+        self.assertEqual([(c, t) for c, t, _ in calls], [(1, 2), (2, 2)])
+        self.assertTrue(calls[0][2].startswith('1/2: "a.txt" ('))
+        self.assertTrue(calls[1][2].endswith('/s)'))
+
+    def test_progress_without_callback(self):
+        BatchTransferProgress(None, 1).file_done('a.txt', 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
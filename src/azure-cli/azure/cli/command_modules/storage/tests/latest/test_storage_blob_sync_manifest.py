@@ -0,0 +1,82 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from azure.cli.command_modules.storage.blob_sync_manifest import BlobSyncManifest
+
+
+def _mock_blob(content_length, content_md5=None, etag='"0x1"'):
+    blob = mock.MagicMock()
+    blob.properties.content_length = content_length
+    blob.properties.content_settings.content_md5 = content_md5
+    blob.properties.etag = etag
+    return blob
+
+
+class TestBlobSyncManifest(unittest.TestCase):
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.source_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.source_dir, 'a.txt')
+        with open(self.file_path, 'w') as f:
+            f.write('hello')
+        patcher = mock.patch.dict(os.environ, {'AZURE_CONFIG_DIR': self.config_dir})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.config_dir, ignore_errors=True)
+        shutil.rmtree(self.source_dir, ignore_errors=True)
+
+    def test_local_state_md5(self):
+        manifest = BlobSyncManifest('account', 'container', self.source_dir)
+        state = manifest.local_state('a.txt', self.file_path)
+        self.assertEqual(state['size'], 5)
+        self.assertEqual(state['md5'], 'XUFAKrxLKna5cZ2REBfFkg==')
+
+    def test_is_unchanged_by_content_md5(self):
+        manifest = BlobSyncManifest('account', 'container', self.source_dir)
+        state = manifest.local_state('a.txt', self.file_path)
+        self.assertTrue(manifest.is_unchanged('a.txt', state, _mock_blob(5, 'XUFAKrxLKna5cZ2REBfFkg==')))
+        self.assertFalse(manifest.is_unchanged('a.txt', state, _mock_blob(5, 'AAAAAAAAAAAAAAAAAAAAAA==')))
+        self.assertFalse(manifest.is_unchanged('a.txt', state, _mock_blob(6, 'XUFAKrxLKna5cZ2REBfFkg==')))
+        self.assertFalse(manifest.is_unchanged('a.txt', state, None))
+
+    def test_is_unchanged_by_recorded_etag(self):
+        manifest = BlobSyncManifest('account', 'container', self.source_dir)
+        state = manifest.local_state('a.txt', self.file_path)
+        self.assertFalse(manifest.is_unchanged('a.txt', state, _mock_blob(5)))
+
+        manifest.record('a.txt', state, '"0x1"')
+        self.assertTrue(manifest.is_unchanged('a.txt', state, _mock_blob(5, etag='"0x1"')))
+        # the blob was overwritten by someone else
+        self.assertFalse(manifest.is_unchanged('a.txt', state, _mock_blob(5, etag='"0x2"')))
+
+    def test_save_and_load(self):
+        manifest = BlobSyncManifest('account', 'container', self.source_dir, 'dir')
+        state = manifest.local_state('dir/a.txt', self.file_path)
+        manifest.record('dir/a.txt', state, '"0x1"')
+        manifest.save()
+        self.assertTrue(manifest.path.startswith(os.path.join(self.config_dir, 'blob_sync_manifest')))
+
+        loaded = BlobSyncManifest('account', 'container', self.source_dir, 'dir')
+        with mock.patch('azure.cli.command_modules.storage.blob_sync_manifest._compute_md5') as compute_md5:
+            self.assertEqual(loaded.local_state('dir/a.txt', self.file_path), state)
+            compute_md5.assert_not_called()
+
+        loaded.forget('dir/a.txt')
+        self.assertFalse(loaded.is_unchanged('dir/a.txt', state, _mock_blob(5, etag='"0x1"')))
+
+        # a different destination path uses its own manifest
+        self.assertNotEqual(BlobSyncManifest('account', 'container', self.source_dir).path, manifest.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -218,6 +218,95 @@ def normalize_blob_file_path(path, name):
     return path_sep.join(os.path.normpath(name).split(os.path.sep)).strip(path_sep)
 
 
+def run_batch_transfers(transfer, items, max_concurrent_files=1):
+    """
+    Apply transfer to each item with a bounded pool of worker threads and return the results in input order.
+    Idle workers pick up the next pending item as soon as they finish, so a few large files do not hold up the
+    small ones queued behind them. The first failure cancels the transfers that have not started yet.
+    """
+    return list(iter_batch_transfers(transfer, items, max_concurrent_files))
+
+
+def iter_batch_transfers(transfer, items, max_concurrent_files=1):
+    """
+    Lazy version of run_batch_transfers. Items are only pulled from the iterable as transfers finish, so a
+    listing generator can be consumed page by page while earlier items are still being transferred. The results
+    finished ahead of a slower earlier item are buffered until they can be yielded in input order, and no more items
+    are submitted while the oldest pending item is too far behind, so the buffer doesn't grow with the number of items.
+    """
+    if not max_concurrent_files or max_concurrent_files <= 1:
+        for item in items:
+            yield transfer(item)
+        return
+
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    from itertools import islice
+    items = iter(items)
+    # keep a few items queued per worker so that no worker idles while the next item is listed
+    window = max_concurrent_files * 2
+    # the most items that are running or finished but not yielded yet, behind a stalled item
+    max_pending = max_concurrent_files * 8
+    with ThreadPoolExecutor(max_workers=max_concurrent_files) as executor:
+        running = {}
+        finished_results = {}
+        submitted = 0
+        next_position = 0
+        try:
+            for item in islice(items, window):
+                running[executor.submit(transfer, item)] = submitted
+                submitted += 1
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    finished_results[running.pop(future)] = future.result()
+                while next_position in finished_results:
+                    yield finished_results.pop(next_position)
+                    next_position += 1
+                for item in islice(items, min(window - len(running), max_pending - (submitted - next_position))):
+                    running[executor.submit(transfer, item)] = submitted
+                    submitted += 1
+        finally:
+            for future in running:
+                future.cancel()
+
+
+class BatchTransferProgress(object):
+    """
+    Report the aggregated progress of a concurrent batch transfer through the single progress hook, with the
+    number of finished files and the overall throughput in the message.
+    """
+
+    def __init__(self, progress_callback, total):
+        import threading
+        import time
+        self._progress_callback = progress_callback
+        self._total = total
+        self._done = 0
+        self._bytes = 0
+        self._start = time.time()
+        self._lock = threading.Lock()
+
+    def file_done(self, name, size=None):
+        import time
+        with self._lock:
+            self._done += 1
+            self._bytes += size or 0
+            if not self._progress_callback:
+                return
+            elapsed = max(time.time() - self._start, 1e-6)
+            self._progress_callback.message = '{}/{}: "{}" ({}/s)'.format(
+                self._done, self._total, name, _format_byte_size(self._bytes / elapsed))
+            self._progress_callback(self._done, self._total)
+
+
+def _format_byte_size(size):
+    for unit in ['B', 'KiB', 'MiB', 'GiB']:
+        if size < 1024:
+            return '{:.1f} {}'.format(size, unit)
+        size /= 1024.0
+    return '{:.1f} TiB'.format(size)
+
+
 def check_precondition_success(func):
     def wrapper(*args, **kwargs):
         from azure.common import AzureHttpError
@@ -34,6 +34,12 @@ examples:
   - name: List the top three resources (Bash)
     text: >
         az rest --method get --url https://management.azure.com/subscriptions/{subscriptionId}/resources?api-version=2019-07-01 --url-parameters \\$top=3
+  - name: List all the resources of the subscription, following the next links
+    text: >
+        az rest --method get --url /subscriptions/{subscriptionId}/resources?api-version=2019-07-01 --paginate
+  - name: Get several resources in Azure Resource Manager batch requests from requests.json file
+    text: >
+        az rest --batch @requests.json
 """
 
 helps['version'] = """
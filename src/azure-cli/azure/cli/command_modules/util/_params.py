@@ -29,6 +29,13 @@ def load_arguments(self, _):
                    help='Request body. Use @{file} to load from a file. For quoting issues in different terminals, '
                         'see https://github.com/Azure/azure-cli/blob/dev/doc/use_cli_effectively.md#quoting-issues')
         c.argument('output_file', help='save response payload to a file')
+        c.argument('paginate', action='store_true',
+                   help='Follow the nextLink or @odata.nextLink of a paged response and output the merged value '
+                        'arrays of all the pages')
+        c.argument('batch',
+                   help='Requests to send in Azure Resource Manager batch requests instead of --url, as a JSON array '
+                        'of objects with httpMethod, url and optional content and name. The responses are output in '
+                        'the order of the requests. Use @{file} to load from a file')
         c.argument('resource',
                    help='Resource url for which CLI should acquire a token from AAD in order to access '
                         'the service. The token will be placed in the Authorization header. By default, '
@@ -10,9 +10,26 @@ logger = get_logger(__name__)
 UPGRADE_MSG = 'Not able to upgrade automatically. Instructions can be found at https://aka.ms/doc/InstallAzureCli'
 
 
-def rest_call(cmd, url, method=None, headers=None, uri_parameters=None,
-              body=None, skip_authorization_header=False, resource=None, output_file=None):
+# The maximum number of requests in an ARM batch request
+_ARM_BATCH_SIZE = 20
+_ARM_BATCH_URL = '/batch?api-version=2020-06-01'
+
+
+def rest_call(cmd, url=None, method=None, headers=None, uri_parameters=None,
+              body=None, skip_authorization_header=False, resource=None, output_file=None,
+              paginate=False, batch=None):
     from azure.cli.core.util import send_raw_request
+    from azure.cli.core.azclierror import MutuallyExclusiveArgumentError, RequiredArgumentMissingError
+    if batch:
+        if url or paginate:
+            raise MutuallyExclusiveArgumentError('--batch cannot be used with --url or --paginate.')
+        return _rest_batch(cmd, batch, headers, skip_authorization_header, output_file)
+    if not url:
+        raise RequiredArgumentMissingError('usage error: --url is required unless --batch is used.')
+    if paginate:
+        return _rest_paginate(cmd, url, method, headers, uri_parameters, body, skip_authorization_header,
+                              resource, output_file)
+
     r = send_raw_request(cmd.cli_ctx, method, url, headers, uri_parameters, body,
                          skip_authorization_header, resource, output_file)
     if not output_file and r.content:
@@ -25,6 +42,110 @@ def rest_call(cmd, url, method=None, headers=None, uri_parameters=None,
     return None
 
 
+def _rest_paginate(cmd, url, method, headers, uri_parameters, body, skip_authorization_header, resource,
+                   output_file):
+    """Follow the next links of a paged response and merge the `value` arrays of the pages. With --output-file, the
+    items are written to the file as a JSON array page by page."""
+    import json
+    from azure.cli.core.util import send_raw_request
+    from azure.cli.core.azclierror import AzureResponseError
+
+    items = []
+    fd = open(output_file, 'w') if output_file else None
+    try:
+        count = 0
+        if fd:
+            fd.write('[')
+        while url:
+            r = send_raw_request(cmd.cli_ctx, method, url, headers, uri_parameters, body,
+                                 skip_authorization_header, resource)
+            try:
+                page = r.json()
+            except ValueError:
+                raise AzureResponseError('--paginate requires a JSON response.')
+            if not isinstance(page, dict) or not isinstance(page.get('value'), list):
+                raise AzureResponseError("--paginate requires a paged response, which has a 'value' array.")
+            if fd:
+                for item in page['value']:
+                    fd.write(',\n' if count else '\n')
+                    json.dump(item, fd)
+                    count += 1
+            else:
+                items.extend(page['value'])
+            # ARM uses nextLink while Microsoft Graph uses @odata.nextLink. The next link contains the query and is
+            # always fetched with GET.
+            url = page.get('nextLink') or page.get('@odata.nextLink')
+            method, uri_parameters, body = 'get', None, None
+            logger.info('Fetched %d items, next link: %s', len(page['value']), url)
+        if fd:
+            fd.write('\n]\n')
+            return None
+        return items
+    finally:
+        if fd:
+            fd.close()
+
+
+def _rest_batch(cmd, batch, headers, skip_authorization_header, output_file):
+    """Send the requests in ARM batch requests of `_ARM_BATCH_SIZE` requests and return the responses in order."""
+    import json
+    from azure.cli.core.util import shell_safe_json_parse
+    from azure.cli.core.azclierror import InvalidArgumentValueError
+
+    requests = shell_safe_json_parse(batch) if isinstance(batch, str) else batch
+    if isinstance(requests, dict):
+        requests = requests.get('requests')
+    if not isinstance(requests, list) or not all(isinstance(req, dict) and req.get('url') for req in requests):
+        raise InvalidArgumentValueError('--batch must be a JSON array of requests, like '
+                                        '[{"httpMethod": "GET", "url": "/subscriptions/..."}].')
+
+    cli_ctx = cmd.cli_ctx
+    resource_manager = cli_ctx.cloud.endpoints.resource_manager.rstrip('/')
+    subscription_id = None
+    for req in requests:
+        req.setdefault('httpMethod', 'GET')
+        url = req['url']
+        if '{subscriptionId}' in url:
+            if subscription_id is None:
+                from azure.cli.core.commands.client_factory import get_subscription_id
+                subscription_id = get_subscription_id(cli_ctx)
+            url = url.replace('{subscriptionId}', subscription_id)
+        if '://' not in url:
+            url = resource_manager + url
+        req['url'] = url
+
+    responses = []
+    for i in range(0, len(requests), _ARM_BATCH_SIZE):
+        chunk = requests[i:i + _ARM_BATCH_SIZE]
+        chunk_responses = _send_arm_batch(cli_ctx, chunk, headers, skip_authorization_header)
+        if len(chunk_responses) != len(chunk):
+            logger.warning('The batch request of requests %d to %d returned %d responses.',
+                           i, i + len(chunk) - 1, len(chunk_responses))
+        responses.extend(chunk_responses)
+
+    if output_file:
+        with open(output_file, 'w') as fd:
+            json.dump(responses, fd)
+        return None
+    return responses
+
+
+def _send_arm_batch(cli_ctx, requests, headers, skip_authorization_header):
+    import json
+    import time
+    from azure.cli.core.util import send_raw_request
+
+    r = send_raw_request(cli_ctx, 'POST', _ARM_BATCH_URL, headers, body=json.dumps({'requests': requests}),
+                         skip_authorization_header=skip_authorization_header)
+    # ARM accepts the batch with 202 when it takes a while, then the responses are polled from the Location header.
+    while r.status_code == 202 and r.headers.get('Location'):
+        retry_after = r.headers.get('Retry-After')
+        time.sleep(int(retry_after) if retry_after and retry_after.isdigit() else 1)
+        r = send_raw_request(cli_ctx, 'GET', r.headers['Location'], headers,
+                             skip_authorization_header=skip_authorization_header)
+    return r.json().get('responses') or []
+
+
 def show_version(cmd):  # pylint: disable=unused-argument
     from azure.cli.core.util import get_az_version_json
     versions = get_az_version_json()
@@ -0,0 +1,85 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from azure.cli.core.mock import DummyCli
+from azure.cli.command_modules.util.custom import rest_call
+
+
+def _response(payload, status_code=200, headers=None):
+    response = mock.MagicMock(status_code=status_code, headers=headers or {})
+    response.json.return_value = payload
+    return response
+
+
+class TestRestPaginateBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.cmd = mock.MagicMock(cli_ctx=DummyCli())
+
+    @mock.patch('azure.cli.core.util.send_raw_request', autospec=True)
+    def test_rest_paginate(self, send_mock):
+        send_mock.side_effect = [
+            _response({'value': [1, 2], 'nextLink': 'https://management.azure.com/next?page=2'}),
+            _response({'value': [3], '@odata.nextLink': 'https://graph.microsoft.com/next?page=3'}),
+            _response({'value': [4]})] * 2
+
+        result = rest_call(self.cmd, '/subscriptions/{subscriptionId}/resources?api-version=2019-07-01',
+                           method='get', uri_parameters=['$top=2'], paginate=True)
+        self.assertEqual(result, [1, 2, 3, 4])
+        self.assertEqual([call.args[1:4] for call in send_mock.call_args_list],
+                         [('get', '/subscriptions/{subscriptionId}/resources?api-version=2019-07-01', None),
+                          ('get', 'https://management.azure.com/next?page=2', None),
+                          ('get', 'https://graph.microsoft.com/next?page=3', None)])
+        # the query parameters are only added to the first page
+        self.assertEqual(send_mock.call_args_list[0].args[4], ['$top=2'])
+        self.assertIsNone(send_mock.call_args_list[1].args[4])
+
+        output_dir = tempfile.mkdtemp()
+        try:
+            output_file = os.path.join(output_dir, 'output.json')
+            self.assertIsNone(rest_call(self.cmd, '/resources', method='get', output_file=output_file,
+                                        paginate=True))
+            with open(output_file) as f:
+                self.assertEqual(json.load(f), [1, 2, 3, 4])
+        finally:
+            shutil.rmtree(output_dir)
+
+    @mock.patch('time.sleep')
+    @mock.patch('azure.cli.core.util.send_raw_request', autospec=True)
+    def test_rest_batch(self, send_mock, sleep_mock):
+        requests = [{'url': '/subscriptions/0000/resourceGroups/rg{}?api-version=2020-06-01'.format(i)}
+                    for i in range(25)]
+
+        def _send(cli_ctx, method, url, headers=None, uri_parameters=None, body=None, **kwargs):
+            if method == 'POST' and '/rg20?' in body:
+                return _response(None, 202, {'Location': 'https://management.azure.com/batch/1', 'Retry-After': '2'})
+            if method == 'POST':
+                urls = [r['url'] for r in json.loads(body)['requests']]
+            else:
+                urls = ['https://management.azure.com' + r['url'] for r in requests[20:]]
+            return _response({'responses': [{'httpStatusCode': 200, 'content': {'url': u}} for u in urls]})
+        send_mock.side_effect = _send
+
+        result = rest_call(self.cmd, batch=json.dumps(requests))
+
+        self.assertEqual([r['content']['url'] for r in result],
+                         ['https://management.azure.com' + r['url'] for r in requests])
+        self.assertEqual([call.args[1:3] for call in send_mock.call_args_list],
+                         [('POST', '/batch?api-version=2020-06-01'), ('POST', '/batch?api-version=2020-06-01'),
+                          ('GET', 'https://management.azure.com/batch/1')])
+        self.assertEqual(json.loads(send_mock.call_args_list[0].kwargs['body'])['requests'][0],
+                         {'httpMethod': 'GET', 'url': 'https://management.azure.com' + requests[0]['url']})
+        sleep_mock.assert_called_once_with(2)
+
+
+if __name__ == '__main__':
+    unittest.main()
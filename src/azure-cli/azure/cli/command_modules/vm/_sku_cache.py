@@ -0,0 +1,94 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+import re
+import time
+import zlib
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_SKU_CACHE_TTL = 60  # minutes
+_FORMAT_VERSION = 1
+
+
+def get_sku_cache(cli_ctx, api_version):
+    """Get the SKU catalog cache of the current cloud and subscription, or None if `vm.sku_cache_ttl` is 0."""
+    from azure.cli.core.commands.client_factory import get_subscription_id
+    ttl = cli_ctx.config.getint('vm', 'sku_cache_ttl', fallback=DEFAULT_SKU_CACHE_TTL)
+    if ttl <= 0:
+        return None
+    cloud_name = re.sub(r'[^\w.-]', '_', cli_ctx.cloud.name)
+    filename = os.path.join(cli_ctx.config.config_dir, 'vm_sku_cache', cloud_name,
+                            '{}.snapshot'.format(get_subscription_id(cli_ctx)))
+    return SkuCache(filename, api_version, ttl * 60)
+
+
+class SkuCache:
+    """
+    The resource SKU catalog of a subscription, as returned by `resource_skus.list()`, cached on disk.
+
+    The SKUs are stored in a `Snapshot`, as one zlib-compressed JSON record per location, along with indexes of the
+    position of the SKUs in the catalog by location, resource type and name. A query only loads the records of the
+    locations which have matching SKUs, and returns the SKUs in the order of the catalog.
+    """
+
+    def __init__(self, filename, api_version, ttl):
+        from azure.cli.core._snapshot import Snapshot
+        self._snapshot = Snapshot(filename, {'version': _FORMAT_VERSION, 'apiVersion': api_version})
+        self.ttl = ttl
+
+    def query(self, location=None, resource_type=None, name=None):
+        """Get the serialized SKUs matching the filters, which are case insensitive.
+
+        :return: a list of the SKUs, or None if the catalog isn't cached or is expired.
+        """
+        index = self._snapshot.get('index')
+        if not index or time.time() - index['fetched'] > self.ttl:
+            return None
+        matches = None
+        for key, value in (('locations', location), ('resourceTypes', resource_type), ('names', name)):
+            if value is not None:
+                positions = set(index[key].get(value.lower(), ()))
+                matches = positions if matches is None else matches & positions
+
+        result = []
+        for partition, positions in index['partitions'].items():
+            if matches is not None and matches.isdisjoint(positions):
+                continue
+            record = self._snapshot.get('location/' + partition)
+            if record is None:
+                return None
+            skus = json.loads(zlib.decompress(record).decode('utf-8'))
+            result.extend((position, sku) for position, sku in zip(positions, skus)
+                          if matches is None or position in matches)
+        result.sort(key=lambda x: x[0])
+        return [sku for _, sku in result]
+
+    def save(self, skus):
+        """Replace the cached catalog with `skus`, a list of serialized SKUs."""
+        index = {'fetched': time.time(), 'partitions': {}, 'locations': {}, 'resourceTypes': {}, 'names': {}}
+        partitions = {}
+        for position, sku in enumerate(skus):
+            locations = [location.lower() for location in sku.get('locations') or []]
+            partition = locations[0] if locations else ''
+            index['partitions'].setdefault(partition, []).append(position)
+            partitions.setdefault(partition, []).append(sku)
+            for location in set(locations):
+                index['locations'].setdefault(location, []).append(position)
+            for key, value in (('resourceTypes', sku.get('resourceType')), ('names', sku.get('name'))):
+                if value:
+                    index[key].setdefault(value.lower(), []).append(position)
+
+        records = {'location/' + partition: zlib.compress(json.dumps(partition_skus).encode('utf-8'))
+                   for partition, partition_skus in partitions.items()}
+        records['index'] = index
+        # Drop the records of the previous catalog
+        self._snapshot.invalidate()
+        if not self._snapshot.update(records):
+            logger.debug('Failed to cache the SKU catalog.')
@@ -344,7 +344,7 @@ def _validate_location(cmd, namespace, zone_info, size_info):
     if not namespace.location:
         get_default_location_from_resource_group(cmd, namespace)
         if zone_info:
-            sku_infos = list_sku_info(cmd.cli_ctx, namespace.location)
+            sku_infos = list_sku_info(cmd.cli_ctx, namespace.location, name=size_info)
             temp = next((x for x in sku_infos if x.name.lower() == size_info.lower()), None)
             # For Stack (compute - 2017-03-30), Resource_sku doesn't implement location_info property
             if not hasattr(temp, 'location_info'):
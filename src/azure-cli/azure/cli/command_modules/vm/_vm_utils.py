@@ -114,16 +114,36 @@ def get_key_vault_base_url(cli_ctx, vault_name):
     return 'https://{}{}'.format(vault_name, suffix)
 
 
-def list_sku_info(cli_ctx, location=None):
+def list_sku_info(cli_ctx, location=None, resource_type=None, name=None):
+    """List the resource SKUs of the subscription, filtered by location, resource type and name.
+
+    The catalog is cached on disk for `vm.sku_cache_ttl` minutes, see `_sku_cache.SkuCache`.
+    """
     from ._client_factory import _compute_client_factory
+    from ._sku_cache import get_sku_cache
 
     def _match_location(loc, locations):
         return next((x for x in locations if x.lower() == loc.lower()), None)
 
     client = _compute_client_factory(cli_ctx)
-    result = client.resource_skus.list()
+    cache = get_sku_cache(cli_ctx, getattr(client.resource_skus, 'api_version', None))
+    if cache:
+        cached_skus = cache.query(location, resource_type, name)
+        if cached_skus is not None:
+            from azure.cli.core.profiles import ResourceType, get_sdk
+            ResourceSku = get_sdk(cli_ctx, ResourceType.MGMT_COMPUTE, 'ResourceSku', mod='models',
+                                  operation_group='resource_skus')
+            return [ResourceSku.deserialize(sku) for sku in cached_skus]
+
+    result = list(client.resource_skus.list())
+    if cache:
+        cache.save([sku.serialize(keep_readonly=True) for sku in result])
     if location:
         result = [r for r in result if _match_location(location, r.locations)]
+    if resource_type:
+        result = [r for r in result if r.resource_type and r.resource_type.lower() == resource_type.lower()]
+    if name:
+        result = [r for r in result if r.name and r.name.lower() == name.lower()]
     return result
 
 
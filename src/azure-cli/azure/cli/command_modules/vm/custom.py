@@ -47,7 +47,7 @@ from ._vm_utils import read_content_if_is_file
 from ._vm_diagnostics_templates import get_default_diag_config
 
 from ._actions import (load_images_from_aliases_doc, load_extension_images_thru_services,
-                       load_images_thru_services, _get_latest_image_version)
+                       load_images_thru_services, _get_latest_image_version, _get_thread_count)
 from ._client_factory import (_compute_client_factory, cf_public_ip_addresses, cf_vm_image_term,
                               _dev_test_labs_client_factory)
 
@@ -1035,28 +1035,43 @@ def get_vm_to_update(cmd, resource_group_name, vm_name):
 
 
 def get_vm_details(cmd, resource_group_name, vm_name):
-    from msrestazure.tools import parse_resource_id
-    from azure.cli.command_modules.vm._vm_utils import get_target_network_api
     result = get_instance_view(cmd, resource_group_name, vm_name)
-    network_client = get_mgmt_service_client(
+    return _add_vm_details(result, _get_vm_details_network_client(cmd))
+
+
+def _get_vm_details_network_client(cmd):
+    from azure.cli.command_modules.vm._vm_utils import get_target_network_api
+    return get_mgmt_service_client(
         cmd.cli_ctx, ResourceType.MGMT_NETWORK, api_version=get_target_network_api(cmd.cli_ctx))
+
+
+def _add_vm_details(result, network_client, nics=None, public_ip_addresses=None):
+    # The NICs and public IPs are looked up by their lower case ID in `nics` and `public_ip_addresses` when they are
+    # given, and retrieved one at a time otherwise
+    from msrestazure.tools import parse_resource_id
+
+    def _get_network_resource(resource_id, lookup, operations):
+        resource = lookup.get(resource_id.lower()) if lookup is not None else None
+        if resource is None:
+            parts = parse_resource_id(resource_id)
+            resource = operations.get(parts['resource_group'], parts['name'])
+        return resource
+
     public_ips = []
     fqdns = []
     private_ips = []
     mac_addresses = []
     # pylint: disable=line-too-long,no-member
     for nic_ref in result.network_profile.network_interfaces:
-        nic_parts = parse_resource_id(nic_ref.id)
-        nic = network_client.network_interfaces.get(nic_parts['resource_group'], nic_parts['name'])
+        nic = _get_network_resource(nic_ref.id, nics, network_client.network_interfaces)
         if nic.mac_address:
             mac_addresses.append(nic.mac_address)
         for ip_configuration in nic.ip_configurations:
             if ip_configuration.private_ip_address:
                 private_ips.append(ip_configuration.private_ip_address)
             if ip_configuration.public_ip_address:
-                res = parse_resource_id(ip_configuration.public_ip_address.id)
-                public_ip_info = network_client.public_ip_addresses.get(res['resource_group'],
-                                                                        res['name'])
+                public_ip_info = _get_network_resource(ip_configuration.public_ip_address.id, public_ip_addresses,
+                                                       network_client.public_ip_addresses)
                 if public_ip_info.ip_address:
                     public_ips.append(public_ip_info.ip_address)
                 if public_ip_info.dns_settings:
@@ -1072,9 +1087,35 @@ def get_vm_details(cmd, resource_group_name, vm_name):
     return result
 
 
+def _list_vm_details(cmd, vms):
+    # Rather than retrieving the NICs and public IPs of each VM one at a time, list them once for the subscription,
+    # like list_vm_ip_addresses does, while the instance views are retrieved concurrently
+    from concurrent.futures import ThreadPoolExecutor
+    if not vms:
+        return []
+    compute_client = _compute_client_factory(cmd.cli_ctx)
+    network_client = _get_vm_details_network_client(cmd)
+
+    def _list_nics():
+        return {nic.id.lower(): nic for nic in network_client.network_interfaces.list_all()}
+
+    def _list_public_ip_addresses():
+        return {pip.id.lower(): pip for pip in network_client.public_ip_addresses.list_all()}
+
+    def _get_instance_view(vm):
+        return compute_client.virtual_machines.get(_parse_rg_name(vm.id)[0], vm.name, expand='instanceView')
+
+    with ThreadPoolExecutor(max_workers=_get_thread_count()) as executor:
+        nics_task = executor.submit(_list_nics)
+        public_ip_addresses_task = executor.submit(_list_public_ip_addresses)
+        instance_views = list(executor.map(_get_instance_view, vms))
+        nics, public_ip_addresses = nics_task.result(), public_ip_addresses_task.result()
+    return [_add_vm_details(vm, network_client, nics, public_ip_addresses) for vm in instance_views]
+
+
 def list_skus(cmd, location=None, size=None, zone=None, show_all=None, resource_type=None):
     from ._vm_utils import list_sku_info
-    result = list_sku_info(cmd.cli_ctx, location)
+    result = list_sku_info(cmd.cli_ctx, location, resource_type=resource_type)
     if not show_all:
         result = [x for x in result if not [y for y in (x.restrictions or [])
                                             if y.reason_code == 'NotAvailableForSubscription']]
@@ -1092,7 +1133,7 @@ def list_vm(cmd, resource_group_name=None, show_details=False):
     vm_list = ccf.virtual_machines.list(resource_group_name=resource_group_name) \
         if resource_group_name else ccf.virtual_machines.list_all()
     if show_details:
-        return [get_vm_details(cmd, _parse_rg_name(v.id)[0], v.name) for v in vm_list]
+        return _list_vm_details(cmd, list(vm_list))
 
     return list(vm_list)
 
@@ -14,7 +14,7 @@ from azure.cli.command_modules.vm.custom import (enable_boot_diagnostics, disabl
                                                  _LINUX_ACCESS_EXT,
                                                  _WINDOWS_ACCESS_EXT,
                                                  _get_extension_instance_name,
-                                                 get_boot_log)
+                                                 get_boot_log, get_vm_details, list_vm)
 from azure.cli.command_modules.vm.custom import \
     (attach_unmanaged_data_disk, detach_data_disk, get_vmss_instance_view)
 
@@ -225,6 +225,52 @@ class TestVmCustom(unittest.TestCase):
         vm_client.virtual_machine_scale_set_vms.list.assert_called_once_with('rg1', 'vmss1', expand='instanceView',
                                                                              select='instanceView')
 
+    @mock.patch('azure.cli.command_modules.vm.custom.get_mgmt_service_client', autospec=True)
+    @mock.patch('azure.cli.command_modules.vm.custom._compute_client_factory', autospec=True)
+    def test_list_vm_show_details(self, factory_mock, network_client_mock):
+        rg_id = '/subscriptions/00000000-0000-0000-0000-000000000000/resourceGroups/rg1/providers/'
+        pips = {'pip{}'.format(i): mock.MagicMock(id=rg_id + 'Microsoft.Network/publicIPAddresses/pip{}'.format(i),
+                                                  ip_address='10.1.0.{}'.format(i), dns_settings=None)
+                for i in range(3)}
+        nics = {}
+        for i in range(3):
+            ip_configuration = mock.MagicMock(private_ip_address='10.0.0.{}'.format(i))
+            ip_configuration.public_ip_address.id = pips['pip{}'.format(i)].id.upper()
+            nics['nic{}'.format(i)] = mock.MagicMock(id=rg_id + 'Microsoft.Network/networkInterfaces/nic{}'.format(i),
+                                                     mac_address='00-00-00-00-00-0{}'.format(i),
+                                                     ip_configurations=[ip_configuration])
+        network_client = network_client_mock.return_value
+        network_client.network_interfaces.list_all.return_value = list(nics.values())
+        network_client.network_interfaces.get.side_effect = lambda _, name: nics[name]
+        network_client.public_ip_addresses.list_all.return_value = list(pips.values())
+        network_client.public_ip_addresses.get.side_effect = lambda _, name: pips[name.lower()]
+
+        def _get_vm(_, name, expand=None):
+            vm = mock.MagicMock(id=rg_id + 'Microsoft.Compute/virtualMachines/' + name, instance_view=mock.MagicMock())
+            vm.name = name
+            vm.network_profile.network_interfaces = [mock.MagicMock(id=nics['nic' + name[-1]].id)]
+            vm.instance_view.statuses = [InstanceViewStatus(code='PowerState/running', display_status='VM running')]
+            return vm
+        compute_client = factory_mock.return_value
+        compute_client.virtual_machines.list_all.return_value = [_get_vm('rg1', 'vm{}'.format(i)) for i in range(3)]
+        compute_client.virtual_machines.get.side_effect = _get_vm
+        cmd = _get_test_cmd()
+
+        # execute
+        result = list_vm(cmd, show_details=True)
+
+        # assert the NICs and public IPs are listed once, and the details match those of `az vm show -d`
+        self.assertFalse(network_client.network_interfaces.get.called)
+        self.assertFalse(network_client.public_ip_addresses.get.called)
+        expected = [get_vm_details(cmd, 'rg1', 'vm{}'.format(i)) for i in range(3)]
+        self.assertEqual(network_client.network_interfaces.get.call_count, 3)
+        self.assertEqual([vm.name for vm in result], ['vm0', 'vm1', 'vm2'])
+        for vm, expected_vm in zip(result, expected):
+            for attr in ['power_state', 'public_ips', 'fqdns', 'private_ips', 'mac_addresses']:
+                self.assertEqual(getattr(vm, attr), getattr(expected_vm, attr))
+        self.assertEqual(result[1].public_ips, '10.1.0.1')
+        self.assertEqual(result[1].power_state, 'VM running')
+
     # pylint: disable=line-too-long
     @mock.patch('azure.cli.command_modules.vm.disk_encryption._compute_client_factory', autospec=True)
     @mock.patch('azure.cli.command_modules.vm.disk_encryption._get_keyvault_key_url', autospec=True)
@@ -0,0 +1,65 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from azure.cli.command_modules.vm._sku_cache import SkuCache
+
+
+def _sku(resource_type, name, location):
+    return {'resourceType': resource_type, 'name': name, 'locations': [location],
+            'locationInfo': [{'location': location, 'zones': ['1', '2']}]}
+
+
+SKUS = [_sku('availabilitySets', 'Classic', 'eastus2'),
+        _sku('virtualMachines', 'Standard_DS1_v2', 'eastus2'),
+        _sku('virtualMachines', 'Standard_DS1_v2', 'WestUS'),
+        _sku('disks', 'Premium_LRS', 'westus'),
+        _sku('virtualMachines', 'Standard_DS2_v2', 'eastus2'),
+        {'resourceType': 'hostGroups', 'name': 'Dedicated', 'locations': []}]
+
+
+class TestSkuCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.cache_dir, 'cache', 'skus.snapshot')
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_sku_cache_query(self):
+        cache = SkuCache(self.filename, '2019-04-01', 3600)
+        self.assertIsNone(cache.query())
+        cache.save(SKUS)
+
+        cache = SkuCache(self.filename, '2019-04-01', 3600)
+        self.assertEqual(cache.query(), SKUS)
+        self.assertEqual(cache.query(location='westus'), [SKUS[2], SKUS[3]])
+        self.assertEqual(cache.query(location='EastUS2', resource_type='virtualmachines'), [SKUS[1], SKUS[4]])
+        self.assertEqual(cache.query(resource_type='virtualMachines', name='standard_ds1_v2'), [SKUS[1], SKUS[2]])
+        self.assertEqual(cache.query(location='westus', name='Standard_DS2_v2'), [])
+        self.assertEqual(cache.query(location='centralus'), [])
+
+    def test_sku_cache_expiry(self):
+        SkuCache(self.filename, '2019-04-01', 3600).save(SKUS)
+
+        # a catalog cached for another API version isn't used
+        self.assertIsNone(SkuCache(self.filename, '2017-09-01', 3600).query())
+        with mock.patch('time.time', return_value=time.time() + 3601):
+            self.assertIsNone(SkuCache(self.filename, '2019-04-01', 3600).query())
+
+        # a new catalog replaces the expired one
+        SkuCache(self.filename, '2019-04-01', 3600).save(SKUS[:1])
+        self.assertEqual(SkuCache(self.filename, '2019-04-01', 3600).query(location='westus'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()